@@ -3,8 +3,11 @@ from rest_framework_nested.routers import NestedDefaultRouter
 
 from .transcript import TranscriptViewSet
 from .transcript_data import TranscriptDataViewSet
+from .upload import UploadSessionViewSet
 
 router = DefaultRouter()
+# Registered before transcripts, whose detail route would otherwise match "uploads"
+router.register("transcripts/uploads", UploadSessionViewSet, basename="uploads")
 router.register("transcripts", TranscriptViewSet, basename="transcripts")
 
 # Nested router
@@ -1,8 +1,16 @@
+import os
+
+from django.conf import settings
 from django.core.validators import FileExtensionValidator
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
-from transcriber.models import Transcription
+from transcriber.models import Transcription, UploadSession
 from transcriber.models.transcription_data import TranscriptionData
+from transcriber.scheduling import expected_completion
+
+VIDEO_EXTENSIONS = ["mp4", "mov", "avi", "mkv", "webm", "m4v", "mpg", "mpeg"]
 
 
 class VideoSerializer(serializers.Serializer):
@@ -15,7 +23,7 @@ class VideoSerializer(serializers.Serializer):
         use_url=False,
         validators=[
             FileExtensionValidator(
-                allowed_extensions=["mp4", "mov", "avi", "mkv", "webm", "m4v", "mpg", "mpeg"],
+                allowed_extensions=VIDEO_EXTENSIONS,
                 message="Unsupported video format.",
             )
         ],
@@ -30,12 +38,42 @@ class VideoSerializer(serializers.Serializer):
         return data
 
 
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = ["id", "created_at", "filename", "size", "offset", "transcription"]
+        read_only_fields = ["id", "created_at", "offset", "transcription"]
+
+    def validate_filename(self, value):
+        extension = os.path.splitext(value)[1].lstrip(".").lower()
+        if extension not in VIDEO_EXTENSIONS:
+            raise serializers.ValidationError("Unsupported video format.")
+        return value
+
+    def validate_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("The submitted file is empty.")
+        if value > settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"File too large: {value // (1024 * 1024)} MB (max {settings.UPLOAD_MAX_SIZE // (1024 * 1024)} MB)"
+            )
+        return value
+
+
 class TranscriptSerializer(serializers.ModelSerializer):
+    # Estimate from the scheduler's queues, null once the job has finished
+    expected_completion = serializers.SerializerMethodField()
+
     class Meta:
         model = Transcription
-        fields = ["id", "created_at", "user", "status"]
+        fields = ["id", "created_at", "user", "status", "expected_completion"]
         read_only_fields = fields
 
+    @extend_schema_field(OpenApiTypes.DATETIME)
+    def get_expected_completion(self, obj):
+        # The jobs of a page share the context, each lane's backlog is queried once per request
+        return expected_completion(obj, self.context.setdefault("lane_backlogs", {}))
+
 
 class TranscriptionDataSerializer(serializers.ModelSerializer):
     class Meta:
@@ -1,15 +1,17 @@
+from django.conf import settings
 from django_filters import rest_framework as filters
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from transcriber.idempotency import RequestInProgress, claim_request, release_request, request_fingerprint, store_response
+from transcriber.jobs import submit_transcription
 from transcriber.models import Transcription
-from transcriber.models.transcription import TranscriptionStatus
-from transcriber.tasks import handle_transcripts
-from transcriber.util import temp_path_of_uploaded_video
+from transcriber.upload_handlers import VideoUploadHandler, persist_uploaded_video
 
 from .filters import TranscriptionFilter
 from .serializers import TranscriptSerializer, VideoSerializer
@@ -36,17 +38,34 @@ from .serializers import TranscriptSerializer, VideoSerializer
         summary="Generate Transcript",
         description="Generate a new transcript from an uploaded video file. The transcription process is handled asynchronously.",
         request=VideoSerializer,
-        responses={200: TranscriptSerializer()},
+        parameters=[
+            OpenApiParameter(
+                "Idempotency-Key",
+                OpenApiTypes.STR,
+                OpenApiParameter.HEADER,
+                description="Unique key of the upload. A retry with the same key gets the original response "
+                "without uploading the video again, or 409 while the first request is still running.",
+            )
+        ],
+        responses={202: TranscriptSerializer()},
     ),
 )
 class TranscriptViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = TranscriptSerializer
-    queryset = Transcription.objects.all()
+    # Jobs attached to another job report the expected completion of that one
+    queryset = Transcription.objects.select_related("duplicate_of")
     permission_classes = [IsAuthenticated]
     pagination_class = LimitOffsetPagination
     filter_backends = [filters.DjangoFilterBackend]
     filterset_class = TranscriptionFilter
 
+    def initialize_request(self, request, *args, **kwargs):
+        # Sniff, hash and store the video in one pass while the request body is read
+        if self.action_map.get(request.method.lower()) == "generate":
+            request.upload_handlers = [VideoUploadHandler(request, max_size=VideoSerializer.MAX_UPLOAD_SIZE)]
+
+        return super().initialize_request(request, *args, **kwargs)
+
     def get_queryset(self):
         if self.request.user.is_superuser:
             return super().get_queryset().order_by("-created_at")
@@ -55,13 +74,48 @@ class TranscriptViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=False, methods=["post"])
     def generate(self, request):
+        key = request.headers.get("Idempotency-Key")
+        if key is None:
+            return self.submit(request)
+
+        if not key or len(key) > settings.IDEMPOTENCY_KEY_MAX_LENGTH:
+            return Response(
+                {"detail": f"Idempotency-Key must be 1 to {settings.IDEMPOTENCY_KEY_MAX_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Checked before the body is read, so a retried upload is dropped unread
+        fingerprint = request_fingerprint(request.user.pk, "generate", key)
+        try:
+            stored = claim_request(fingerprint)
+        except RequestInProgress:
+            return Response(
+                {"detail": "A request with this Idempotency-Key is still in progress."}, status=status.HTTP_409_CONFLICT
+            )
+        if stored:
+            return Response(stored["data"], status=stored["status"], headers={"Idempotent-Replayed": "true"})
+
+        response = None
+        try:
+            response = self.submit(request)
+        finally:
+            # Only accepted jobs are replayed, a rejected upload can be corrected and sent again
+            if response is not None and response.status_code == status.HTTP_202_ACCEPTED:
+                store_response(fingerprint, response.status_code, dict(response.data))
+            else:
+                release_request(fingerprint)
+        return response
+
+    def submit(self, request):
         serializer = VideoSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        temp_video_path = temp_path_of_uploaded_video(serializer.validated_data["video_file"])
+        try:
+            video_name, content_hash, duration = persist_uploaded_video(serializer.validated_data["video_file"])
+        except ValueError as e:
+            return Response({"video_file": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
 
-        transcripts = Transcription.objects.create(status=TranscriptionStatus.PENDING, user=request.user)
-        handle_transcripts.apply_async(args=[transcripts.id, temp_video_path])
+        transcripts = submit_transcription(request.user, video_name, content_hash, duration)
 
         return Response(TranscriptSerializer(transcripts).data, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,145 @@
+import re
+
+from django.db import transaction
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
+
+from transcriber.jobs import submit_transcription
+from transcriber.models import UploadSession
+from transcriber.uploads import append_chunk, claim_finalize, complete_upload, release_finalize
+
+from .serializers import TranscriptSerializer, UploadSessionSerializer
+
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+
+@extend_schema_view(
+    create=extend_schema(
+        tags=["Uploads"],
+        operation_id="create_upload",
+        summary="Create Upload",
+        description="Start a resumable upload of a video file of the given size. Chunks are then sent with PUT.",
+        request=UploadSessionSerializer,
+        responses={201: UploadSessionSerializer()},
+    ),
+    retrieve=extend_schema(
+        tags=["Uploads"],
+        operation_id="retrieve_upload",
+        summary="Retrieve Upload",
+        description="Retrieve an upload, including the offset the next chunk must start at.",
+        responses={200: UploadSessionSerializer()},
+    ),
+    update=extend_schema(
+        tags=["Uploads"],
+        operation_id="upload_chunk",
+        summary="Upload Chunk",
+        description="Append the raw request body at the byte range given by the Content-Range header. "
+        "The range must start at the current offset of the upload.",
+        parameters=[
+            OpenApiParameter(
+                name="Content-Range",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.HEADER,
+                required=True,
+                description="bytes <start>-<end>/<size>",
+            )
+        ],
+        request={"application/octet-stream": OpenApiTypes.BINARY},
+        responses={200: UploadSessionSerializer()},
+    ),
+    finalize=extend_schema(
+        tags=["Uploads"],
+        operation_id="finalize_upload",
+        summary="Finalize Upload",
+        description="Generate a transcript from a fully received upload. The transcription process is handled asynchronously.",
+        request=None,
+        responses={202: TranscriptSerializer()},
+    ),
+)
+class UploadSessionViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin, mixins.RetrieveModelMixin):
+    serializer_class = UploadSessionSerializer
+    queryset = UploadSession.objects.all()
+    permission_classes = [IsAuthenticated]
+    throttle_scope = "uploads"
+
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
+
+    def get_throttles(self):
+        # A large video takes many chunk requests; starting a job stays under the user rate
+        if self.action in ("update", "retrieve"):
+            return [ScopedRateThrottle()]
+        return super().get_throttles()
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def update(self, request, pk=None):
+        match = CONTENT_RANGE_RE.match(request.headers.get("Content-Range", ""))
+        if not match:
+            return Response({"detail": "A Content-Range header is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        start, end, total = int(match[1]), int(match[2]), match[3]
+        length = end - start + 1
+
+        with transaction.atomic():
+            session = self.get_queryset().select_for_update().get(pk=self.get_object().pk)
+
+            if session.completed:
+                return Response({"detail": "Upload already finalized."}, status=status.HTTP_409_CONFLICT)
+
+            if (total != "*" and int(total) != session.size) or length <= 0 or end >= session.size:
+                return Response(
+                    {"detail": "Content-Range does not fit the upload size."}, status=status.HTTP_400_BAD_REQUEST
+                )
+
+            if start != session.offset:
+                return Response(
+                    {"detail": "Chunk does not start at the upload offset.", "offset": session.offset},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+            append_chunk(session, request.stream, length)
+
+        return Response(UploadSessionSerializer(session).data)
+
+    @action(detail=True, methods=["post"])
+    def finalize(self, request, pk=None):
+        session = self.get_object()
+        if session.transcription_id:
+            return Response(TranscriptSerializer(session.transcription).data, status=status.HTTP_202_ACCEPTED)
+
+        if not claim_finalize(session):
+            return Response({"detail": "Upload is being finalized."}, status=status.HTTP_409_CONFLICT)
+
+        try:
+            session.refresh_from_db()
+            if session.transcription_id:
+                return Response(TranscriptSerializer(session.transcription).data, status=status.HTTP_202_ACCEPTED)
+
+            # A finalize that stored the video but failed to submit it is resumed from the session
+            if not session.completed:
+                if session.offset != session.size:
+                    return Response(
+                        {"detail": "Upload is incomplete.", "offset": session.offset}, status=status.HTTP_409_CONFLICT
+                    )
+
+                try:
+                    complete_upload(session)
+                except ValueError as e:
+                    return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Submitted after the session is committed, so the worker can see the new job
+            session.transcription = submit_transcription(
+                request.user, session.video_name, session.content_hash, session.duration
+            )
+            session.save(update_fields=["transcription", "updated_at"])
+        finally:
+            release_finalize(session)
+
+        return Response(TranscriptSerializer(session.transcription).data, status=status.HTTP_202_ACCEPTED)
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -105,6 +107,7 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_THROTTLE_RATES": {
         "user": "10/min",
+        "uploads": "600/min",
     },
 }
 
@@ -175,6 +178,170 @@ STATICFILES_DIRS = []
 CELERY_TIMEZONE = "UTC"
 CELERY_BROKER_URL = "redis://localhost:6372"
 CELERY_RESULT_BACKEND = "redis://localhost:6372"
+
+# Provider and council calls wait on the network while FFmpeg decodes and re-encodes keep cores busy,
+# so each kind of work has a queue of its own. Tasks not routed here go to the I/O queue.
+CELERY_TASK_DEFAULT_QUEUE = "io"
+CELERY_TASK_ROUTES = {
+    "transcriber.tasks.handle_transcripts": {"queue": "cpu"},
+    "transcriber.tasks.prepare_council": {"queue": "cpu"},
+    "transcriber.tasks.stitch_subtitle_and_video": {"queue": "cpu"},
+}
+# Errbacks of a chord reach the tasks of its header too, so a failing chunk task fails its job
+CELERY_TASK_ALLOW_ERROR_CB_ON_CHORD_HEADER = True
+
+# Provider calls of a worker process share one event loop and one keep-alive connection pool
+PROVIDER_HTTP_MAX_CONNECTIONS = 200
+PROVIDER_HTTP_MAX_KEEPALIVE_CONNECTIONS = 50
+PROVIDER_HTTP_TIMEOUT = 600.0  # seconds per request, uploads of long chunks included
+
+# Once the first provider has transcribed a chunk, the others get PROVIDER_LATENCY_BUDGET more seconds before
+# the job goes on without them; None waits for every provider. With a percentile set, they get that percentile
+# of recently observed gaps between the first and later arrivals instead (capped by the budget), once
+# PROVIDER_LATENCY_MIN_SAMPLES gaps were seen.
+PROVIDER_LATENCY_BUDGET = None
+PROVIDER_LATENCY_PERCENTILE = None
+PROVIDER_LATENCY_MIN_SAMPLES = 20
+PROVIDER_LATENCY_MAX_SAMPLES = 200
+
+# Circuit breaker and AIMD concurrency limit per provider. Their state lives in the cache, which must be
+# shared (e.g. Redis) for workers to see the same breakers. PROVIDER_BREAKER_FAILURES transient failures
+# within PROVIDER_BREAKER_WINDOW seconds open a provider's circuit: jobs skip it for PROVIDER_BREAKER_COOLDOWN
+# seconds, then a single call probes it. Calls in flight per provider are halved on every transient failure
+# and grow by one per success, up to PROVIDER_CONCURRENCY_MAX.
+PROVIDER_BREAKER_FAILURES = 5
+PROVIDER_BREAKER_WINDOW = 60
+PROVIDER_BREAKER_COOLDOWN = 120
+PROVIDER_CONCURRENCY_MAX = 64
+PROVIDER_IN_FLIGHT_TTL = 60 * 60  # slots held by the calls of a killed worker are freed after this
+PROVIDER_SLOT_POLL_SECONDS = 0.5
+
+# Create provider clients and open their connections when a process of an io worker starts. The warm-up runs
+# in the background, Celery gives a new process only a few seconds (worker_proc_alive_timeout) to start up.
+PROVIDER_WARM_UP = True
+PROVIDER_WARM_UP_TIMEOUT = 2.0  # seconds a client gets to connect, an unreachable one is left to the first job
+
+# Time a provider gets to transcribe one chunk before it counts as failed (seconds), by provider key
+PROVIDER_TIMEOUTS = {"openai": 900, "assembly": 1800}
+
+# Jobs wait in per-user queues and are released to the workers in turns (see transcriber.scheduling).
+# A user has at most SCHEDULER_USER_MAX_IN_FLIGHT jobs running or queued per unit of weight; users in a
+# group named in SCHEDULER_PLAN_WEIGHTS get that weight, others 1. SCHEDULER_MAX_IN_FLIGHT bounds all of
+# them together and should be about what the workers run at once, so that the turns are taken here.
+SCHEDULER_MAX_IN_FLIGHT = 32
+SCHEDULER_USER_MAX_IN_FLIGHT = 4
+SCHEDULER_PLAN_WEIGHTS = {}
+SCHEDULER_LOCK_TIMEOUT = 60
+
+# Jobs are put in a lane by their duration at submission: the first lane whose max_duration (seconds) holds them.
+# A lane's capacity, in jobs in flight, is reserved for it, so short clips never wait for long videos. A lane
+# with a queue runs the FFmpeg stages of its jobs on workers of their own (`runworker cpu-short`).
+SCHEDULER_LANES = {
+    "short": {"max_duration": 120, "capacity": 8, "queue": "cpu-short"},
+    "medium": {"max_duration": 1200, "capacity": 12},
+    "long": {"max_duration": None, "capacity": 12},
+}
+# Within a lane the shortest job goes first; every second a job waits counts as this many seconds less media
+SCHEDULER_AGING_RATE = 1.0
+# Processing time a job is expected to take, for its expected completion: seconds per second of media plus overhead
+SCHEDULER_PROCESSING_RATIO = 0.5
+SCHEDULER_PROCESSING_OVERHEAD = 30.0
+# A job in flight longer than SCHEDULER_LEASE_FACTOR times its expected processing time plus SCHEDULER_LEASE_GRACE
+# seconds is taken for lost with its worker and requeued, as is a job whose task failed. Run again, a job resumes
+# from its checkpoints. One released SCHEDULER_MAX_DISPATCHES times is failed instead.
+SCHEDULER_LEASE_FACTOR = 3.0
+SCHEDULER_LEASE_GRACE = 10 * 60
+SCHEDULER_MAX_DISPATCHES = 3
+
+# Releases jobs left waiting when a worker was lost before it could let the next job in, and requeues the jobs
+# a lost worker was running, once their lease has run out (needs `celery beat`)
+CELERY_BEAT_SCHEDULE = {
+    "dispatch-transcriptions": {"task": "transcriber.tasks.dispatch_transcriptions", "schedule": 30.0},
+}
+
+# Worker options per queue, used by `python manage.py runworker <role>`
+WORKER_PRESETS = {
+    "io": {"queues": "io", "pool": "threads", "concurrency": 64},
+    "cpu": {"queues": "cpu", "pool": "prefork", "concurrency": os.cpu_count() or 1, "prefetch-multiplier": 1},
+    "cpu-short": {"queues": "cpu-short", "pool": "prefork", "concurrency": 2, "prefetch-multiplier": 1},
+}
 OPEN_AI_API_KEY = ""
 ASSEMBLY_AI_API_KEY = ""
 GEMINI_API_KEY = ""
+# Gemini API endpoint, None for Google's
+GEMINI_BASE_URL = None
+
+# Chairman audio up to this size is sent inline; larger audio is streamed through the Gemini Files API and
+# the handle reused for CHAIRMAN_FILE_CACHE_TTL (seconds, below the 48 hours the Files API keeps uploads)
+CHAIRMAN_INLINE_AUDIO_MAX_BYTES = 2 * 1024 * 1024
+CHAIRMAN_FILE_CACHE_TTL = 47 * 60 * 60
+CHAIRMAN_FILE_POLL_SECONDS = 1.0
+
+# The chairman answers with scores, winner and confidence only, and is asked again for its reasoning when its
+# confidence is one of CHAIRMAN_EXPLAIN_CONFIDENCES; CHAIRMAN_VERBOSE always asks for the reasoning
+CHAIRMAN_VERBOSE = False
+CHAIRMAN_EXPLAIN_CONFIDENCES = ["low"]
+
+# Chairman verdicts are kept in the database and reused for the same audio, transcripts, model and prompt version
+CHAIRMAN_VERDICT_CACHE_TTL = 30 * 24 * 60 * 60  # seconds, None to keep them until evicted
+CHAIRMAN_VERDICT_CACHE_MAX_ENTRIES = 10_000
+
+# The Gemini chairman is skipped when the provider transcripts agree on at least this share of words (None to always ask);
+# COUNCIL_AGREEMENT_PROVIDER ("openai" or "assembly") is selected then
+COUNCIL_AGREEMENT_THRESHOLD = 0.95
+COUNCIL_AGREEMENT_PROVIDER = "openai"
+# Recordings from COUNCIL_EXCERPT_MIN_SECONDS on (None to always send all) are judged on an excerpt of the regions
+# where the transcripts disagree, padded by COUNCIL_EXCERPT_PADDING seconds around the words' times (all of a
+# segment without word times), unless those cover more than COUNCIL_EXCERPT_MAX_SHARE of the recording
+COUNCIL_EXCERPT_MIN_SECONDS = 120
+COUNCIL_EXCERPT_PADDING = 1.5
+COUNCIL_EXCERPT_MAX_SHARE = 0.5
+
+# Content-addressed cache of audio extracted from uploaded videos
+AUDIO_CACHE_DIR = Path(tempfile.gettempdir()) / "transcriber_audio"
+
+# Pipe FFmpeg output straight into provider uploads instead of extracting to a file first
+AUDIO_STREAMING = False
+
+# Audio longer than CHUNK_MAX_SECONDS is split at silences and its chunks are transcribed in parallel
+CHUNK_MAX_SECONDS = 600
+CHUNK_MIN_SECONDS = 120
+CHUNK_OVERLAP_SECONDS = 1.0
+CHUNK_SILENCE_THRESHOLD = "-35dB"
+CHUNK_SILENCE_MIN_SECONDS = 0.4
+
+# How long a running job stays the one that identical uploads attach to (seconds)
+DEDUP_INFLIGHT_TTL = 6 * 60 * 60
+
+# Responses to requests sent with an Idempotency-Key are returned to retries with the same key (seconds)
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# How long a retry is refused while the first request is still uploading (seconds)
+IDEMPOTENCY_IN_PROGRESS_TTL = 60 * 60
+
+# Reuse transcripts of the same recording re-encoded, matched on an acoustic fingerprint
+FINGERPRINT_ENABLED = True
+FINGERPRINT_MATCH_THRESHOLD = 0.95
+FINGERPRINT_DURATION_TOLERANCE = 1.0
+
+# Uploaded videos are stored here for the jobs; resumable uploads are assembled here until finalized
+UPLOAD_DIR = Path(tempfile.gettempdir()) / "transcriber_uploads"
+UPLOAD_MAX_SIZE = 4 * 1024 * 1024 * 1024  # 4 GB
+# Concurrent finalize requests of an upload are refused for as long as the first may take (seconds)
+UPLOAD_FINALIZE_TIMEOUT = 10 * 60
+
+# Start extracting audio while a Matroska, WebM or fragmented MP4 upload is still streaming in
+UPLOAD_AUDIO_INGEST = False
+UPLOAD_AUDIO_INGEST_QUEUE_CHUNKS = 64  # chunks of 64 KB buffered for FFmpeg before the ingest is abandoned
+
+# Uploaded videos, shared audio, subtitles and stitched videos live in the "blobs" storage, which API and
+# worker nodes must all reach. For an S3-compatible bucket (needs the "s3" extra):
+# {"BACKEND": "transcriber.storage.S3Storage", "OPTIONS": {"bucket_name": "...", "endpoint_url": "..."}}
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "blobs": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": Path(tempfile.gettempdir()) / "transcriber_blobs"},
+    },
+}
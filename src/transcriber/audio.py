@@ -0,0 +1,420 @@
+import hashlib
+import io
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import ffmpeg
+import structlog
+from django.conf import settings
+from django.core.files import File
+
+from .storage import COPY_CHUNK_SIZE, blob_storage
+
+logger = structlog.get_logger(__name__)
+
+
+HASH_CHUNK_SIZE = 1024 * 1024  # 1 MB
+STREAM_CHUNK_SIZE = 64 * 1024  # 64 KB
+
+# (start, end) range of the source in seconds
+Clip = tuple[float, float]
+
+
+@dataclass(frozen=True)
+class AudioProfile:
+    """
+    Encoding an extracted audio artifact is written in.
+    Providers and the chairman declare the profile they want to receive.
+    """
+
+    name: str
+    extension: str
+    codec: str
+    sample_rate: int | None = None  # None keeps the source sample rate
+    channels: int | None = None  # None keeps the source channel layout
+    bitrate: str | None = None
+
+    def output_options(self) -> dict:
+        options = {"acodec": self.codec, "vn": None}
+        if self.sample_rate:
+            options["ar"] = self.sample_rate
+        if self.channels:
+            options["ac"] = self.channels
+        if self.bitrate:
+            options["audio_bitrate"] = self.bitrate
+        return options
+
+
+# Full-rate PCM, as extracted before profiles existed
+PCM_WAV = AudioProfile(name="pcm", extension="wav", codec="pcm_s16le")
+
+# Lossless speech-rate audio, roughly 1/6 of full-rate stereo PCM
+FLAC_16K_MONO = AudioProfile(name="flac-16k-mono", extension="flac", codec="flac", sample_rate=16000, channels=1)
+
+# Lossy speech-rate audio, ~180 KB per minute; an hour stays far below OpenAI's 25 MB request limit
+OPUS_16K_MONO = AudioProfile(
+    name="opus-16k-mono", extension="ogg", codec="libopus", sample_rate=16000, channels=1, bitrate="24k"
+)
+
+# Concurrent readers of the same video wait on a single extraction. A fixed pool of locks, striped by
+# digest, keeps long-lived workers from growing a lock per video they ever saw; two videos sharing a
+# stripe only take turns.
+EXTRACTION_LOCK_STRIPES = 64
+_extraction_locks = [threading.Lock() for _ in range(EXTRACTION_LOCK_STRIPES)]
+
+
+@lru_cache(maxsize=256)
+def _file_sha256(path: str, size: int, mtime_ns: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_sha256(path: str) -> str:
+    """
+    Return the SHA-256 hex digest of a file.
+    Memoized on (path, size, mtime) so repeated lookups for the same video are free.
+    """
+    stat = os.stat(path)
+    return _file_sha256(path, stat.st_size, stat.st_mtime_ns)
+
+
+def _extraction_lock(digest: str) -> threading.Lock:
+    return _extraction_locks[int(digest[:8], 16) % EXTRACTION_LOCK_STRIPES]
+
+
+def _artifact_path(cache_dir: Path, digest: str, profile: AudioProfile, clip: Clip | None) -> Path:
+    if clip:
+        return cache_dir / f"{digest}.{profile.name}.{clip[0]:.3f}-{clip[1]:.3f}.{profile.extension}"
+    return cache_dir / f"{digest}.{profile.name}.{profile.extension}"
+
+
+def _shared_name(artifact: Path) -> str:
+    return f"audio/{artifact.name}"
+
+
+def _fetch_shared(artifact: Path) -> bool:
+    """Copy an artifact another node already extracted from blob storage into the local cache."""
+    storage = blob_storage()
+    name = _shared_name(artifact)
+    if not storage.exists(name):
+        return False
+
+    artifact.parent.mkdir(parents=True, exist_ok=True)
+    partial = artifact.with_name(f"{artifact.stem}.{uuid.uuid4().hex}.partial{artifact.suffix}")
+    with storage.open(name) as source, open(partial, "wb") as f:
+        shutil.copyfileobj(source, f, COPY_CHUNK_SIZE)
+    os.replace(partial, artifact)
+
+    return True
+
+
+def _share(artifact: Path) -> None:
+    """Publish a local artifact to blob storage, for the other nodes working on the same video."""
+    storage = blob_storage()
+    name = _shared_name(artifact)
+    if not storage.exists(name):
+        with open(artifact, "rb") as f:
+            storage.save(name, File(f, name=name))
+
+
+def share_artifact(path: str) -> str:
+    """Publish an artifact of the local audio cache and return its name in blob storage, for tasks on other nodes."""
+    artifact = Path(path)
+    _share(artifact)
+    return _shared_name(artifact)
+
+
+def fetch_artifact(name: str) -> str:
+    """Local path of an artifact shared under `name`, downloaded into the audio cache unless it is there already."""
+    artifact = Path(settings.AUDIO_CACHE_DIR) / Path(name).name
+    if not (artifact.exists() or _fetch_shared(artifact)):
+        raise FileNotFoundError(f"Audio artifact not found in blob storage: {name}")
+    return str(artifact)
+
+
+def _input(video_path: str, clip: Clip | None):
+    if clip:
+        start, end = clip
+        return ffmpeg.input(video_path, ss=start, t=end - start)
+    return ffmpeg.input(video_path)
+
+
+def extract_audio_profiles(
+    video_path: str, profiles: set[AudioProfile], clip: Clip | None = None
+) -> dict[AudioProfile, str]:
+    """
+    Extract audio from video into one artifact per profile and return their paths.
+    With a clip, only the (start, end) range in seconds is extracted.
+
+    Artifacts are content-addressed by the SHA-256 of the video, so every provider
+    and the chairman share them. All missing profiles are encoded from a single
+    FFmpeg decode, and callers racing on the same video wait for the extraction
+    in progress instead of starting their own. Artifacts are also published to
+    blob storage, so other nodes download them instead of decoding again.
+    """
+    cache_dir = Path(settings.AUDIO_CACHE_DIR)
+    digest = file_sha256(video_path)
+    artifacts = {profile: _artifact_path(cache_dir, digest, profile, clip) for profile in profiles}
+
+    missing = [profile for profile, artifact in artifacts.items() if not artifact.exists()]
+    if missing:
+        with _extraction_lock(digest):
+            missing = [
+                profile for profile in missing if not (artifacts[profile].exists() or _fetch_shared(artifacts[profile]))
+            ]
+            if missing:
+                _encode(video_path, {profile: artifacts[profile] for profile in missing}, clip)
+                for profile in missing:
+                    _share(artifacts[profile])
+
+    return {profile: str(artifact) for profile, artifact in artifacts.items()}
+
+
+def extract_audio(video_path: str, profile: AudioProfile = FLAC_16K_MONO, clip: Clip | None = None) -> str:
+    """Extract audio from video into a single profile and return the artifact path."""
+    return extract_audio_profiles(video_path, {profile}, clip)[profile]
+
+
+def extract_excerpt(audio_path: str, clips: list[Clip], profile: AudioProfile) -> str:
+    """
+    Join the (start, end) ranges of an extracted audio artifact into one excerpt and return its path.
+    Excerpts are written next to their source, so the same clips are cut once.
+    """
+    source = Path(audio_path)
+    key = hashlib.sha256(repr(clips).encode()).hexdigest()[:16]
+    artifact = source.with_name(f"{source.stem}.excerpt-{key}.{profile.extension}")
+    if artifact.exists():
+        return str(artifact)
+
+    partial = artifact.with_name(f"{artifact.stem}.{uuid.uuid4().hex}.partial.{profile.extension}")
+    selected = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in clips)
+
+    logger.info("Cutting audio excerpt", audio_path=audio_path, clips=len(clips))
+
+    try:
+        (
+            ffmpeg.input(audio_path)
+            .audio.filter("aselect", selected)
+            # Close the gaps between the clips
+            .filter("asetpts", "N/SR/TB")
+            .output(str(partial), **profile.output_options())
+            .overwrite_output()
+            .run(quiet=True)
+        )
+    except ffmpeg.Error as e:
+        partial.unlink(missing_ok=True)
+        error = e.stderr.decode() if e.stderr else str(e)
+        raise RuntimeError(f"FFmpeg excerpt failed: {error}")
+
+    os.replace(partial, artifact)
+    return str(artifact)
+
+
+def _encode(video_path: str, artifacts: dict[AudioProfile, Path], clip: Clip | None) -> None:
+    cache_dir = next(iter(artifacts.values())).parent
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # Write next to the artifacts and rename, so other processes never see a partial file
+    token = uuid.uuid4().hex
+    partials = {
+        profile: artifact.with_name(f"{artifact.stem}.{token}.partial.{profile.extension}")
+        for profile, artifact in artifacts.items()
+    }
+
+    logger.info(
+        "Extracting audio",
+        video_path=video_path,
+        profiles=[profile.name for profile in artifacts],
+        clip=clip,
+    )
+
+    audio = _input(video_path, clip).audio
+    outputs = [audio.output(str(partial), **profile.output_options()) for profile, partial in partials.items()]
+
+    try:
+        ffmpeg.merge_outputs(*outputs).overwrite_output().run(quiet=True)
+    except ffmpeg.Error as e:
+        for partial in partials.values():
+            partial.unlink(missing_ok=True)
+        error = e.stderr.decode() if e.stderr else str(e)
+        raise RuntimeError(f"FFmpeg conversion failed: {error}")
+
+    for profile, partial in partials.items():
+        os.replace(partial, artifacts[profile])
+
+
+class FFmpegAudioStream(io.RawIOBase):
+    """
+    Read-only, non-seekable byte stream over the stdout of a running FFmpeg process.
+    Iterating yields fixed-size chunks, which is how httpx streams request bodies.
+    """
+
+    def __init__(self, process: subprocess.Popen, name: str):
+        super().__init__()
+        self._process = process
+        self.name = name
+        self.exhausted = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        # readinto1 returns as soon as FFmpeg has produced something, keeping the upload moving
+        count = self._process.stdout.readinto1(buffer)
+        if not count:
+            self.exhausted = True
+        return count
+
+    def __iter__(self) -> Iterator[bytes]:
+        while chunk := self.read(STREAM_CHUNK_SIZE):
+            yield chunk
+
+
+@contextmanager
+def stream_audio(
+    video_path: str, profile: AudioProfile = FLAC_16K_MONO, clip: Clip | None = None
+) -> Iterator[FFmpegAudioStream]:
+    """
+    Extract audio from video into a pipe instead of a file.
+
+    The upload reading the stream overlaps with decoding, and nothing is written to disk.
+    Raises RuntimeError if FFmpeg fails after the stream was fully consumed.
+    """
+    # Extensions of the supported profiles double as FFmpeg muxer names
+    args = _input(video_path, clip).audio.output("pipe:1", format=profile.extension, **profile.output_options()).compile()
+
+    # Spool stderr to a file; a pipe would fill up and stall FFmpeg while nobody reads it
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr)
+        stream = FFmpegAudioStream(process, name=f"audio.{profile.extension}")
+
+        logger.info("Streaming audio", video_path=video_path, profile=profile.name, clip=clip)
+
+        try:
+            yield stream
+        finally:
+            if not stream.exhausted:
+                # Consumer stopped early, FFmpeg would otherwise block on a full pipe
+                process.kill()
+            process.stdout.close()
+            returncode = process.wait()
+
+        if stream.exhausted and returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"FFmpeg conversion failed: {stderr.read().decode(errors='replace')}")
+
+
+class AudioIngest:
+    """
+    Extract audio from a video while it is still being uploaded, for containers FFmpeg can demux from a pipe.
+
+    Uploaded chunks reach FFmpeg through a bounded queue and a feeder thread. If FFmpeg falls
+    behind, the ingest is abandoned rather than slowing the upload down, and the job extracts
+    the audio itself as usual. Finished artifacts land in the content-addressed audio cache
+    and blob storage, keyed by the SHA-256 of the uploaded bytes like any other extraction.
+    """
+
+    def __init__(self, profiles: set[AudioProfile]):
+        self.cache_dir = Path(settings.AUDIO_CACHE_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        token = uuid.uuid4().hex
+        self.partials = {
+            profile: self.cache_dir / f"ingest.{token}.{profile.name}.partial.{profile.extension}" for profile in profiles
+        }
+        self.digest = hashlib.sha256()
+        self.abandoned = False
+
+        audio = ffmpeg.input("pipe:0").audio
+        outputs = [audio.output(str(partial), **profile.output_options()) for profile, partial in self.partials.items()]
+        args = ffmpeg.merge_outputs(*outputs).overwrite_output().compile()
+
+        # Spooled to a file for the same reason as in stream_audio
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr)
+
+        self._queue = queue.Queue(maxsize=settings.UPLOAD_AUDIO_INGEST_QUEUE_CHUNKS)
+        self._feeder = threading.Thread(target=self._feed, daemon=True)
+        self._feeder.start()
+
+        logger.info("Ingesting audio during upload", profiles=[profile.name for profile in profiles])
+
+    def _feed(self) -> None:
+        try:
+            while (chunk := self._queue.get()) is not None:
+                self._process.stdin.write(chunk)
+        except OSError:
+            # FFmpeg exited or was killed; finish() reads its exit status
+            pass
+        finally:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+
+    def write(self, data: bytes) -> None:
+        if self.abandoned:
+            return
+
+        self.digest.update(data)
+        try:
+            self._queue.put_nowait(bytes(data))
+        except queue.Full:
+            self.abandon("FFmpeg fell behind the upload")
+
+    def abandon(self, reason: str) -> None:
+        if self.abandoned:
+            return
+
+        self.abandoned = True
+        try:
+            # Wakes the feeder if it is waiting for data; a full queue means it is blocked on FFmpeg instead
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self._process.kill()
+        self._process.wait()
+        self._stderr.close()
+        for partial in self.partials.values():
+            partial.unlink(missing_ok=True)
+
+        logger.info("Abandoned audio ingest", reason=reason)
+
+    def finish(self) -> dict[AudioProfile, str] | None:
+        """
+        Wait for FFmpeg to drain the queue and move the artifacts into the cache.
+        Returns None if the ingest was abandoned or FFmpeg failed.
+        """
+        if self.abandoned:
+            return None
+
+        self._queue.put(None)
+        self._feeder.join()
+        if self._process.wait() != 0:
+            self._stderr.seek(0)
+            self.abandon(f"FFmpeg conversion failed: {self._stderr.read().decode(errors='replace')}")
+            return None
+        self._stderr.close()
+
+        digest = self.digest.hexdigest()
+        artifacts = {}
+        for profile, partial in self.partials.items():
+            artifact = _artifact_path(self.cache_dir, digest, profile, None)
+            os.replace(partial, artifact)
+            _share(artifact)
+            artifacts[profile] = str(artifact)
+
+        return artifacts
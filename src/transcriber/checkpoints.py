@@ -0,0 +1,44 @@
+import hashlib
+import json
+
+import structlog
+
+from .models.job_checkpoint import CheckpointStage, JobCheckpoint
+from .storage import blob_storage
+
+logger = structlog.get_logger(__name__)
+
+
+def inputs_digest(*inputs) -> str:
+    """Digest of the JSON-serializable inputs of a stage."""
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def load_checkpoint(transcription_id, stage: CheckpointStage, digest: str, key: str = "") -> dict | None:
+    """
+    Return the payload of a valid checkpoint, None when the stage has to run.
+
+    A checkpoint is valid when it was computed from the same inputs and the blob it names, if any,
+    is still in blob storage.
+    """
+    checkpoint = JobCheckpoint.objects.filter(transcription_id=transcription_id, stage=stage, key=key).first()
+    if checkpoint is None or checkpoint.digest != digest:
+        return None
+
+    blob = checkpoint.payload.get("blob")
+    if blob and not blob_storage().exists(blob):
+        return None
+
+    logger.info("Resuming from checkpoint", transcription_id=str(transcription_id), stage=stage, key=key)
+    return checkpoint.payload
+
+
+def save_checkpoint(transcription_id, stage: CheckpointStage, digest: str, payload: dict, key: str = "") -> None:
+    JobCheckpoint.objects.update_or_create(
+        transcription_id=transcription_id, stage=stage, key=key, defaults={"digest": digest, "payload": payload}
+    )
+
+
+def clear_checkpoints(transcription_id, *stages: CheckpointStage) -> None:
+    """Drop the checkpoints of stages whose outputs are persisted for good."""
+    JobCheckpoint.objects.filter(transcription_id=transcription_id, stage__in=stages).delete()
@@ -0,0 +1,161 @@
+import re
+from dataclasses import dataclass
+
+import ffmpeg
+import structlog
+from django.conf import settings
+
+from .audio import FLAC_16K_MONO, Clip, extract_audio
+
+logger = structlog.get_logger(__name__)
+
+
+SILENCE_START_RE = re.compile(r"silence_start: (-?\d+(?:\.\d+)?)")
+SILENCE_END_RE = re.compile(r"silence_end: (-?\d+(?:\.\d+)?)")
+
+
+@dataclass(frozen=True)
+class AudioChunk:
+    """
+    A bounded-length part of the job's audio, on the global timeline in seconds.
+
+    Each chunk owns [start, end); its clip is padded by the overlap on both sides
+    so words cut at a boundary are fully heard by at least one chunk.
+    """
+
+    index: int
+    start: float
+    end: float
+    overlap: float = 0.0
+    last: bool = True
+
+    @property
+    def clip(self) -> Clip | None:
+        """Range of the source to extract, or None when the chunk is the whole audio."""
+        if self.index == 0 and self.last:
+            return None
+        return max(0.0, self.start - self.overlap), self.end + self.overlap
+
+    @property
+    def offset(self) -> float:
+        """Position of the chunk's audio on the global timeline."""
+        return self.clip[0] if self.clip else 0.0
+
+    def owns(self, seconds: float) -> bool:
+        # The first and last chunk own everything before/after them
+        return (self.index == 0 or seconds >= self.start) and (self.last or seconds < self.end)
+
+
+def probe_duration(video_path: str) -> float:
+    try:
+        return float(ffmpeg.probe(video_path)["format"]["duration"])
+    except ffmpeg.Error as e:
+        error = e.stderr.decode() if e.stderr else str(e)
+        raise RuntimeError(f"FFprobe failed: {error}")
+
+
+def detect_silences(audio_path: str) -> list[tuple[float, float]]:
+    """
+    Return (start, end) of every silent stretch, found with FFmpeg's energy-based silencedetect.
+    """
+    try:
+        _, stderr = (
+            ffmpeg.input(audio_path)
+            .filter("silencedetect", noise=settings.CHUNK_SILENCE_THRESHOLD, d=settings.CHUNK_SILENCE_MIN_SECONDS)
+            .output("-", format="null")
+            .run(capture_stderr=True)
+        )
+    except ffmpeg.Error as e:
+        error = e.stderr.decode() if e.stderr else str(e)
+        raise RuntimeError(f"FFmpeg silence detection failed: {error}")
+
+    output = stderr.decode(errors="replace")
+    starts = [float(value) for value in SILENCE_START_RE.findall(output)]
+    ends = [float(value) for value in SILENCE_END_RE.findall(output)]
+
+    # A trailing silence running into the end of the audio has no silence_end
+    return list(zip(starts, ends))
+
+
+def split_at_silences(
+    duration: float,
+    silences: list[tuple[float, float]],
+    max_seconds: float,
+    min_seconds: float,
+    overlap: float,
+) -> list[AudioChunk]:
+    """
+    Split [0, duration] into chunks of at most max_seconds.
+    Each cut is placed in the middle of the latest silence that leaves the chunk
+    at least min_seconds long, or at max_seconds if there is no such silence.
+    """
+    midpoints = sorted((start + end) / 2 for start, end in silences)
+
+    cuts = []
+    start = 0.0
+    while duration - start > max_seconds:
+        candidates = [point for point in midpoints if start + min_seconds <= point <= start + max_seconds]
+        start = candidates[-1] if candidates else start + max_seconds
+        cuts.append(start)
+
+    bounds = [0.0, *cuts, duration]
+    return [
+        AudioChunk(
+            index=index,
+            start=bounds[index],
+            end=bounds[index + 1],
+            overlap=overlap,
+            last=index == len(bounds) - 2,
+        )
+        for index in range(len(bounds) - 1)
+    ]
+
+
+def plan_chunks(video_path: str) -> list[AudioChunk]:
+    """
+    Plan how the job's audio is split for transcription.
+    Audio up to CHUNK_MAX_SECONDS stays a single chunk; nothing is decoded for it.
+    """
+    duration = probe_duration(video_path)
+    if duration <= settings.CHUNK_MAX_SECONDS:
+        return [AudioChunk(index=0, start=0.0, end=duration)]
+
+    silences = detect_silences(extract_audio(video_path, FLAC_16K_MONO))
+    chunks = split_at_silences(
+        duration,
+        silences,
+        max_seconds=settings.CHUNK_MAX_SECONDS,
+        min_seconds=settings.CHUNK_MIN_SECONDS,
+        overlap=settings.CHUNK_OVERLAP_SECONDS,
+    )
+
+    logger.info("Planned audio chunks", video_path=video_path, duration=duration, chunks=len(chunks))
+    return chunks
+
+
+def stitch_segments(chunk_segments: list[tuple[AudioChunk, list[dict]]]) -> list[dict]:
+    """
+    Merge per-chunk segments back onto the global timeline.
+
+    Segment times, and the times of their words, are shifted by the chunk's clip
+    offset. Overlapping audio is transcribed by both neighbours, so a segment is
+    only kept by the chunk that owns its midpoint.
+    """
+    stitched = []
+
+    for chunk, segments in sorted(chunk_segments, key=lambda item: item[0].index):
+        for segment in segments:
+            start = segment["start"] + chunk.offset
+            end = segment["end"] + chunk.offset
+            if not chunk.owns((start + end) / 2):
+                continue
+
+            segment = {**segment, "start": start, "end": end}
+            if "words" in segment:
+                segment["words"] = [
+                    {**word, "start": word["start"] + chunk.offset, "end": word["end"] + chunk.offset}
+                    for word in segment["words"]
+                ]
+            stitched.append(segment)
+
+    return stitched
@@ -0,0 +1,97 @@
+import structlog
+from django.conf import settings
+from django.core.cache import cache
+
+from .models.transcription import Transcription, TranscriptionStatus
+from .models.transcription_data import TranscriptionData
+from .storage import blob_storage
+
+logger = structlog.get_logger(__name__)
+
+
+INFLIGHT_CACHE_KEY = "transcription-inflight:{content_hash}"
+
+
+def find_finished_transcription(content_hash: str) -> Transcription | None:
+    """Return the latest successful job for the same video content, if any."""
+    if not content_hash:
+        return None
+
+    return (
+        Transcription.objects.filter(content_hash=content_hash, status=TranscriptionStatus.SUCCESS, results__isnull=False)
+        .order_by("-created_at")
+        .first()
+    )
+
+
+def claim_inflight(content_hash: str, transcription_id) -> str:
+    """
+    Register a job as the one transcribing this content.
+    Returns the id of the job holding the claim, which is not the caller if one is already running.
+    """
+    key = INFLIGHT_CACHE_KEY.format(content_hash=content_hash)
+
+    # cache.add is atomic, so only one of several concurrent submissions wins
+    while not cache.add(key, str(transcription_id), timeout=settings.DEDUP_INFLIGHT_TTL):
+        leader_id = cache.get(key)
+        if leader_id:
+            return leader_id
+
+    return str(transcription_id)
+
+
+def copy_result(source: Transcription, target: Transcription) -> None:
+    """Satisfy target with the transcript of source, without calling any provider."""
+    data = source.results.order_by("-created_at").first()
+
+    TranscriptionData.objects.get_or_create(
+        transcription=target,
+        defaults={
+            "generated_text": data.generated_text,
+            "segments": data.segments,
+            "used_model": data.used_model,
+            "output_language": data.output_language,
+            "evaluation": data.evaluation,
+        },
+    )
+
+    target.status = TranscriptionStatus.SUCCESS
+    target.save(update_fields=["status"])
+
+
+def resolve_duplicates(transcription: Transcription) -> None:
+    """
+    Hand a finished job's outcome to every job that attached to it while it was running.
+
+    A successful transcript is copied to them. When the job failed, they are detached and go back to
+    the scheduler, each with its own upload, rather than failing with it.
+    """
+    if transcription.content_hash:
+        # Release the claim first; later submissions then find the finished job instead of attaching
+        key = INFLIGHT_CACHE_KEY.format(content_hash=transcription.content_hash)
+        if cache.get(key) == str(transcription.id):
+            cache.delete(key)
+
+    pending = transcription.duplicates.filter(status__in=[TranscriptionStatus.PENDING, TranscriptionStatus.PROCESSING])
+
+    for duplicate in pending:
+        if transcription.status == TranscriptionStatus.SUCCESS:
+            copy_result(transcription, duplicate)
+            if duplicate.video_name:
+                # Its upload was only kept in case the job it waited on failed
+                blob_storage().delete(duplicate.video_name)
+        elif duplicate.video_name:
+            duplicate.duplicate_of = None
+            duplicate.status = TranscriptionStatus.PENDING
+            duplicate.save(update_fields=["duplicate_of", "status"])
+        else:
+            # Attached before uploads were kept, there is nothing to transcribe it from
+            duplicate.status = transcription.status
+            duplicate.save(update_fields=["status"])
+
+        logger.info(
+            "Resolved duplicate transcription",
+            transcription_id=str(duplicate.id),
+            duplicate_of=str(transcription.id),
+            status=str(duplicate.status),
+        )
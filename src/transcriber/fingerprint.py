@@ -0,0 +1,209 @@
+import math
+import re
+from dataclasses import dataclass
+from itertools import product
+
+import ffmpeg
+import structlog
+from django.conf import settings
+from django.db.models import Count
+
+from .audio import FLAC_16K_MONO
+from .models.audio_fingerprint import AudioFingerprint, AudioFingerprintKey
+from .models.transcription import Transcription, TranscriptionStatus
+
+logger = structlog.get_logger(__name__)
+
+
+# Fingerprints are computed from this profile, so every job is compared on the same footing
+FINGERPRINT_PROFILE = FLAC_16K_MONO
+
+FRAME_SECONDS = 0.25
+
+# Index keys are landmarks: onsets (the strongest rise in energy within ANCHOR_RADIUS frames) are anchors,
+# and a key is the spacing of KEY_ANCHORS consecutive anchors. Spacings do not depend on where the recording
+# starts, and onsets survive lossy re-encoding, so keys are taken across the whole recording.
+ANCHOR_RADIUS = 4
+ANCHOR_MIN_RISE = 4  # 2 dB in envelope units, flat stretches (silence, steady tone) have no anchors
+KEY_ANCHORS = 3
+KEY_SPACING_BITS = 8
+# An onset can move by a frame under re-encoding, lookups also try the spacings one frame off
+KEY_SPACING_TOLERANCE = 1
+# Runs of anchors spread over the recording whose keys a lookup queries, bounding it for long recordings
+LOOKUP_ANCHORS = 64
+
+MAX_CANDIDATES = 10
+
+RMS_LEVEL_RE = re.compile(r"lavfi\.astats\.Overall\.RMS_level=(\S+)")
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """
+    Loudness envelope of a recording: one byte per FRAME_SECONDS, in 0.5 dB steps.
+    The envelope survives re-encoding, container changes and bitrate changes.
+    """
+
+    envelope: bytes
+
+    @property
+    def duration(self) -> float:
+        return len(self.envelope) * FRAME_SECONDS
+
+    def anchors(self) -> list[int]:
+        """Frames at which the envelope rises more steeply than anywhere within ANCHOR_RADIUS frames."""
+        deltas = [b - a for a, b in zip(self.envelope, self.envelope[1:])]
+
+        anchors = []
+        for frame, delta in enumerate(deltas):
+            if (
+                delta >= ANCHOR_MIN_RISE
+                and delta == max(deltas[max(0, frame - ANCHOR_RADIUS) : frame + ANCHOR_RADIUS + 1])
+                and (not anchors or frame - anchors[-1] > ANCHOR_RADIUS)
+            ):
+                anchors.append(frame)
+        return anchors
+
+    def _spacings(self) -> list[tuple[int, ...]]:
+        anchors = self.anchors()
+        gaps = [b - a for a, b in zip(anchors, anchors[1:])]
+        spacings = [tuple(gaps[i : i + KEY_ANCHORS]) for i in range(len(gaps) - KEY_ANCHORS + 1)]
+        return [spacing for spacing in spacings if max(spacing) + KEY_SPACING_TOLERANCE < 1 << KEY_SPACING_BITS]
+
+    def index_keys(self) -> list[int]:
+        """Keys of every run of anchors in the recording, stored to look it up by."""
+        return [_landmark_key(spacing) for spacing in self._spacings()]
+
+    def lookup_keys(self) -> list[int]:
+        """
+        Keys to look up candidate matches with: those of up to LOOKUP_ANCHORS runs spread over the recording,
+        each with its spacings up to KEY_SPACING_TOLERANCE frames off.
+        """
+        spacings = self._spacings()
+        step = max(1, len(spacings) / LOOKUP_ANCHORS)
+        sampled = [spacings[int(i * step)] for i in range(min(len(spacings), LOOKUP_ANCHORS))]
+
+        offsets = range(-KEY_SPACING_TOLERANCE, KEY_SPACING_TOLERANCE + 1)
+        return list(
+            {
+                _landmark_key(tuple(gap + offset for gap, offset in zip(spacing, shift)))
+                for spacing in sampled
+                for shift in product(offsets, repeat=KEY_ANCHORS)
+            }
+        )
+
+
+def _landmark_key(spacing: tuple[int, ...]) -> int:
+    key = 0
+    for gap in spacing:
+        key = (key << KEY_SPACING_BITS) | gap
+    return key
+
+
+def compute_fingerprint(audio_path: str) -> Fingerprint:
+    """
+    Fingerprint an audio artifact in FINGERPRINT_PROFILE.
+    FFmpeg measures the RMS level of every frame, so the samples never pass through Python.
+    """
+    samples_per_frame = int(FINGERPRINT_PROFILE.sample_rate * FRAME_SECONDS)
+
+    try:
+        _, stderr = (
+            ffmpeg.input(audio_path)
+            .filter("asetnsamples", n=samples_per_frame, p=0)
+            .filter("astats", metadata=1, reset=1)
+            .filter("ametadata", mode="print", key="lavfi.astats.Overall.RMS_level")
+            .output("-", format="null")
+            .run(capture_stderr=True)
+        )
+    except ffmpeg.Error as e:
+        error = e.stderr.decode() if e.stderr else str(e)
+        raise RuntimeError(f"FFmpeg fingerprinting failed: {error}")
+
+    envelope = bytearray()
+    for level in RMS_LEVEL_RE.findall(stderr.decode(errors="replace")):
+        # Digital silence is reported as -inf
+        db = float(level) if level not in ("-inf", "inf", "nan") else -100.0
+        envelope.append(max(0, min(255, round((db + 100) * 2))))
+
+    return Fingerprint(envelope=bytes(envelope))
+
+
+def _correlation(x, y) -> float:
+    n = min(len(x), len(y))
+    if n < 2:
+        return 0.0
+
+    x, y = x[:n], y[:n]
+    mean_x, mean_y = sum(x) / n, sum(y) / n
+    cov = sum((i - mean_x) * (j - mean_y) for i, j in zip(x, y))
+    var_x = sum((i - mean_x) ** 2 for i in x)
+    var_y = sum((j - mean_y) ** 2 for j in y)
+    if not (var_x and var_y):
+        return 0.0
+    return cov / math.sqrt(var_x * var_y)
+
+
+def similarity(a: bytes, b: bytes) -> float:
+    """
+    Best Pearson correlation of two envelopes, aligned in half frames up to FINGERPRINT_DURATION_TOLERANCE apart,
+    as far as a recording trimmed at the start can be and still match on duration.
+    Correlation ignores overall gain, which re-encoding and normalisation change.
+    """
+    max_shift = math.ceil(settings.FINGERPRINT_DURATION_TOLERANCE / FRAME_SECONDS)
+    # Between two frames, for recordings that start mid-frame of the other
+    halfway = [(i + j) / 2 for i, j in zip(b, b[1:])]
+
+    return max(
+        _correlation(a[max(0, shift) :], y[max(0, -shift) :])
+        for y in (b, halfway)
+        for shift in range(-max_shift, max_shift + 1)
+    )
+
+
+def find_matching_transcription(fingerprint: Fingerprint) -> Transcription | None:
+    """
+    Return a successful job whose audio is the same recording, if one exists.
+
+    Candidates come from an indexed lookup of the fingerprint's keys, restricted
+    to jobs of about the same duration; only those are compared in full.
+    """
+    keys = fingerprint.lookup_keys()
+    if not keys:
+        return None
+
+    tolerance = settings.FINGERPRINT_DURATION_TOLERANCE
+    candidates = (
+        AudioFingerprintKey.objects.filter(
+            key__in=keys,
+            fingerprint__duration__range=(fingerprint.duration - tolerance, fingerprint.duration + tolerance),
+            fingerprint__transcription__status=TranscriptionStatus.SUCCESS,
+        )
+        .values("fingerprint")
+        .annotate(hits=Count("id"))
+        .order_by("-hits")[:MAX_CANDIDATES]
+    )
+
+    for candidate in AudioFingerprint.objects.filter(id__in=[c["fingerprint"] for c in candidates]):
+        score = similarity(fingerprint.envelope, bytes(candidate.envelope))
+        if score >= settings.FINGERPRINT_MATCH_THRESHOLD:
+            logger.info(
+                "Matched audio fingerprint",
+                transcription_id=str(candidate.transcription_id),
+                similarity=round(score, 4),
+            )
+            return candidate.transcription
+
+    return None
+
+
+def store_fingerprint(transcription: Transcription, fingerprint: Fingerprint) -> None:
+    """Index a job's fingerprint; it becomes matchable once the job succeeds."""
+    stored, created = AudioFingerprint.objects.get_or_create(
+        transcription=transcription,
+        defaults={"duration": fingerprint.duration, "envelope": fingerprint.envelope},
+    )
+    if created:
+        AudioFingerprintKey.objects.bulk_create(
+            [AudioFingerprintKey(fingerprint=stored, key=key) for key in set(fingerprint.index_keys())]
+        )
@@ -0,0 +1,57 @@
+import hashlib
+
+import structlog
+from django.conf import settings
+from django.core.cache import cache
+
+logger = structlog.get_logger(__name__)
+
+
+IDEMPOTENCY_CACHE_KEY = "idempotency:{fingerprint}"
+
+# Stored under the key while the first request is still being handled
+IN_PROGRESS = "in-progress"
+
+
+class RequestInProgress(Exception):
+    """A request with the same idempotency key has not finished yet."""
+
+
+def request_fingerprint(user_id, scope: str, key: str) -> str:
+    """Fingerprint of an idempotency key, scoped to the user and endpoint so keys of different clients never clash."""
+    return hashlib.sha256(f"{user_id}:{scope}:{key}".encode()).hexdigest()
+
+
+def claim_request(fingerprint: str) -> dict | None:
+    """
+    Claim a fingerprint for a new request.
+
+    Returns the response stored by an earlier request with the same fingerprint instead, and raises
+    RequestInProgress while that request is still running.
+    """
+    key = IDEMPOTENCY_CACHE_KEY.format(fingerprint=fingerprint)
+
+    # cache.add is atomic, so only one of several concurrent retries goes ahead
+    while not cache.add(key, IN_PROGRESS, timeout=settings.IDEMPOTENCY_IN_PROGRESS_TTL):
+        stored = cache.get(key)
+        if stored == IN_PROGRESS:
+            raise RequestInProgress
+        if stored is not None:
+            logger.info("Replayed idempotent request", fingerprint=fingerprint)
+            return stored
+
+    return None
+
+
+def store_response(fingerprint: str, status: int, data: dict) -> None:
+    """Keep the response of a claimed request, returned to every retry until the key expires."""
+    cache.set(
+        IDEMPOTENCY_CACHE_KEY.format(fingerprint=fingerprint),
+        {"status": status, "data": data},
+        timeout=settings.IDEMPOTENCY_KEY_TTL,
+    )
+
+
+def release_request(fingerprint: str) -> None:
+    """Give up a claim, so that a retry of a request that failed is handled anew."""
+    cache.delete(IDEMPOTENCY_CACHE_KEY.format(fingerprint=fingerprint))
@@ -0,0 +1,59 @@
+import structlog
+
+from .dedup import claim_inflight, copy_result, find_finished_transcription, resolve_duplicates
+from .models.transcription import Transcription, TranscriptionStatus
+from .scheduling import dispatch, lane_of
+from .storage import blob_storage
+from .tasks import start_transcription
+
+logger = structlog.get_logger(__name__)
+
+
+def submit_transcription(user, video_name: str, content_hash: str, duration: float | None = None) -> Transcription:
+    """
+    Create a transcription job for an uploaded video, stored in blob storage under `video_name`, and queue it.
+
+    Identical content is never transcribed twice: a finished transcript of the
+    same bytes is copied, and a submission arriving while the same content is
+    being transcribed attaches to that job instead of starting another.
+    """
+    source = find_finished_transcription(content_hash)
+    if source:
+        transcription = Transcription.objects.create(
+            status=TranscriptionStatus.PENDING, user=user, content_hash=content_hash, duplicate_of=source
+        )
+        copy_result(source, transcription)
+        blob_storage().delete(video_name)
+
+        logger.info("Reused finished transcription", transcription_id=str(transcription.id), source=str(source.id))
+        return transcription
+
+    transcription = Transcription.objects.create(
+        status=TranscriptionStatus.PENDING,
+        user=user,
+        content_hash=content_hash,
+        video_name=video_name,
+        duration=duration,
+        lane=lane_of(duration),
+    )
+
+    leader_id = claim_inflight(content_hash, transcription.id)
+    if leader_id != str(transcription.id):
+        # The upload is kept until the leader succeeds, if it fails this job is transcribed on its own
+        transcription.duplicate_of_id = leader_id
+        transcription.save(update_fields=["duplicate_of"])
+
+        # The leader may have finished before this job attached to it
+        leader = Transcription.objects.get(id=leader_id)
+        if leader.status in (TranscriptionStatus.SUCCESS, TranscriptionStatus.FAILED):
+            resolve_duplicates(leader)
+            dispatch(start_transcription)
+
+        logger.info("Attached to in-flight transcription", transcription_id=str(transcription.id), leader=leader_id)
+        transcription.refresh_from_db()
+        return transcription
+
+    # Queued behind the user's other jobs, the scheduler starts it when its turn comes
+    dispatch(start_transcription)
+    transcription.refresh_from_db()
+    return transcription
@@ -0,0 +1,189 @@
+import re
+from difflib import SequenceMatcher
+
+import structlog
+from django.conf import settings
+
+logger = structlog.get_logger(__name__)
+
+
+# Words, with inner apostrophes kept ("don't"); case and punctuation are left to the chairman to judge
+WORD_PATTERN = re.compile(r"\w+(?:'\w+)*")
+
+PROVIDER_NAMES = {"openai": "OpenAI", "assembly": "AssemblyAI"}
+
+
+def normalize_tokens(text: str) -> list[str]:
+    return WORD_PATTERN.findall(text.lower())
+
+
+def word_edit_distance(a: list[str], b: list[str]) -> int:
+    """
+    Levenshtein distance between two token sequences: the words substituted, inserted and deleted.
+
+    Bit-parallel (Myers, in Hyyrö's formulation), one column of the alignment per word of `b` in a
+    single integer, so an hour of speech is compared in milliseconds rather than a quadratic loop.
+    """
+    if not a:
+        return len(b)
+
+    match = {}
+    for i, token in enumerate(a):
+        match[token] = match.get(token, 0) | 1 << i
+
+    full = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    positive, negative = full, 0
+    distance = len(a)
+
+    for token in b:
+        eq = match.get(token, 0)
+        xv = eq | negative
+        xh = (((eq & positive) + positive) ^ positive) | eq
+        horizontal_positive = (negative | ~(xh | positive)) & full
+        horizontal_negative = positive & xh
+
+        if horizontal_positive & last:
+            distance += 1
+        elif horizontal_negative & last:
+            distance -= 1
+
+        # Every column of the first row is one more than the last, hence the carried-in 1
+        horizontal_positive = (horizontal_positive << 1) | 1
+        horizontal_negative = horizontal_negative << 1
+        positive = (horizontal_negative | ~(xv | horizontal_positive)) & full
+        negative = horizontal_positive & xv & full
+
+    return distance
+
+
+def transcript_agreement(a: str, b: str) -> tuple[float, int, int]:
+    """Share of words two transcripts agree on (1 - WER over the longer one), with the edit distance and word count."""
+    tokens_a, tokens_b = normalize_tokens(a), normalize_tokens(b)
+    words = max(len(tokens_a), len(tokens_b))
+    if not words:
+        return 1.0, 0, 0
+
+    distance = word_edit_distance(tokens_a, tokens_b)
+    return 1 - distance / words, distance, words
+
+
+def agreement_evaluation(openai_result: dict | None, assemblyai_result: dict | None) -> dict | None:
+    """
+    An evaluation in the chairman's format when both providers agree closely enough to skip it, else None.
+
+    Transcripts at or above COUNCIL_AGREEMENT_THRESHOLD differ in a few words at most, which the chairman
+    would have to settle from the audio for a negligible difference, so COUNCIL_AGREEMENT_PROVIDER wins,
+    for a deterministic and explainable result.
+    """
+    threshold = settings.COUNCIL_AGREEMENT_THRESHOLD
+    if threshold is None or not openai_result or not assemblyai_result:
+        return None
+
+    agreement, distance, words = transcript_agreement(openai_result["generated_text"], assemblyai_result["generated_text"])
+    if agreement < threshold:
+        logger.info("Providers disagree, asking the chairman", agreement=round(agreement, 4), distance=distance)
+        return None
+
+    provider = settings.COUNCIL_AGREEMENT_PROVIDER
+    winner = "A" if provider == "openai" else "B"
+    logger.info("Providers agree, chairman skipped", agreement=round(agreement, 4), distance=distance, winner=provider)
+
+    return {
+        "comparison": {"winner": winner, "confidence": "high", "score_difference": 0},
+        "final_reasoning": (
+            f"The transcripts agree on {agreement:.1%} of words ({distance} word edits over {words} words), "
+            f"at or above the {threshold:.0%} threshold; the preferred {PROVIDER_NAMES[provider]} transcript "
+            "was selected without a chairman evaluation."
+        ),
+        "agreement": round(agreement, 4),
+        "method": "local-agreement",
+    }
+
+
+def timed_tokens(result: dict) -> list[tuple[str, float, float]]:
+    """
+    Normalized words of a result with the (start, end) they were spoken in, from the word times of their
+    segment. A segment without word times could have any of its words anywhere in it, so its words are
+    given the whole segment, and an excerpt of them holds all of it rather than a guess that may miss the word.
+    """
+    tokens = []
+    for segment in result.get("segments") or []:
+        if segment.get("words"):
+            tokens.extend(
+                (token, word["start"], word["end"]) for word in segment["words"] for token in normalize_tokens(word["text"])
+            )
+        else:
+            tokens.extend((token, segment["start"], segment["end"]) for token in normalize_tokens(segment["text"]))
+    return tokens
+
+
+def _snippet(result: dict, start: float, end: float) -> str:
+    # Segments as the provider wrote them, punctuation included, for the chairman to judge
+    return " ".join(
+        segment["text"] for segment in result.get("segments") or [] if segment["end"] > start and segment["start"] < end
+    )
+
+
+def disagreement_excerpt(openai_result: dict | None, assemblyai_result: dict | None) -> list[dict] | None:
+    """
+    The regions of a long recording where the two transcripts diverge, for the chairman to judge instead of
+    the whole audio; None when it should hear all of it.
+
+    The word timelines are aligned and every stretch that is not identical becomes a region, padded by
+    COUNCIL_EXCERPT_PADDING seconds and merged with its neighbours. Each region has its (start, end) in the
+    recording, its offset in the excerpt the regions are joined into and both transcripts' text of it.
+    Recordings shorter than COUNCIL_EXCERPT_MIN_SECONDS are heard whole, as are those disagreeing over
+    more than COUNCIL_EXCERPT_MAX_SHARE of their length, where an excerpt would save little.
+    """
+    min_seconds = settings.COUNCIL_EXCERPT_MIN_SECONDS
+    if min_seconds is None or not openai_result or not assemblyai_result:
+        return None
+
+    a, b = timed_tokens(openai_result), timed_tokens(assemblyai_result)
+    if not a or not b:
+        # Without timestamps there is nothing to cut by
+        return None
+
+    duration = max(a[-1][2], b[-1][2])
+    if duration < min_seconds:
+        return None
+
+    padding = settings.COUNCIL_EXCERPT_PADDING
+    matcher = SequenceMatcher(None, [token[0] for token in a], [token[0] for token in b], autojunk=False)
+    windows = []
+    for tag, a_start, a_end, b_start, b_end in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        # Words missing on one side are placed where the other side has them
+        times = [time for token in a[a_start:a_end] + b[b_start:b_end] for time in token[1:]]
+        start, end = max(min(times) - padding, 0.0), min(max(times) + padding, duration)
+        if windows and start <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], end)
+        else:
+            windows.append([start, end])
+
+    if not windows:
+        return None
+
+    covered = sum(end - start for start, end in windows)
+    if covered > settings.COUNCIL_EXCERPT_MAX_SHARE * duration:
+        logger.info("Transcripts disagree throughout, the chairman hears all", covered=round(covered, 1))
+        return None
+
+    regions = []
+    offset = 0.0
+    for start, end in windows:
+        regions.append(
+            {
+                "start": round(start, 3),
+                "end": round(end, 3),
+                "offset": round(offset, 3),
+                "a": _snippet(openai_result, start, end),
+                "b": _snippet(assemblyai_result, start, end),
+            }
+        )
+        offset += end - start
+
+    logger.info("Chairman hears the disagreements only", regions=len(regions), seconds=round(covered, 1))
+    return regions
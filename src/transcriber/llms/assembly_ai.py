@@ -1,22 +1,39 @@
+import asyncio
 from typing import Any
 
 import assemblyai as aai
 
 from backend import settings
 
+from ..audio import FLAC_16K_MONO
 from .base import TranscriberLLM
+from .runtime import shared_client
 
 
 class AssemblyTranscriberLLM(TranscriberLLM):
     API_KEY = settings.ASSEMBLY_AI_API_KEY
+    AUDIO_PROFILE = FLAC_16K_MONO
+    SUPPORTS_STREAMING = True
 
     @property
     def provider_name(self):
         return "assemblyai"
 
-    def transcribe(self) -> dict:
-        aai.settings.api_key = self.API_KEY
-        config = aai.TranscriptionConfig(
+    @classmethod
+    def transcriber(cls) -> aai.Transcriber:
+        # A client of its own instead of the SDK's global settings, which every call used to overwrite
+        return shared_client(
+            ("assemblyai", cls.API_KEY),
+            lambda: aai.Transcriber(client=aai.Client(settings=aai.Settings(api_key=cls.API_KEY))),
+        )
+
+    @classmethod
+    async def awarm_up(cls) -> None:
+        # The SDK keeps its own connection pool, creating the client is all that can be done ahead
+        cls.transcriber()
+
+    def _config(self) -> aai.TranscriptionConfig:
+        return aai.TranscriptionConfig(
             speech_models=["universal"],
             auto_highlights=False,
             entity_detection=False,
@@ -25,8 +42,8 @@ class AssemblyTranscriberLLM(TranscriberLLM):
             speaker_labels=False,
             summarization=False,
         )
-        transcript = aai.Transcriber(config=config).transcribe(self.audio_path)
 
+    def _result(self, transcript: aai.Transcript) -> dict:
         if transcript.status == "error":
             raise RuntimeError(transcript.error)
 
@@ -36,6 +53,22 @@ class AssemblyTranscriberLLM(TranscriberLLM):
             "words": transcript.words,
         }
 
+    def transcribe(self) -> dict:
+        with self.open_audio() as f:
+            transcript = self.transcriber().transcribe(f, config=self._config())
+
+        return self._result(transcript)
+
+    async def atranscribe(self) -> dict:
+        if self.streams_audio:
+            return await super().atranscribe()
+
+        # The SDK has no asyncio client; its future polls on the SDK's own threads while the loop moves on
+        audio_path = await self.aaudio_path()
+        transcript = await asyncio.wrap_future(self.transcriber().transcribe_async(audio_path, config=self._config()))
+
+        return self._result(transcript)
+
     def extract_text(self, result: Any) -> str:
         return result.get("transcript", "")
 
@@ -1,8 +1,14 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, BinaryIO
 
-import ffmpeg
 import structlog
+from django.conf import settings
+
+from ..audio import FLAC_16K_MONO, AudioProfile, Clip, extract_audio, stream_audio
+from ..chunking import AudioChunk
 
 logger = structlog.get_logger(__name__)
 
@@ -15,8 +21,18 @@ class TranscriberLLM(ABC):
 
     API_KEY = None
 
-    def __init__(self, video_path: str):
+    # Encoding the provider wants its audio in; artifacts are shared between providers with the same profile
+    AUDIO_PROFILE: AudioProfile = FLAC_16K_MONO
+
+    # Whether the provider's upload accepts a non-seekable byte stream
+    SUPPORTS_STREAMING = False
+
+    def __init__(self, video_path: str | None, chunk: AudioChunk | None = None, audio_path: str | None = None):
         self.video_path = video_path
+        # Part of the audio this instance transcribes; the whole audio when not set
+        self.chunk = chunk
+        # Audio already extracted for this instance (see tasks.handle_transcripts), the video is not read then
+        self._audio_path = audio_path
 
     @classmethod
     def is_configured(cls) -> bool:
@@ -32,6 +48,11 @@ class TranscriberLLM(ABC):
             return False
         return True
 
+    @classmethod
+    async def awarm_up(cls) -> None:
+        """Create the provider's client of this process and open its connections ahead of the first job."""
+        pass
+
     @property
     @abstractmethod
     def provider_name(self) -> str:
@@ -40,27 +61,47 @@ class TranscriberLLM(ABC):
 
     @property
     def audio_path(self) -> str:
-        """Extract audio from video into WAV using FFmpeg."""
-        audio_path = self.video_path.rsplit(".", 1)[0] + ".wav"
-
-        try:
-            (
-                ffmpeg.input(self.video_path)
-                .output(audio_path, acodec="pcm_s16le", vn=None)
-                .overwrite_output()
-                .run(quiet=True)
-            )
-        except ffmpeg.Error as e:
-            error = e.stderr.decode() if e.stderr else str(e)
-            raise RuntimeError(f"FFmpeg conversion failed: {error}")
+        """Path of the job's extracted audio, shared by all providers of the same video."""
+        if self._audio_path:
+            return self._audio_path
+        return extract_audio(self.video_path, self.AUDIO_PROFILE, self.clip)
 
-        return audio_path
+    @property
+    def clip(self) -> Clip | None:
+        """Range of the source audio this instance transcribes, None for the whole audio."""
+        return self.chunk.clip if self.chunk else None
+
+    @property
+    def streams_audio(self) -> bool:
+        """True if uploads read straight from FFmpeg instead of the extracted artifact."""
+        return settings.AUDIO_STREAMING and self.SUPPORTS_STREAMING and not self._audio_path
+
+    @contextmanager
+    def open_audio(self) -> Iterator[BinaryIO]:
+        """Open the job's audio for upload."""
+        if self.streams_audio:
+            with stream_audio(self.video_path, self.AUDIO_PROFILE, self.clip) as stream:
+                yield stream
+        else:
+            with open(self.audio_path, "rb") as f:
+                yield f
 
     @abstractmethod
     def transcribe(self) -> dict:
         """Return a JSON-serializable dict containing transcript result."""
         pass
 
+    async def atranscribe(self) -> dict:
+        """
+        Async variant of transcribe(), run on the event loop of the worker process.
+        Providers without an async client transcribe on a thread of their own.
+        """
+        return await asyncio.to_thread(self.transcribe)
+
+    async def aaudio_path(self) -> str:
+        """audio_path without blocking the event loop while FFmpeg extracts the audio."""
+        return await asyncio.to_thread(lambda: self.audio_path)
+
     @abstractmethod
     def extract_text(self, result: Any) -> str:
         """Extract the transcription text from provider output."""
@@ -1,20 +1,44 @@
+import asyncio
 import json
+from functools import cached_property
 from pathlib import Path
 from typing import Dict
 
 import structlog
 from django.conf import settings
+from django.core.cache import cache
 from google import genai
-from google.genai import types
+from google.genai import errors, types
+
+from ..audio import OPUS_16K_MONO, extract_excerpt, file_sha256
+from .agreement import agreement_evaluation, disagreement_excerpt
+from .runtime import http_client, run, shared_client
+from .verdicts import cached_verdict, store_verdict, transcript_hash, verdict_key
 
 logger = structlog.get_logger(__name__)
 
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/"
+
+# Handle of audio uploaded through the Files API, by content, so retries and re-evaluations reuse it
+GEMINI_FILE_CACHE_KEY = "gemini-file:{digest}"
+
+# Statuses of a request naming a file the Files API no longer has
+STALE_FILE_CODES = (400, 403, 404)
+
 
 # Configuration for Chairman to be used
 class TranscriptionCouncilConfig:
     CHAIRMAN_MODEL = "gemini-2.5-flash"
     GEMINI_API_KEY = settings.GEMINI_API_KEY
 
+    # Raise with every change to the evaluation prompt, verdicts of other versions are not reused
+    PROMPT_VERSION = 2
+
+    CONFIDENCE_LEVELS = ["high", "medium", "low"]
+
+    # Inline audio counts against the request size, so the chairman listens to compact speech-rate audio
+    AUDIO_PROFILE = OPUS_16K_MONO
+
     SUPPORTED_AUDIO_FORMATS = {
         "wav": "audio/wav",
         "mp3": "audio/mpeg",
@@ -50,44 +74,149 @@ class GeminiChairmanEvaluator:
     """
 
     def __init__(self, api_key: str | None = None):
-        self.client = genai.Client(api_key=api_key or TranscriptionCouncilConfig.GEMINI_API_KEY)
+        self.client = self.shared_client(api_key or TranscriptionCouncilConfig.GEMINI_API_KEY)
         self.audio_handler = AudioFileHandler()
 
+    @staticmethod
+    def shared_client(api_key: str) -> genai.Client:
+        base_url = settings.GEMINI_BASE_URL
+        return shared_client(
+            ("gemini", api_key, base_url),
+            # Async requests go through the connection pool the providers share
+            lambda: genai.Client(
+                api_key=api_key, http_options=types.HttpOptions(base_url=base_url, httpx_async_client=http_client())
+            ),
+        )
+
+    @classmethod
+    async def awarm_up(cls, api_key: str) -> None:
+        """Create the chairman's client of this process and open its connection ahead of the first job."""
+        cls.shared_client(api_key)
+        await http_client().head(settings.GEMINI_BASE_URL or GEMINI_API_URL)
+
+    async def aupload_audio(self, audio_file_path: str, mime_type: str) -> types.Part:
+        """
+        Upload audio through the Files API, which streams it in chunks, and return a part referencing it.
+
+        The handle is cached by the audio's content hash for CHAIRMAN_FILE_CACHE_TTL, below the time the
+        Files API keeps uploads, so the same audio is uploaded once however often it is evaluated.
+        """
+        key = GEMINI_FILE_CACHE_KEY.format(digest=await asyncio.to_thread(file_sha256, audio_file_path))
+
+        handle = cache.get(key)
+        if handle is None:
+            uploaded = await self.client.aio.files.upload(
+                file=audio_file_path, config=types.UploadFileConfig(mime_type=mime_type)
+            )
+            while uploaded.state == types.FileState.PROCESSING:
+                await asyncio.sleep(settings.CHAIRMAN_FILE_POLL_SECONDS)
+                uploaded = await self.client.aio.files.get(name=uploaded.name)
+            if uploaded.state == types.FileState.FAILED:
+                raise ValueError(f"Gemini could not process the uploaded audio: {uploaded.error}")
+
+            handle = {"name": uploaded.name, "uri": uploaded.uri, "mime_type": uploaded.mime_type or mime_type}
+            cache.set(key, handle, timeout=settings.CHAIRMAN_FILE_CACHE_TTL)
+            logger.info("Uploaded audio for the chairman", file=uploaded.name, size=uploaded.size_bytes)
+
+        return types.Part.from_uri(file_uri=handle["uri"], mime_type=handle["mime_type"])
+
+    async def aaudio_part(self, audio_file_path: str) -> types.Part:
+        """The audio for a request: small files inline, larger ones uploaded instead of read into memory."""
+        mime_type = self.audio_handler.get_mime_type(audio_file_path)
+
+        if Path(audio_file_path).stat().st_size <= settings.CHAIRMAN_INLINE_AUDIO_MAX_BYTES:
+            audio_bytes = await asyncio.to_thread(Path(audio_file_path).read_bytes)
+            return types.Part.from_bytes(data=audio_bytes, mime_type=mime_type)
+
+        return await self.aupload_audio(audio_file_path, mime_type)
+
+    @staticmethod
+    def compact_response_schema(candidates: list[str]) -> types.Schema:
+        """Scores from 0 to 10 per criterion of every candidate, the winner and the confidence, nothing else."""
+        criteria = list(TranscriptionCouncilConfig.CRITERIA_WEIGHTS)
+        scores = types.Schema(
+            type=types.Type.OBJECT,
+            properties={criterion: types.Schema(type=types.Type.INTEGER, minimum=0, maximum=10) for criterion in criteria},
+            required=criteria,
+        )
+        comparison = types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "winner": types.Schema(type=types.Type.STRING, enum=candidates),
+                "confidence": types.Schema(type=types.Type.STRING, enum=TranscriptionCouncilConfig.CONFIDENCE_LEVELS),
+            },
+            required=["winner", "confidence"],
+        )
+        return types.Schema(
+            type=types.Type.OBJECT,
+            properties={**{candidate: scores for candidate in candidates}, "comparison": comparison},
+            required=[*candidates, "comparison"],
+            property_ordering=[*candidates, "comparison"],
+        )
+
+    async def _agenerate(
+        self, audio_part: types.Part, prompt: str, schema: types.Schema | None
+    ) -> types.GenerateContentResponse:
+        return await self.client.aio.models.generate_content(
+            model=TranscriptionCouncilConfig.CHAIRMAN_MODEL,
+            contents=[types.Content(parts=[audio_part, types.Part.from_text(text=prompt)])],
+            config=types.GenerateContentConfig(
+                temperature=0.3,
+                # Constrained decoding, the compact answer cannot grow reasoning the parser would throw away
+                response_mime_type="application/json" if schema else None,
+                response_schema=schema,
+            ),
+        )
+
     def evaluate_transcriptions(
         self,
         audio_file_path: str,
         audio_context: str,
         openai_result: dict | None = None,
         assemblyai_result: dict | None = None,
+        excerpt: list[dict] | None = None,
+        verbose: bool = False,
     ) -> dict:
+        return run(
+            self.aevaluate_transcriptions(audio_file_path, audio_context, openai_result, assemblyai_result, excerpt, verbose)
+        )
+
+    async def aevaluate_transcriptions(
+        self,
+        audio_file_path: str,
+        audio_context: str,
+        openai_result: dict | None = None,
+        assemblyai_result: dict | None = None,
+        excerpt: list[dict] | None = None,
+        verbose: bool = False,
+    ) -> dict:
+        """
+        Let Gemini judge the transcripts against the audio. With an excerpt (see agreement.disagreement_excerpt),
+        the audio holds only the regions where they disagree and the prompt the transcripts' text of them.
+
+        Unless verbose, the answer is constrained to the scores, winner and confidence the selection uses,
+        which takes a fraction of the output tokens and time of the reasoning.
+        """
         if not self.audio_handler.validate_audio_file(audio_file_path):
             raise ValueError("Unsupported audio format")
 
-        mime_type = self.audio_handler.get_mime_type(audio_file_path)
-
-        # Read audio bytes
-        audio_bytes = Path(audio_file_path).read_bytes()
+        audio_part = await self.aaudio_part(audio_file_path)
 
-        prompt = self._create_evaluation_prompt(audio_context, openai_result, assemblyai_result)
+        prompt = self._create_evaluation_prompt(audio_context, openai_result, assemblyai_result, excerpt, verbose)
+        candidates = [label for label, result in (("A", openai_result), ("B", assemblyai_result)) if result]
+        schema = None if verbose else self.compact_response_schema(candidates)
 
-        logger.info("Gemini Chairman is evaluating transcripts")
+        logger.info("Gemini Chairman is evaluating transcripts", verbose=verbose)
 
-        # Upload the audio file with prompt for evaluation
-        response = self.client.models.generate_content(
-            model=TranscriptionCouncilConfig.CHAIRMAN_MODEL,
-            contents=[
-                types.Content(
-                    parts=[
-                        types.Part.from_bytes(
-                            data=audio_bytes,
-                            mime_type=mime_type,
-                        ),
-                        types.Part.from_text(text=prompt),
-                    ]
-                )
-            ],
-            config=types.GenerateContentConfig(temperature=0.3),
-        )
+        try:
+            response = await self._agenerate(audio_part, prompt, schema)
+        except errors.ClientError as e:
+            if audio_part.file_data is None or e.code not in STALE_FILE_CODES:
+                raise
+            # The cached upload has expired or was deleted, upload the audio again
+            logger.warning("Uploaded chairman audio is gone", file=audio_part.file_data.file_uri, error=str(e))
+            cache.delete(GEMINI_FILE_CACHE_KEY.format(digest=await asyncio.to_thread(file_sha256, audio_file_path)))
+            response = await self._agenerate(await self.aaudio_part(audio_file_path), prompt, schema)
 
         return self._parse_evaluation(response.text)
 
@@ -97,6 +226,8 @@ class GeminiChairmanEvaluator:
         audio_context: str,
         openai_result: dict | None = None,
         assemblyai_result: dict | None = None,
+        excerpt: list[dict] | None = None,
+        verbose: bool = True,
     ) -> str:
         """
         Create an evaluation prompt for the chairman model (Gemini).
@@ -138,6 +269,26 @@ class GeminiChairmanEvaluator:
     """
         )
 
+        # ------------------------------------------------------------------
+        # Disagreement excerpt
+        # ------------------------------------------------------------------
+        if excerpt:
+            regions = "\n".join(
+                f"""
+    Region {number} (excerpt {region["offset"]:.1f}s, recording {region["start"]:.1f}s-{region["end"]:.1f}s):
+    A: "{region["a"]}"
+    B: "{region["b"]}"
+    """
+                for number, region in enumerate(excerpt, 1)
+            )
+            sections.append(
+                f"""DISAGREEMENT EXCERPT:
+    The transcriptions are identical word for word outside the regions below.
+    The audio holds ONLY these regions, joined one after the other in this order.
+    Judge the transcriptions on these regions; treat everything else as correct in both.
+    {regions}"""
+            )
+
         available_transcriptions: list[str] = []
 
         # ------------------------------------------------------------------
@@ -207,12 +358,28 @@ class GeminiChairmanEvaluator:
     Then:
     - Choose the BEST transcription overall
     - Clearly explain why it is superior
+    """
+                if verbose
+                else """EVALUATION INSTRUCTIONS:
+    Two transcriptions are provided.
+
+    Assess EACH transcription against the audio, then choose the BEST transcription overall.
     """
             )
 
         # ------------------------------------------------------------------
         # Required JSON response format
         # ------------------------------------------------------------------
+        if not verbose:
+            sections.append(
+                f"""RESPONSE:
+    Score each transcription from 0 to 10 on each criterion: {", ".join(TranscriptionCouncilConfig.CRITERIA_WEIGHTS)}.
+    Then name the winner and how confident you are ({"/".join(TranscriptionCouncilConfig.CONFIDENCE_LEVELS)}).
+    Answer with the scores only, in the JSON schema given, without any reasoning.
+    """
+            )
+            return "\n".join(sections)
+
         sections.append(
             """YOUR RESPONSE MUST BE IN THIS EXACT JSON FORMAT (respond ONLY with valid JSON, no other text):
     
@@ -334,19 +501,25 @@ class GeminiChairmanEvaluator:
 
             weights = TranscriptionCouncilConfig.CRITERIA_WEIGHTS
 
+            # Only the candidates the chairman was given are scored, a single one when the other provider dropped out
+            totals = []
             for key in ("A", "B"):
                 if key in evaluation:
                     total = 0.0
                     for criterion, weight in weights.items():
-                        score = evaluation[key].get(criterion, {}).get("score", 0)
+                        # Compact answers hold the bare score, verbose ones the score with its reasoning
+                        score = evaluation[key].get(criterion, 0)
+                        if isinstance(score, dict):
+                            score = score.get("score", 0)
                         total += score * weight
                     evaluation[key]["total_score"] = round(total, 2)
+                    totals.append(total)
 
-            a = evaluation["A"]["total_score"]
-            b = evaluation["B"]["total_score"]
+            if not totals:
+                raise ValueError("No candidate was scored")
 
             evaluation.setdefault("comparison", {})
-            evaluation["comparison"]["score_difference"] = round(abs(a - b), 2)
+            evaluation["comparison"]["score_difference"] = round(max(totals) - min(totals), 2)
 
             return evaluation
 
@@ -360,7 +533,12 @@ class GeminiChairmanEvaluator:
 
 class TranscriptionCouncil:
     def __init__(self, gemini_api_key: str | None = None):
-        self.chairman = GeminiChairmanEvaluator(gemini_api_key)
+        self.gemini_api_key = gemini_api_key
+
+    @cached_property
+    def chairman(self) -> GeminiChairmanEvaluator:
+        # Created once the providers disagree, agreeing ones are settled without a Gemini client
+        return GeminiChairmanEvaluator(self.gemini_api_key)
 
     def _prepare_audio_context(self, audio_file_path: str, metadata: Dict = None) -> str:
         """Prepare context information about the audio."""
@@ -383,24 +561,80 @@ class TranscriptionCouncil:
 
         return "\n".join(context_parts)
 
-    def select_best_transcription(
+    def _evaluate(
         self,
         audio_file_path: str,
-        openai_result: dict | None = None,
-        assemblyai_result: dict | None = None,
-        audio_metadata: dict | None = None,
-    ) -> tuple[dict, dict]:
-        audio_context = self._prepare_audio_context(audio_file_path, audio_metadata)
+        openai_result: dict | None,
+        assemblyai_result: dict | None,
+        audio_metadata: dict | None,
+        excerpt: list[dict] | None,
+        verbose: bool,
+    ) -> dict:
+        """The chairman's evaluation, reused from an earlier call with the same inputs when there is one."""
+        config = TranscriptionCouncilConfig
+        audio_hash = file_sha256(audio_file_path)
+        transcripts = {"A": transcript_hash(openai_result), "B": transcript_hash(assemblyai_result)}
+        key = verdict_key(
+            audio_hash, transcripts, config.CHAIRMAN_MODEL, config.CRITERIA_WEIGHTS, config.PROMPT_VERSION, verbose
+        )
+
+        evaluation = cached_verdict(key)
+        if evaluation is not None:
+            return evaluation
 
+        audio_context = self._prepare_audio_context(audio_file_path, audio_metadata)
         evaluation = self.chairman.evaluate_transcriptions(
             audio_file_path,
             audio_context,
             openai_result,
             assemblyai_result,
+            excerpt,
+            verbose,
         )
 
-        # As fallback, use A as winner
-        winner = evaluation.get("comparison", {}).get("winner", "A")
+        # An unparsable answer is worth asking again
+        if "error" not in evaluation:
+            store_verdict(key, evaluation, audio_hash, transcripts, config.CHAIRMAN_MODEL, config.PROMPT_VERSION, verbose)
+        return evaluation
+
+    def select_best_transcription(
+        self,
+        audio_file_path: str,
+        openai_result: dict | None = None,
+        assemblyai_result: dict | None = None,
+        audio_metadata: dict | None = None,
+        verbose: bool | None = None,
+        excerpt: list[dict] | None = None,
+    ) -> tuple[dict, dict]:
+        """
+        Select the best transcript and return it, with the evaluation stored on it, and the full evaluation.
+        `audio_file_path` and `excerpt` are what prepare_council_audio returned for the two transcripts.
+
+        The chairman answers with scores only, and is asked again for its reasoning when its confidence is
+        one of CHAIRMAN_EXPLAIN_CONFIDENCES. `verbose` asks for the reasoning up front; it defaults to
+        CHAIRMAN_VERBOSE.
+        """
+        if verbose is None:
+            verbose = settings.CHAIRMAN_VERBOSE
+
+        # The chairman only listens to the audio when the providers really disagree
+        evaluation = agreement_evaluation(openai_result, assemblyai_result)
+
+        if evaluation is None:
+            args = (audio_file_path, openai_result, assemblyai_result, audio_metadata, excerpt)
+            evaluation = self._evaluate(*args, verbose)
+
+            # An unparsable answer has no verdict to explain, asking again would pay for it twice
+            confidence = evaluation.get("comparison", {}).get("confidence")
+            if not verbose and "error" not in evaluation and confidence in settings.CHAIRMAN_EXPLAIN_CONFIDENCES:
+                logger.info("Asking the chairman to explain its verdict", confidence=confidence)
+                evaluation = self._evaluate(*args, True)
+
+        # As fallback, or when the chairman named a candidate it was not given, the first present one wins
+        present = [label for label, result in (("A", openai_result), ("B", assemblyai_result)) if result]
+        winner = evaluation.get("comparison", {}).get("winner")
+        if winner not in present:
+            winner = present[0]
 
         # Set winner and provider. Chairman declare wineer to either A or B
         best = openai_result if winner == "A" else assemblyai_result
@@ -413,27 +647,53 @@ class TranscriptionCouncil:
             "score_difference": evaluation.get("comparison", {}).get("score_difference", 0),
             "final_reasoning": evaluation.get("final_reasoning"),
             "audio_analysis": evaluation.get("audio_analysis"),
+            "method": evaluation.get("method", "chairman"),
+            "agreement": evaluation.get("agreement"),
         }
 
         return best, evaluation
 
 
-def process_audio_with_gemini_council(audio_file_path: str, results: Dict[Dict], audio_metadata: Dict = None) -> Dict:
+def prepare_council_audio(audio_file_path: str, results: Dict[Dict]) -> tuple[str, list[dict] | None]:
     """
-    Process audio with OpenAI and AssemblyAI, then use Gemini to evaluate.
+    The audio the chairman hears for `results`, and the disagreement excerpt it was cut to, if any.
+    Of a long recording, the chairman only listens to where the providers disagree. Cutting runs FFmpeg,
+    so it is done ahead of the council call, by the workers doing CPU work.
     """
+    openai_result, assemblyai_result = results.get("openai"), results.get("assembly")
+    if agreement_evaluation(openai_result, assemblyai_result) is not None:
+        # The chairman is not asked at all
+        return audio_file_path, None
 
-    if not settings.GEMINI_API_KEY:
-        raise Exception("GEMINI_API_KEY not set. Transcription generation cannot be proceed")
+    excerpt = disagreement_excerpt(openai_result, assemblyai_result)
+    if not excerpt:
+        return audio_file_path, None
 
-    logger.info("🎯 Starting Transcription Council Process (Gemini Chairman)...")
+    clips = [(region["start"], region["end"]) for region in excerpt]
+    return extract_excerpt(audio_file_path, clips, TranscriptionCouncilConfig.AUDIO_PROFILE), excerpt
+
+
+def process_audio_with_gemini_council(
+    audio_file_path: str, results: Dict[Dict], audio_metadata: Dict = None, excerpt: list[dict] | None = None
+) -> Dict:
+    """
+    Process audio with OpenAI and AssemblyAI, then use Gemini to evaluate.
+    """
 
-    council = TranscriptionCouncil(gemini_api_key=settings.GEMINI_API_KEY)
     openai_result = results.pop("openai", None)
     assemblyai_result = results.pop("assembly", None)
 
+    # Providers that agree are settled locally, only the chairman needs a key
+    if agreement_evaluation(openai_result, assemblyai_result) is None:
+        if not settings.GEMINI_API_KEY:
+            raise Exception("GEMINI_API_KEY not set. Transcription generation cannot be proceed")
+
+        logger.info("🎯 Starting Transcription Council Process (Gemini Chairman)...")
+
+    council = TranscriptionCouncil(gemini_api_key=settings.GEMINI_API_KEY)
+
     best_result, evaluation = council.select_best_transcription(
-        audio_file_path, openai_result, assemblyai_result, audio_metadata=audio_metadata
+        audio_file_path, openai_result, assemblyai_result, audio_metadata=audio_metadata, excerpt=excerpt
     )
 
     return best_result
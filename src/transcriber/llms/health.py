@@ -0,0 +1,121 @@
+import asyncio
+import time
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import structlog
+from django.conf import settings
+from django.core.cache import BaseCache, cache
+
+logger = structlog.get_logger(__name__)
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+# (cache key, token) of a slot of the concurrency limit held by one call
+Lease = tuple[str, str]
+
+
+class ProviderHealth:
+    """
+    Circuit breaker and AIMD concurrency limit of one provider.
+
+    The state lives in the cache, so every worker sees the same breaker and the limit bounds the
+    calls in flight across all of them. Transient failures halve the limit and, past a threshold,
+    open the circuit: calls skip the provider until a cool-down has passed, then a single call probes
+    it. Every success allows one more concurrent call and closes the circuit.
+
+    Each call in flight holds a numbered slot, a cache key of its own that expires on its own, so the
+    slots of a killed worker are freed without skewing the count of the others.
+    """
+
+    def __init__(self, provider: str, store: BaseCache | None = None):
+        self.provider = provider
+        self.store = store if store is not None else cache
+
+    def _key(self, name: str) -> str:
+        return f"provider-health:{self.provider}:{name}"
+
+    def _incr(self, name: str, timeout: float | None) -> int:
+        key = self._key(name)
+        # add() is a no-op on an existing key, incr() is atomic on shared caches
+        if self.store.add(key, 1, timeout=timeout):
+            return 1
+        try:
+            return self.store.incr(key)
+        except ValueError:
+            # Expired between add() and incr(), the count starts over
+            self.store.set(key, 1, timeout=timeout)
+            return 1
+
+    @property
+    def state(self) -> str:
+        opened_at = self.store.get(self._key("opened-at"))
+        if opened_at is None:
+            return CLOSED
+        if time.time() - opened_at < settings.PROVIDER_BREAKER_COOLDOWN:
+            return OPEN
+        return HALF_OPEN
+
+    @property
+    def limit(self) -> int:
+        """Calls to the provider allowed in flight at once, across all workers."""
+        return self.store.get(self._key("limit"), settings.PROVIDER_CONCURRENCY_MAX)
+
+    def allow(self) -> bool:
+        """Whether a call may go to the provider now. Once the cool-down has passed, only one call gets to probe it."""
+        state = self.state
+        if state == HALF_OPEN:
+            return self.store.add(self._key("probe"), True, timeout=settings.PROVIDER_BREAKER_COOLDOWN)
+        return state == CLOSED
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info("Provider circuit closed", provider=self.provider)
+        self.store.delete_many([self._key("failures"), self._key("opened-at"), self._key("probe")])
+
+        # Additive increase
+        self.store.set(self._key("limit"), min(self.limit + 1, settings.PROVIDER_CONCURRENCY_MAX), timeout=None)
+
+    def record_failure(self) -> None:
+        failures = self._incr("failures", timeout=settings.PROVIDER_BREAKER_WINDOW)
+
+        # Multiplicative decrease
+        self.store.set(self._key("limit"), max(self.limit // 2, 1), timeout=None)
+
+        # A failed probe opens the circuit again at once
+        if self.state == HALF_OPEN or (self.state == CLOSED and failures >= settings.PROVIDER_BREAKER_FAILURES):
+            self.store.set(self._key("opened-at"), time.time(), timeout=None)
+            self.store.delete(self._key("probe"))
+            logger.warning("Provider circuit opened", provider=self.provider, failures=failures)
+
+    def try_acquire(self) -> Lease | None:
+        """Take a free slot of the concurrency limit, None when all are held."""
+        keys = [self._key(f"slot:{number}") for number in range(self.limit)]
+        held = self.store.get_many(keys)
+        token = uuid.uuid4().hex
+        for key in keys:
+            # add() is atomic on shared caches, a slot taken since get_many() is passed over
+            if key not in held and self.store.add(key, token, timeout=settings.PROVIDER_IN_FLIGHT_TTL):
+                return key, token
+        return None
+
+    def release(self, lease: Lease) -> None:
+        key, token = lease
+        # A lease that expired during the call may be held by another call by now
+        if self.store.get(key) == token:
+            self.store.delete(key)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for a slot of the concurrency limit and hold it for the duration of a call."""
+        # Cache calls block, they run on threads to keep the event loop of the worker free
+        while not (lease := await asyncio.to_thread(self.try_acquire)):
+            await asyncio.sleep(settings.PROVIDER_SLOT_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            await asyncio.to_thread(self.release, lease)
@@ -0,0 +1,103 @@
+import asyncio
+import statistics
+
+import structlog
+from django.conf import settings
+from django.core.cache import cache
+
+logger = structlog.get_logger(__name__)
+
+
+ARRIVAL_GAPS_CACHE_KEY = "provider-arrival-gaps"
+
+# Stragglers left running once the budget ran out; referenced until done so they are not collected
+_late_tasks: set[asyncio.Task] = set()
+
+
+class ProviderLate(Exception):
+    """A provider had not answered when the latency budget of its chunk ran out."""
+
+
+def arrival_grace() -> float | None:
+    """
+    Seconds the other providers of a chunk get once the first one has answered, None to wait for all.
+
+    With PROVIDER_LATENCY_PERCENTILE set, this is that percentile of the gaps recently observed between
+    the first and the later arrivals, capped by PROVIDER_LATENCY_BUDGET when set, so that only
+    outliers such as a provider's queue backing up are left behind.
+    """
+    budget = settings.PROVIDER_LATENCY_BUDGET
+    percentile = settings.PROVIDER_LATENCY_PERCENTILE
+
+    if percentile:
+        gaps = cache.get(ARRIVAL_GAPS_CACHE_KEY, [])
+        if len(gaps) >= settings.PROVIDER_LATENCY_MIN_SAMPLES:
+            grace = statistics.quantiles(gaps, n=100, method="inclusive")[percentile - 1]
+            return grace if budget is None else min(grace, budget)
+
+    return budget
+
+
+def record_arrival_gap(gap: float) -> None:
+    # Read-modify-write without a lock: a sample lost to a concurrent chunk does not move a percentile
+    gaps = cache.get(ARRIVAL_GAPS_CACHE_KEY, [])
+    gaps = (gaps + [gap])[-settings.PROVIDER_LATENCY_MAX_SAMPLES :]
+    cache.set(ARRIVAL_GAPS_CACHE_KEY, gaps, timeout=None)
+
+
+def _succeeded(task: asyncio.Task) -> bool:
+    return not task.cancelled() and task.exception() is None
+
+
+async def race(tasks: list[asyncio.Task], names: list[str], grace: float) -> list:
+    """
+    Wait for `tasks` until one succeeds, then at most `grace` seconds for the rest.
+
+    Returns their results in order, exceptions in place of failures and ProviderLate for the tasks
+    still running. Those keep running in the background so their arrival is still logged and counted
+    in the gaps the percentile is computed from.
+    """
+    loop = asyncio.get_running_loop()
+    pending = set(tasks)
+    first = None
+
+    while pending:
+        timeout = None if first is None else max(first + grace - loop.time(), 0)
+        done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            break
+
+        for task in done:
+            if not _succeeded(task):
+                continue
+            if first is None:
+                first = loop.time()
+            else:
+                # Cache calls block, they run on threads to keep the event loop of the worker free
+                await asyncio.to_thread(record_arrival_gap, loop.time() - first)
+
+    for task in pending:
+        name = names[tasks.index(task)]
+
+        def arrived(task: asyncio.Task, name=name) -> None:
+            _late_tasks.discard(task)
+            gap = loop.time() - first
+            if _succeeded(task):
+                # A callback cannot await, the thread is left to record the gap on its own
+                loop.run_in_executor(None, record_arrival_gap, gap)
+            logger.info(
+                "Late provider arrival", provider=name, seconds_after_first=round(gap, 2), succeeded=_succeeded(task)
+            )
+
+        _late_tasks.add(task)
+        task.add_done_callback(arrived)
+
+    results = []
+    for task in tasks:
+        if task in pending:
+            results.append(ProviderLate(f"No answer {grace:.1f}s after the first provider"))
+        elif task.cancelled():
+            results.append(asyncio.CancelledError())
+        else:
+            results.append(task.exception() or task.result())
+    return results
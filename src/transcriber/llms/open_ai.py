@@ -1,31 +1,92 @@
+import asyncio
+from bisect import bisect_left
+from pathlib import Path
 from typing import Any
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from backend import settings
 
+from ..audio import OPUS_16K_MONO
 from .base import TranscriberLLM
+from .runtime import http_client, shared_client
 
 
 class OpenAITranscriberLLM(TranscriberLLM):
     API_KEY = settings.OPEN_AI_API_KEY
+    AUDIO_PROFILE = OPUS_16K_MONO
+    SUPPORTS_STREAMING = True
 
     @property
     def provider_name(self):
         return "openai"
 
+    @classmethod
+    def client(cls) -> OpenAI:
+        return shared_client(("openai", cls.API_KEY), lambda: OpenAI(api_key=cls.API_KEY))
+
+    @classmethod
+    def async_client(cls) -> AsyncOpenAI:
+        return shared_client(
+            ("openai-async", cls.API_KEY), lambda: AsyncOpenAI(api_key=cls.API_KEY, http_client=http_client())
+        )
+
+    @classmethod
+    async def awarm_up(cls) -> None:
+        await http_client().head(str(cls.async_client().base_url))
+
     def transcribe(self) -> dict:
-        client = OpenAI(api_key=self.API_KEY)
+        client = self.client()
+        if self.streams_audio:
+            # A pipe cannot be rewound, so a retried request would upload nothing
+            client = client.with_options(max_retries=0)
 
-        with open(self.audio_path, "rb") as f:
+        with self.open_audio() as f:
             resp = client.audio.transcriptions.create(
-                model="whisper-1", file=f, response_format="verbose_json", timestamp_granularities=["segment"]
+                model="whisper-1",
+                file=f,
+                response_format="verbose_json",
+                timestamp_granularities=["segment", "word"],
             )
 
-        return {"provider": self.provider_name, "transcript": resp.text, "segments": resp.segments}
+        return self._result(resp)
+
+    async def atranscribe(self) -> dict:
+        if self.streams_audio:
+            # Reads from the FFmpeg pipe block, they stay on a thread
+            return await super().atranscribe()
+
+        audio_path = Path(await self.aaudio_path())
+        resp = await self.async_client().audio.transcriptions.create(
+            model="whisper-1",
+            file=(audio_path.name, await asyncio.to_thread(audio_path.read_bytes)),
+            response_format="verbose_json",
+            timestamp_granularities=["segment", "word"],
+        )
+
+        return self._result(resp)
+
+    def _result(self, resp) -> dict:
+        return {
+            "provider": self.provider_name,
+            "transcript": resp.text,
+            "segments": resp.segments,
+            "words": list(resp.words or []),
+        }
 
     def extract_text(self, result: Any) -> str:
         return result.get("transcript", "")
 
     def extract_segments(self, result: Any) -> list[dict]:
-        return [{"start": seg.start, "end": seg.end, "text": seg.text.strip()} for seg in result["segments"]]
+        """Segments with the words spoken in them, each word in the segment it starts in."""
+        words = result.get("words") or []
+        starts = [word.start for word in words]
+
+        segments = []
+        for seg in result["segments"]:
+            segment = {"start": seg.start, "end": seg.end, "text": seg.text.strip()}
+            if words:
+                spoken = words[bisect_left(starts, seg.start) : bisect_left(starts, seg.end)]
+                segment["words"] = [{"start": word.start, "end": word.end, "text": word.word} for word in spoken]
+            segments.append(segment)
+        return segments
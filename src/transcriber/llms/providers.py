@@ -1,8 +1,15 @@
+import asyncio
 import logging
 from typing import List, Type
 
+from django.conf import settings
+
+from ..chunking import AudioChunk
 from .assembly_ai import AssemblyTranscriberLLM
 from .base import TranscriberLLM
+from .chairman import GeminiChairmanEvaluator
+from .health import OPEN, ProviderHealth
+from .latency import race
 from .open_ai import OpenAITranscriberLLM
 
 logger = logging.getLogger(__name__)
@@ -14,10 +21,20 @@ ALL_PROVIDERS: List[Type[TranscriberLLM]] = [
 ]
 
 
-def get_available_transcribers(video_path: str) -> List[TranscriberLLM]:
+def provider_key(provider_cls: Type[TranscriberLLM]) -> str:
+    """Name a provider is referred to by in tasks and results, e.g. "openai"."""
+    return provider_cls.__name__.replace("TranscriberLLM", "").lower()
+
+
+def get_provider(key: str) -> Type[TranscriberLLM]:
+    return next(provider_cls for provider_cls in ALL_PROVIDERS if provider_key(provider_cls) == key)
+
+
+def get_available_transcribers(video_path: str, chunks: List[AudioChunk] | None = None) -> List[TranscriberLLM]:
     """
-    Instantiate only providers that have API keys configured.
-    Skip and log others.
+    Instantiate only providers that have API keys configured, once per chunk of the audio.
+    Skip and log others, and providers whose circuit breaker is open. A half-open circuit is kept, the
+    probe is taken by the first call to the provider (see ProviderHealth.allow).
     """
     available = []
 
@@ -25,10 +42,62 @@ def get_available_transcribers(video_path: str) -> List[TranscriberLLM]:
         if not provider_cls.is_configured():
             continue
 
-        try:
-            provider = provider_cls(video_path)
-            available.append(provider)
-        except ValueError as e:
-            logger.warning(str(e))
+        health = ProviderHealth(provider_key(provider_cls))
+        if health.state == OPEN:
+            logger.warning("Skipping %s, its circuit is %s", provider_key(provider_cls), health.state)
+            continue
+
+        for chunk in chunks or [None]:
+            try:
+                provider = provider_cls(video_path, chunk)
+                available.append(provider)
+            except ValueError as e:
+                logger.warning(str(e))
 
     return available
+
+
+async def _transcribe_in_slot(transcriber: TranscriberLLM, name: str) -> dict:
+    # Waiting for a slot counts against the provider's timeout
+    async with ProviderHealth(name).slot():
+        return await transcriber.atranscribe()
+
+
+async def gather_transcripts(
+    transcribers: List[TranscriberLLM], timeouts: dict[str, float], grace: float | None = None
+) -> list[dict | BaseException]:
+    """
+    Transcribe with every transcriber concurrently, each under the timeout of its provider
+    and within its concurrency limit.
+    Failures are returned in place of results, one slow or failing provider never holds up the others.
+
+    With a grace set, the others get that many seconds once the first transcriber has answered,
+    those still running are returned as ProviderLate.
+    """
+    names = [provider_key(type(t)) for t in transcribers]
+    tasks = [
+        asyncio.ensure_future(asyncio.wait_for(_transcribe_in_slot(t, name), timeouts.get(name)))
+        for t, name in zip(transcribers, names)
+    ]
+
+    if grace is None:
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    return await race(tasks, names, grace)
+
+
+async def warm_up_providers() -> None:
+    """
+    Create the clients of the configured providers and the chairman, and open their connections.
+    Each gets PROVIDER_WARM_UP_TIMEOUT seconds, an unreachable provider is left to the first job.
+    """
+    warm_ups = {provider_key(cls): cls.awarm_up() for cls in ALL_PROVIDERS if cls.is_configured()}
+    if settings.GEMINI_API_KEY:
+        warm_ups["gemini"] = GeminiChairmanEvaluator.awarm_up(settings.GEMINI_API_KEY)
+    warm_ups = {name: asyncio.wait_for(warm_up, settings.PROVIDER_WARM_UP_TIMEOUT) for name, warm_up in warm_ups.items()}
+
+    results = await asyncio.gather(*warm_ups.values(), return_exceptions=True)
+    for name, result in zip(warm_ups, results):
+        if isinstance(result, Exception):
+            # A cold client still works, it only pays for its connection on the first job
+            logger.warning("Could not warm up %s: %r", name, result)
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import threading
+from collections.abc import Callable, Coroutine, Hashable
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+import httpx
+import structlog
+from django.conf import settings
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+# Reentrant, client factories ask for the shared connection pool
+_lock = threading.RLock()
+_pid: int | None = None
+_loop: asyncio.AbstractEventLoop | None = None
+_http_client: httpx.AsyncClient | None = None
+_clients: dict[Hashable, Any] = {}
+
+# Requests sent through the shared pool and connections it had to open for them; only touched on the loop
+_connection_stats = {"requests": 0, "connections": 0}
+
+
+def event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Event loop of this process, running on a daemon thread.
+
+    Every worker thread submits its provider calls here, so they share one loop and one connection
+    pool instead of blocking a thread per request. A forked child starts a loop of its own.
+    """
+    global _pid, _loop, _http_client
+
+    with _lock:
+        if _pid != os.getpid():
+            _pid = os.getpid()
+            _loop = asyncio.new_event_loop()
+            # Connections of the parent's pool and clients belong to the parent
+            _http_client = None
+            _clients.clear()
+            _connection_stats.update(requests=0, connections=0)
+            threading.Thread(target=_loop.run_forever, name="provider-event-loop", daemon=True).start()
+            logger.info("Started provider event loop", pid=_pid)
+
+        return _loop
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine on the event loop of this process and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, event_loop()).result()
+
+
+def start(coro: Coroutine[Any, Any, T]) -> Future:
+    """Schedule a coroutine on the event loop of this process without waiting for it."""
+    return asyncio.run_coroutine_threadsafe(coro, event_loop())
+
+
+def http_client() -> httpx.AsyncClient:
+    """Keep-alive HTTP connection pool shared by the async provider clients of this process."""
+    global _http_client
+
+    event_loop()
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.PROVIDER_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.PROVIDER_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+                timeout=httpx.Timeout(settings.PROVIDER_HTTP_TIMEOUT, connect=10.0),
+                follow_redirects=True,
+                event_hooks={"request": [_count_request]},
+            )
+
+        return _http_client
+
+
+def shared_client(key: Hashable, factory: Callable[[], T]) -> T:
+    """
+    Client of this process stored under `key`, created by `factory` on first use.
+    Keys include the API key, so a rotated key gets a client of its own.
+    """
+    event_loop()
+    with _lock:
+        if key not in _clients:
+            _clients[key] = factory()
+            logger.info("Created provider client", client=key[0] if isinstance(key, tuple) else key)
+
+        return _clients[key]
+
+
+async def _count_request(request: httpx.Request) -> None:
+    _connection_stats["requests"] += 1
+    # httpcore reports every step of a request to its trace hook, opening a connection included
+    request.extensions["trace"] = _trace
+
+
+async def _trace(event_name: str, info: dict) -> None:
+    if event_name == "connection.connect_tcp.complete":
+        _connection_stats["connections"] += 1
+
+
+def connection_stats() -> dict[str, int]:
+    """Requests sent through the shared connection pool of this process, and how many reused a connection."""
+    requests, connections = _connection_stats["requests"], _connection_stats["connections"]
+    return {"requests": requests, "connections": connections, "reused": max(requests - connections, 0)}
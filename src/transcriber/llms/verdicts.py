@@ -0,0 +1,79 @@
+import hashlib
+import json
+from datetime import timedelta
+
+import structlog
+from django.conf import settings
+from django.utils.timezone import now
+
+from ..models.chairman_verdict import ChairmanVerdict
+
+logger = structlog.get_logger(__name__)
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def transcript_hash(result: dict | None) -> str | None:
+    """Hash of what the chairman is shown of a candidate transcript."""
+    if not result:
+        return None
+    return _digest([result.get("generated_text"), result.get("segments")])
+
+
+def verdict_key(
+    audio_hash: str, transcripts: dict, model: str, criteria_weights: dict, prompt_version: int, verbose: bool
+) -> str:
+    """
+    Key of a verdict: the audio heard, each candidate transcript, the model, the scoring, the prompt and
+    whether reasoning was asked for. An excerpt needs no part of its own, its audio and regions follow from the others.
+    """
+    return _digest([audio_hash, transcripts, model, criteria_weights, prompt_version, verbose])
+
+
+def _expired():
+    if settings.CHAIRMAN_VERDICT_CACHE_TTL is None:
+        return ChairmanVerdict.objects.none()
+    return ChairmanVerdict.objects.filter(created_at__lt=now() - timedelta(seconds=settings.CHAIRMAN_VERDICT_CACHE_TTL))
+
+
+def cached_verdict(key: str) -> dict | None:
+    """The stored evaluation for `key` unless it has expired."""
+    verdict = ChairmanVerdict.objects.filter(key=key).exclude(id__in=_expired()).only("id", "evaluation").first()
+    if verdict is None:
+        return None
+
+    ChairmanVerdict.objects.filter(id=verdict.id).update(used_at=now())
+    logger.info("Reusing chairman verdict", verdict_id=verdict.id)
+    return verdict.evaluation
+
+
+def store_verdict(
+    key: str, evaluation: dict, audio_hash: str, transcripts: dict, model: str, prompt_version: int, verbose: bool
+) -> None:
+    """
+    Keep an evaluation, then evict the expired verdicts and, past CHAIRMAN_VERDICT_CACHE_MAX_ENTRIES,
+    the least recently used.
+    """
+    ChairmanVerdict.objects.update_or_create(
+        key=key,
+        defaults={
+            "evaluation": evaluation,
+            "audio_hash": audio_hash,
+            "transcript_hashes": transcripts,
+            "model": model,
+            "prompt_version": prompt_version,
+            "verbose": verbose,
+            "created_at": now(),
+            "used_at": now(),
+        },
+    )
+
+    _expired().delete()
+
+    excess = ChairmanVerdict.objects.count() - settings.CHAIRMAN_VERDICT_CACHE_MAX_ENTRIES
+    if excess > 0:
+        evicted = list(ChairmanVerdict.objects.order_by("used_at", "id").values_list("id", flat=True)[:excess])
+        ChairmanVerdict.objects.filter(id__in=evicted).delete()
+        logger.info("Evicted chairman verdicts", count=len(evicted))
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from backend.celery import app
+
+
+def worker_argv(role: str, loglevel: str = "info") -> list[str]:
+    """Command line of a Celery worker serving the queue of `role`, built from its preset."""
+    options = settings.WORKER_PRESETS[role]
+    return ["worker", f"--loglevel={loglevel}", f"--hostname={role}@%h"] + [
+        f"--{option}={value}" for option, value in options.items()
+    ]
+
+
+class Command(BaseCommand):
+    help = "Start a Celery worker for the I/O queue (provider calls) or the CPU queue (FFmpeg work)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("role", choices=sorted(settings.WORKER_PRESETS))
+        parser.add_argument("--loglevel", default="info")
+
+    def handle(self, *args, **options):
+        app.worker_main(worker_argv(options["role"], options["loglevel"]))
@@ -0,0 +1,29 @@
+# Generated by Django 5.0 on 2026-10-16 23:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transcriber", "0002_transcriptiondata_segments"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transcription",
+            name="content_hash",
+            field=models.CharField(blank=True, db_index=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="duplicate_of",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="duplicates",
+                to="transcriber.transcription",
+            ),
+        ),
+    ]
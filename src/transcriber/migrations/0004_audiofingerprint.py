@@ -0,0 +1,45 @@
+# Generated by Django 5.0 on 2026-10-16 23:53
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transcriber", "0003_transcription_content_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AudioFingerprint",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("duration", models.FloatField(db_index=True)),
+                ("envelope", models.BinaryField()),
+                (
+                    "transcription",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fingerprint",
+                        to="transcriber.transcription",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="AudioFingerprintKey",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("key", models.BigIntegerField(db_index=True)),
+                (
+                    "fingerprint",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="keys", to="transcriber.audiofingerprint"
+                    ),
+                ),
+            ],
+        ),
+    ]
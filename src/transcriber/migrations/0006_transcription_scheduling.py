@@ -0,0 +1,30 @@
+# Generated by Django 5.0 on 2026-10-17 00:27
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def mark_queued_jobs_dispatched(apps, schema_editor):
+    # Unfinished jobs were put on the worker queue at submission
+    Transcription = apps.get_model("transcriber", "Transcription")
+    Transcription.objects.filter(status__in=["Pending", "Processing"]).update(dispatched_at=django.utils.timezone.now())
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transcriber", "0005_uploadsession"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transcription",
+            name="dispatched_at",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="video_name",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+        migrations.RunPython(mark_queued_jobs_dispatched, migrations.RunPython.noop),
+    ]
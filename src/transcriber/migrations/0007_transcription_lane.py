@@ -0,0 +1,22 @@
+# Generated by Django 5.0 on 2026-10-17 00:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transcriber", "0006_transcription_scheduling"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transcription",
+            name="duration",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="transcription",
+            name="lane",
+            field=models.CharField(blank=True, default="", max_length=16),
+        ),
+    ]
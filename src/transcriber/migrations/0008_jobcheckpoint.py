@@ -0,0 +1,47 @@
+# Generated by Django 5.0 on 2026-10-17 00:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transcriber", "0007_transcription_lane"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobCheckpoint",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "stage",
+                    models.CharField(
+                        choices=[
+                            ("provider", "provider result"),
+                            ("verdict", "council verdict"),
+                            ("subtitle", "subtitle file"),
+                            ("stitched", "stitched video"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("key", models.CharField(blank=True, default="", max_length=64)),
+                ("digest", models.CharField(max_length=64)),
+                ("payload", models.JSONField(default=dict)),
+                (
+                    "transcription",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="checkpoints",
+                        to="transcriber.transcription",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="jobcheckpoint",
+            constraint=models.UniqueConstraint(fields=("transcription", "stage", "key"), name="unique_job_checkpoint"),
+        ),
+    ]
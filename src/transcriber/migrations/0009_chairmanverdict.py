@@ -0,0 +1,26 @@
+# Generated by Django 5.0 on 2026-10-17 00:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transcriber", "0008_jobcheckpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChairmanVerdict",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("used_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("key", models.CharField(max_length=64, unique=True)),
+                ("audio_hash", models.CharField(db_index=True, max_length=64)),
+                ("transcript_hashes", models.JSONField(default=dict)),
+                ("model", models.CharField(max_length=64)),
+                ("prompt_version", models.PositiveIntegerField()),
+                ("evaluation", models.JSONField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-17 00:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transcriber", "0009_chairmanverdict"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chairmanverdict",
+            name="verbose",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-17 01:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transcriber", "0010_chairmanverdict_verbose"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="uploadsession",
+            name="completed",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="uploadsession",
+            name="content_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="uploadsession",
+            name="duration",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="uploadsession",
+            name="video_name",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-17 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transcriber", "0011_uploadsession_completed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transcription",
+            name="dispatch_count",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-17 01:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transcriber", "0012_transcription_dispatch_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transcriptiondata",
+            name="evaluation",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
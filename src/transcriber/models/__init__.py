@@ -1,2 +1,7 @@
+from .audio_fingerprint import AudioFingerprint as AudioFingerprint
+from .audio_fingerprint import AudioFingerprintKey as AudioFingerprintKey
+from .chairman_verdict import ChairmanVerdict as ChairmanVerdict
+from .job_checkpoint import JobCheckpoint as JobCheckpoint
 from .transcription import Transcription as Transcription
 from .transcription_data import TranscriptionData as TranscriptionData
+from .upload_session import UploadSession as UploadSession
@@ -0,0 +1,29 @@
+import uuid
+
+from django.db import models
+
+from .transcription import Transcription
+
+
+class AudioFingerprint(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+
+    duration = models.FloatField(db_index=True)
+    envelope = models.BinaryField()
+
+    transcription = models.OneToOneField(Transcription, on_delete=models.CASCADE, related_name="fingerprint")
+
+    def __str__(self):
+        return f"{self.transcription_id} Fingerprint ({self.duration:.1f}s)"
+
+
+class AudioFingerprintKey(models.Model):
+    # Indexed lookup keys of a fingerprint, so matching does not scan every stored fingerprint
+    id = models.BigAutoField(primary_key=True)
+    key = models.BigIntegerField(db_index=True)
+
+    fingerprint = models.ForeignKey(AudioFingerprint, on_delete=models.CASCADE, related_name="keys")
+
+    def __str__(self):
+        return f"{self.key} → {self.fingerprint_id}"
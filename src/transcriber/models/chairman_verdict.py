@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class ChairmanVerdict(models.Model):
+    # Evaluation the chairman returned for a set of inputs, so the same question is never paid for twice
+    id = models.BigAutoField(primary_key=True)
+    created_at = models.DateTimeField(auto_now_add=True, editable=False, db_index=True)
+    # Last time the verdict was reused; the least recently used are evicted first
+    used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    # Digest of everything the verdict depends on (see llms.verdicts.verdict_key)
+    key = models.CharField(max_length=64, unique=True)
+
+    # The inputs, kept apart to compare models and prompt versions over the stored history
+    audio_hash = models.CharField(max_length=64, db_index=True)
+    transcript_hashes = models.JSONField(default=dict)
+    model = models.CharField(max_length=64)
+    prompt_version = models.PositiveIntegerField()
+    # Whether the chairman was asked for its reasoning or for scores only
+    verbose = models.BooleanField(default=False)
+
+    evaluation = models.JSONField()
+
+    def __str__(self):
+        return f"{self.model} v{self.prompt_version} {self.audio_hash[:12]}"
@@ -0,0 +1,33 @@
+from django.db import models
+
+from .transcription import Transcription
+
+
+class CheckpointStage(models.TextChoices):
+    PROVIDER = "provider", "provider result"
+    VERDICT = "verdict", "council verdict"
+    SUBTITLE = "subtitle", "subtitle file"
+    STITCHED = "stitched", "stitched video"
+
+
+class JobCheckpoint(models.Model):
+    # Output of a finished stage of a job, so a retried or restarted task resumes instead of redoing it
+    id = models.BigAutoField(primary_key=True)
+    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+
+    transcription = models.ForeignKey(Transcription, on_delete=models.CASCADE, related_name="checkpoints")
+    stage = models.CharField(max_length=16, choices=CheckpointStage.choices)
+    # Part of the stage, e.g. the provider and chunk of a provider result
+    key = models.CharField(max_length=64, blank=True, default="")
+
+    # Digest of the inputs the output was computed from; a checkpoint of other inputs is stale
+    digest = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["transcription", "stage", "key"], name="unique_job_checkpoint"),
+        ]
+
+    def __str__(self):
+        return f"{self.transcription_id} {self.stage} {self.key}".rstrip()
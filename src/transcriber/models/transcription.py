@@ -24,5 +24,20 @@ class Transcription(models.Model):
     )
     user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, null=False, blank=False)
 
+    # Content hash of the uploaded video (see util.ContentHasher), used to reuse transcripts of identical uploads
+    content_hash = models.CharField(max_length=64, blank=True, default="", db_index=True)
+    # Job whose result this one reuses instead of calling the providers itself
+    duplicate_of = models.ForeignKey("self", on_delete=models.SET_NULL, null=True, blank=True, related_name="duplicates")
+
+    # Stored name of the uploaded video, kept until the scheduler releases the job to the workers
+    video_name = models.CharField(max_length=255, blank=True, default="")
+    # When the scheduler released the job to the workers; pending jobs without it wait in their user's queue
+    dispatched_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    # Times the job was released, requeued ones included (see scheduling.requeue_stale_jobs)
+    dispatch_count = models.PositiveSmallIntegerField(default=0)
+    # Media duration probed at submission (seconds) and the scheduling lane it puts the job in
+    duration = models.FloatField(null=True, blank=True)
+    lane = models.CharField(max_length=16, blank=True, default="")
+
     def __str__(self):
         return f"{self.user.username} - {self.id} Transcription"
@@ -15,6 +15,8 @@ class TranscriptionData(models.Model):
 
     generated_text = models.TextField()
     segments = models.JSONField(default=list)
+    # How the council selected this transcript: provider, confidence, reasoning, or the agreement that skipped it
+    evaluation = models.JSONField(default=dict, blank=True)
 
     transcription = models.ForeignKey(Transcription, on_delete=models.CASCADE, related_name="results")
 
@@ -0,0 +1,36 @@
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from .transcription import Transcription
+
+
+class UploadSession(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, null=False, blank=False)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+
+    # Bytes received so far; the next chunk must start here
+    offset = models.BigIntegerField(default=0)
+    # Digests of the completed hash blocks, so the content hash never re-reads the whole file
+    block_digests = models.BinaryField(default=b"")
+
+    # Set once the received file is moved into blob storage, with what the job is submitted from, so a
+    # finalize that failed after the move is resumed from here
+    completed = models.BooleanField(default=False)
+    video_name = models.CharField(max_length=255, blank=True, default="")
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+    duration = models.FloatField(null=True, blank=True)
+
+    # Job created when the upload is finalized
+    transcription = models.OneToOneField(
+        Transcription, on_delete=models.SET_NULL, null=True, blank=True, related_name="upload_session"
+    )
+
+    def __str__(self):
+        return f"{self.user.username} - {self.filename} ({self.offset}/{self.size})"
@@ -0,0 +1,253 @@
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+import structlog
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db.models import F
+from django.utils.timezone import now
+
+from .chunking import probe_duration
+from .models.transcription import Transcription, TranscriptionStatus
+
+logger = structlog.get_logger(__name__)
+
+
+DISPATCH_LOCK_KEY = "transcription-dispatch:lock"
+DISPATCH_DIRTY_KEY = "transcription-dispatch:dirty"
+
+
+def plan_weights(user_ids) -> dict:
+    """Share of the workers each user gets, from the plan groups in SCHEDULER_PLAN_WEIGHTS; 1 without a plan."""
+    weights = {user_id: 1 for user_id in user_ids}
+
+    plans = Group.objects.filter(name__in=settings.SCHEDULER_PLAN_WEIGHTS, user__in=user_ids).values_list("user", "name")
+    for user_id, plan in plans:
+        weights[user_id] = max(weights[user_id], settings.SCHEDULER_PLAN_WEIGHTS[plan])
+
+    return weights
+
+
+def probe_media_duration(path: str) -> float | None:
+    """Duration of a video in seconds, None when FFprobe cannot tell; the job itself reports broken files."""
+    try:
+        return probe_duration(path)
+    except (RuntimeError, KeyError, ValueError) as e:
+        logger.warning("Could not probe media duration", path=path, error=str(e))
+        return None
+
+
+def lane_of(duration: float | None) -> str:
+    """Lane of a job: the first whose max_duration holds it. Jobs of unknown duration go to the last lane."""
+    for lane, config in settings.SCHEDULER_LANES.items():
+        if duration is not None and (config["max_duration"] is None or duration <= config["max_duration"]):
+            return lane
+    return list(settings.SCHEDULER_LANES)[-1]
+
+
+def lane_queue(lane: str) -> str | None:
+    """Worker queue the FFmpeg stages of a lane's jobs run on, None for the default routing."""
+    return settings.SCHEDULER_LANES.get(lane, {}).get("queue")
+
+
+def _lane(job: Transcription) -> str:
+    # Jobs submitted before lanes existed are placed by their duration
+    return job.lane if job.lane in settings.SCHEDULER_LANES else lane_of(job.duration)
+
+
+def _media_seconds(job: Transcription) -> float:
+    if job.duration is not None:
+        return job.duration
+    # Unknown durations are taken for the longest bounded lane
+    return max(config["max_duration"] or 0 for config in settings.SCHEDULER_LANES.values())
+
+
+def processing_estimate(job: Transcription) -> float:
+    """Seconds a job is expected to take once released to the workers."""
+    return settings.SCHEDULER_PROCESSING_RATIO * _media_seconds(job) + settings.SCHEDULER_PROCESSING_OVERHEAD
+
+
+def _priority(job: Transcription, at) -> float:
+    # Shortest job first, aged: waiting makes a job count as shorter, so long ones are not starved
+    return _media_seconds(job) - settings.SCHEDULER_AGING_RATE * (at - job.created_at).total_seconds()
+
+
+def _in_flight_jobs():
+    return Transcription.objects.filter(
+        dispatched_at__isnull=False, status__in=[TranscriptionStatus.PENDING, TranscriptionStatus.PROCESSING]
+    )
+
+
+def _waiting_jobs():
+    # Jobs attached to another job never run themselves
+    return Transcription.objects.filter(
+        status=TranscriptionStatus.PENDING, dispatched_at__isnull=True, duplicate_of__isnull=True
+    ).exclude(video_name="")
+
+
+def release_jobs(start: Callable[[Transcription], None]) -> int:
+    """
+    Release waiting jobs to the workers and return how many were started with `start`.
+
+    Every user has a virtual queue of their pending jobs. The next job always comes from the user with
+    the fewest jobs in flight relative to their plan weight, so a user with hundreds of uploads takes turns
+    with everyone else. A user has at most SCHEDULER_USER_MAX_IN_FLIGHT jobs in flight per unit of weight,
+    and SCHEDULER_MAX_IN_FLIGHT bounds the jobs in the worker queues, so that the order is decided here
+    rather than by the broker.
+
+    Jobs are also held to the capacity of their duration lane, which other lanes cannot take from, so
+    short clips never queue behind long videos. Between equally served users, the shortest job goes
+    first, aged by the time it has waited.
+    """
+    in_flight_jobs = list(_in_flight_jobs().only("user_id", "lane", "duration"))
+    in_flight = Counter(job.user_id for job in in_flight_jobs)
+    lane_in_flight = Counter(_lane(job) for job in in_flight_jobs)
+    total = len(in_flight_jobs)
+
+    waiting = list(_waiting_jobs().only("id", "user_id", "video_name", "lane", "duration", "created_at", "dispatch_count"))
+    weights = plan_weights({job.user_id for job in waiting})
+    at = now()
+
+    released = 0
+    while total < settings.SCHEDULER_MAX_IN_FLIGHT:
+        candidates = [
+            job
+            for job in waiting
+            if in_flight[job.user_id] < settings.SCHEDULER_USER_MAX_IN_FLIGHT * weights[job.user_id]
+            and lane_in_flight[_lane(job)] < settings.SCHEDULER_LANES[_lane(job)]["capacity"]
+        ]
+        if not candidates:
+            break
+
+        job = min(candidates, key=lambda job: (in_flight[job.user_id] / weights[job.user_id], _priority(job, at)))
+        waiting.remove(job)
+
+        # Claim the job, another dispatcher may have released it meanwhile
+        if not _waiting_jobs().filter(id=job.id).update(dispatched_at=now(), dispatch_count=F("dispatch_count") + 1):
+            continue
+        job.dispatch_count += 1
+
+        in_flight[job.user_id] += 1
+        lane_in_flight[_lane(job)] += 1
+        total += 1
+        released += 1
+
+        logger.info(
+            "Released transcription",
+            transcription_id=str(job.id),
+            user_id=job.user_id,
+            lane=_lane(job),
+            in_flight=in_flight[job.user_id],
+        )
+        start(job)
+
+    return released
+
+
+def lease_expiry(job: Transcription) -> datetime:
+    """When a job in flight is taken for lost, with the worker running it: a multiple of its expected processing time."""
+    lease = settings.SCHEDULER_LEASE_FACTOR * processing_estimate(job) + settings.SCHEDULER_LEASE_GRACE
+    return job.dispatched_at + timedelta(seconds=lease)
+
+
+def requeue(job: Transcription, fail: Callable[[Transcription], None]) -> bool:
+    """
+    Hand a job in flight back to its user's queue, to be run again from its checkpoints, and return whether it was.
+    A job released SCHEDULER_MAX_DISPATCHES times is failed with `fail` instead, it is likely to fail every time.
+    """
+    log = logger.bind(transcription_id=str(job.id), dispatches=job.dispatch_count)
+    if job.dispatch_count >= settings.SCHEDULER_MAX_DISPATCHES:
+        log.error("Failing transcription released too often")
+        fail(Transcription.objects.get(id=job.id))
+        return False
+
+    # Conditional on the release, so a job that finished or was requeued meanwhile is left alone
+    released = _in_flight_jobs().filter(id=job.id, dispatched_at=job.dispatched_at)
+    if released.update(dispatched_at=None, status=TranscriptionStatus.PENDING):
+        log.warning("Requeued transcription")
+        return True
+    return False
+
+
+def requeue_stale_jobs(fail: Callable[[Transcription], None]) -> int:
+    """
+    Requeue the jobs in flight past their lease (see lease_expiry) and return how many were.
+    Their worker was lost before it finished or failed them, and they would hold their place in flight for good.
+    """
+    at = now()
+    requeued = 0
+    for job in _in_flight_jobs().only("id", "duration", "lane", "dispatched_at", "dispatch_count"):
+        if lease_expiry(job) <= at:
+            logger.warning("Transcription outlived its lease", transcription_id=str(job.id))
+            requeued += requeue(job, fail)
+
+    return requeued
+
+
+def _lane_backlog(lane: str, at) -> tuple[float, list[tuple[float, object, float]]]:
+    # Processing seconds left to the lane's jobs in flight, and the (priority, id, estimate) of its waiting jobs
+    fields = ["duration", "created_at", "dispatched_at"]
+
+    remaining = sum(
+        max((job.dispatched_at - at).total_seconds() + processing_estimate(job), 0.0)
+        for job in _in_flight_jobs().filter(lane=lane).only(*fields)
+    )
+    waiting = [
+        (_priority(job, at), job.id, processing_estimate(job))
+        for job in _waiting_jobs().filter(lane=lane).only("id", *fields)
+    ]
+    return remaining, waiting
+
+
+def expected_completion(transcription: Transcription, backlogs: dict | None = None) -> datetime | None:
+    """
+    When a job is expected to finish, None once it has. A waiting job waits for the jobs in flight and
+    the jobs ahead of it in its lane, shared over the lane's capacity, then takes its own processing time.
+
+    `backlogs` keeps each lane's backlog between calls, so a page of jobs queries a lane once.
+    """
+    if transcription.status in (TranscriptionStatus.SUCCESS, TranscriptionStatus.FAILED):
+        return None
+    if transcription.duplicate_of_id:
+        # Finishes with the job it is attached to
+        return expected_completion(transcription.duplicate_of, backlogs)
+
+    at = now()
+    if transcription.dispatched_at:
+        return max(transcription.dispatched_at + timedelta(seconds=processing_estimate(transcription)), at)
+
+    lane = _lane(transcription)
+    backlogs = {} if backlogs is None else backlogs
+    if lane not in backlogs:
+        backlogs[lane] = (at, *_lane_backlog(lane, at))
+    at, remaining, waiting = backlogs[lane]
+
+    priority = _priority(transcription, at)
+    ahead = sum(
+        estimate for job_priority, job_id, estimate in waiting if job_id != transcription.id and job_priority < priority
+    )
+
+    wait = (remaining + ahead) / settings.SCHEDULER_LANES[lane]["capacity"]
+    return at + timedelta(seconds=wait + processing_estimate(transcription))
+
+
+def dispatch(start: Callable[[Transcription], None]) -> None:
+    """
+    Release what can be released, from one dispatcher at a time.
+
+    A call finding another dispatcher at work leaves a mark instead, which makes that one go
+    over the queues again once it is done, so no submission or finished job is overlooked.
+    """
+    cache.set(DISPATCH_DIRTY_KEY, True, timeout=None)
+
+    while cache.get(DISPATCH_DIRTY_KEY):
+        if not cache.add(DISPATCH_LOCK_KEY, True, timeout=settings.SCHEDULER_LOCK_TIMEOUT):
+            return
+
+        try:
+            cache.delete(DISPATCH_DIRTY_KEY)
+            release_jobs(start)
+        finally:
+            cache.delete(DISPATCH_LOCK_KEY)
@@ -0,0 +1,221 @@
+import io
+import os
+import shutil
+import tempfile
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import cached_property
+
+import structlog
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
+from django.core.files.storage import Storage, storages
+from django.utils.deconstruct import deconstructible
+
+logger = structlog.get_logger(__name__)
+
+
+# Alias in settings.STORAGES of the storage shared by API and worker nodes
+BLOB_STORAGE_ALIAS = "blobs"
+
+COPY_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# S3 rejects multipart parts below 5 MB, except for the last one
+S3_PART_SIZE = 8 * 1024 * 1024  # 8 MB
+
+
+def blob_storage() -> Storage:
+    return storages[BLOB_STORAGE_ALIAS]
+
+
+def upload_name(filename: str) -> str:
+    """Name a new uploaded video is stored under."""
+    suffix = os.path.splitext(filename)[1] or ".mp4"
+    return f"uploads/{uuid.uuid4()}{suffix}"
+
+
+class _LocalFile(File):
+    # Lets filesystem storages rename the file into place instead of copying it
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def save_replacing(name: str, content: File) -> str:
+    """Save to blob storage under `name` exactly; filesystem storages would otherwise pick a new name."""
+    storage = blob_storage()
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, content)
+
+
+def store_file(name: str, path: str) -> str:
+    """
+    Move a local file into blob storage under `name`, replacing what is stored there, and return the stored name.
+    Filesystem storages rename it; others stream it and the local file is removed.
+    """
+    with open(path, "rb") as f:
+        stored = save_replacing(name, _LocalFile(f, name=name))
+
+    if os.path.exists(path):
+        os.unlink(path)
+
+    return stored
+
+
+@contextmanager
+def local_copy(name: str) -> Iterator[str]:
+    """
+    Yield a local path of a stored file, for tools such as FFmpeg that need one.
+    Filesystem storages hand out the file itself; others are downloaded into a temporary file.
+    """
+    storage = blob_storage()
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        path = None
+
+    if path:
+        yield path
+        return
+
+    suffix = os.path.splitext(name)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, prefix="blob_", delete=False) as f, storage.open(name) as source:
+        shutil.copyfileobj(source, f, COPY_CHUNK_SIZE)
+
+    try:
+        yield f.name
+    finally:
+        os.unlink(f.name)
+
+
+def _is_not_found(error: Exception) -> bool:
+    code = getattr(error, "response", {}).get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+class S3RangeReader(io.RawIOBase):
+    """Seekable reader over an S3 object; every read is a ranged GET."""
+
+    def __init__(self, client, bucket: str, key: str, size: int):
+        super().__init__()
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        self._size = size
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self._size}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        if self._position >= self._size or not len(buffer):
+            return 0
+
+        end = min(self._position + len(buffer), self._size) - 1
+        response = self._client.get_object(Bucket=self._bucket, Key=self._key, Range=f"bytes={self._position}-{end}")
+        data = response["Body"].read()
+
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+@deconstructible
+class S3Storage(Storage):
+    """
+    Storage in a bucket of S3 or an S3-compatible service (MinIO, Ceph, R2...), through a boto3 client.
+
+    Files are written with multipart uploads and read with ranged GETs in `part_size` pieces,
+    so a video is never held in memory as a whole. Saving to an existing name replaces the object.
+    """
+
+    def __init__(
+        self, bucket_name: str, prefix: str = "", endpoint_url: str | None = None, part_size: int = S3_PART_SIZE, client=None
+    ):
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.endpoint_url = endpoint_url
+        self.part_size = part_size
+        if client is not None:
+            self.client = client
+
+    @cached_property
+    def client(self):
+        try:
+            import boto3
+        except ImportError:
+            raise ImproperlyConfigured("S3Storage requires boto3, install the 's3' extra")
+
+        return boto3.client("s3", endpoint_url=self.endpoint_url)
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}{name}"
+
+    def _open(self, name, mode="rb"):
+        if "w" in mode:
+            raise ValueError("S3Storage files are written with save()")
+
+        reader = S3RangeReader(self.client, self.bucket_name, self._key(name), self.size(name))
+        return File(io.BufferedReader(reader, buffer_size=self.part_size), name=name)
+
+    def _save(self, name, content):
+        key = self._key(name)
+        if content.seekable():
+            content.seek(0)
+
+        part = content.read(self.part_size)
+        if len(part) < self.part_size:
+            self.client.put_object(Bucket=self.bucket_name, Key=key, Body=part)
+            return name
+
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket_name, Key=key)["UploadId"]
+        parts = []
+        try:
+            while part:
+                number = len(parts) + 1
+                response = self.client.upload_part(
+                    Bucket=self.bucket_name, Key=key, UploadId=upload_id, PartNumber=number, Body=part
+                )
+                parts.append({"ETag": response["ETag"], "PartNumber": number})
+                part = content.read(self.part_size)
+
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket_name, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except Exception:
+            self.client.abort_multipart_upload(Bucket=self.bucket_name, Key=key, UploadId=upload_id)
+            raise
+
+        logger.info("Stored object", key=key, parts=len(parts))
+        return name
+
+    def get_available_name(self, name, max_length=None):
+        # Objects are replaced, never renamed
+        return name
+
+    def delete(self, name):
+        self.client.delete_object(Bucket=self.bucket_name, Key=self._key(name))
+
+    def exists(self, name):
+        try:
+            self.client.head_object(Bucket=self.bucket_name, Key=self._key(name))
+        except Exception as e:
+            if _is_not_found(e):
+                return False
+            raise
+        return True
+
+    def size(self, name):
+        return self.client.head_object(Bucket=self.bucket_name, Key=self._key(name))["ContentLength"]
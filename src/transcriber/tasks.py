@@ -1,35 +1,153 @@
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from pathlib import Path
+import tempfile
+from collections import defaultdict
+from contextlib import nullcontext
+from dataclasses import asdict
+from itertools import chain
 
 import ffmpeg
 import structlog
-from celery import shared_task
+from celery import chord, group, shared_task
+from celery.concurrency.thread import TaskPool as ThreadTaskPool
+from celery.result import allow_join_result
+from celery.signals import worker_init, worker_process_init, worker_ready
+from django.conf import settings
+from django.core.files.base import ContentFile
+from httpx import TransportError
 from requests.exceptions import ConnectionError, Timeout
 
-from .llms.chairman import process_audio_with_gemini_council
-from .llms.providers import get_available_transcribers
-from .models.transcription import Transcription
-from .models.transcription import TranscriptionStatus
+from .audio import extract_audio_profiles, fetch_artifact, share_artifact
+from .checkpoints import clear_checkpoints, inputs_digest, load_checkpoint, save_checkpoint
+from .chunking import AudioChunk, plan_chunks, stitch_segments
+from .dedup import copy_result, resolve_duplicates
+from .fingerprint import FINGERPRINT_PROFILE, compute_fingerprint, find_matching_transcription, store_fingerprint
+from .llms.chairman import TranscriptionCouncilConfig, prepare_council_audio, process_audio_with_gemini_council
+from .llms.health import CLOSED, ProviderHealth
+from .llms.latency import ProviderLate, arrival_grace
+from .llms.providers import gather_transcripts, get_available_transcribers, get_provider, provider_key, warm_up_providers
+from .llms.runtime import connection_stats, run, start
+from .models.job_checkpoint import CheckpointStage
+from .models.transcription import Transcription, TranscriptionStatus
 from .models.transcription_data import TranscriptionData
-from .util import temp_srt_file_path
+from .scheduling import dispatch, lane_queue, requeue, requeue_stale_jobs
+from .storage import local_copy, save_replacing, store_file
+from .util import srt_content, temp_srt_file_path
 
 logger = structlog.get_logger(__name__)
 
 
-# Define where to save stitched videos
-STITCHED_VIDEOS_DIR = Path("stitched_videos")
-STITCHED_VIDEOS_DIR.mkdir(parents=True, exist_ok=True)
+TRANSIENT_EXCEPTIONS = (Timeout, ConnectionError, TransportError)
 
 
-TRANSIENT_EXCEPTIONS = (Timeout, ConnectionError)
+# Whether this worker consumes the io queue, where the provider calls run; set before the pool starts its processes
+_consumes_io_queue = False
+
+
+@worker_init.connect
+def detect_io_worker(sender, **kwargs):
+    global _consumes_io_queue
+    _consumes_io_queue = settings.CELERY_TASK_DEFAULT_QUEUE in sender.app.amqp.queues.consume_from
+
+
+@worker_process_init.connect
+def warm_up_provider_clients(**kwargs):
+    """
+    Connect to the providers from every new process of an io worker, ahead of its first job.
+    The connections are opened in the background, so a slow provider does not hold up the process start.
+    """
+    if settings.PROVIDER_WARM_UP and _consumes_io_queue:
+        start(warm_up_providers())
+
+
+@worker_ready.connect
+def warm_up_thread_pool_worker(sender, **kwargs):
+    # Thread pools run tasks in the main process, which never sends worker_process_init
+    if isinstance(sender.pool, ThreadTaskPool):
+        warm_up_provider_clients()
+
+
+def finish_transcription(transcription: Transcription, status: TranscriptionStatus) -> None:
+    """Record the final status of a job, pass it on to the jobs waiting on it and let the next job in."""
+    transcription.status = status
+    transcription.save(update_fields=["status"])
+    if status == TranscriptionStatus.FAILED:
+        # Never run again, nothing resumes from its checkpoints
+        clear_checkpoints(transcription.id, *CheckpointStage)
+    resolve_duplicates(transcription)
+    dispatch_transcriptions.delay()
+
+
+def start_transcription(transcription: Transcription) -> None:
+    options = {"queue": queue} if (queue := lane_queue(transcription.lane)) else {}
+    handle_transcripts.apply_async(
+        args=[transcription.id, transcription.video_name],
+        link_error=fail_transcription.si(transcription.id, transcription.dispatch_count),
+        **options,
+    )
+
+
+@shared_task
+def fail_transcription(transcription_id: str, dispatch: int | None = None) -> None:
+    """
+    Errback of every task of a job. A task that failed for good, outside the failures it handles itself,
+    hands the job back to the scheduler (see scheduling.requeue): run again, it resumes from its checkpoints
+    instead of paying the providers and the council twice. A job that keeps failing is failed for good.
+
+    `dispatch` is the release of the job the failed task ran for, errbacks of an earlier run are ignored.
+    """
+    transcription = Transcription.objects.get(id=transcription_id)
+    if transcription.status in (TranscriptionStatus.SUCCESS, TranscriptionStatus.FAILED):
+        # Ended by the task itself, or failed after the transcript was stored (stitching)
+        return
+    if dispatch is not None and transcription.dispatch_count != dispatch:
+        return
+
+    logger.error("Transcription task failed", transcription_id=str(transcription_id))
+    if requeue(transcription, lambda job: finish_transcription(job, TranscriptionStatus.FAILED)):
+        dispatch_transcriptions.delay()
+
+
+@shared_task
+def dispatch_transcriptions():
+    """
+    Release waiting jobs to the workers, fairly between users (see scheduling.release_jobs).
+    Runs on every submission and finished job, and periodically to requeue the jobs of lost workers
+    once their lease has run out (see scheduling.requeue_stale_jobs).
+    """
+    requeue_stale_jobs(lambda transcription: finish_transcription(transcription, TranscriptionStatus.FAILED))
+    dispatch(start_transcription)
+
+
+def merge_chunk_results(provider_name: str, parts: list[dict]) -> dict:
+    """
+    Combine one provider's per-chunk results into a single result on the global timeline.
+    """
+    segments = stitch_segments([(AudioChunk(**part["chunk"]), part["segments"]) for part in parts])
+
+    if len(parts) == 1:
+        text = parts[0]["text"]
+    else:
+        text = " ".join(segment["text"] for segment in segments)
+
+    return {
+        "used_model": provider_name,
+        "generated_text": text,
+        "segments": segments,
+        "output_language": "en",
+    }
 
 
 @shared_task(bind=True, max_retries=3, retry_backoff=True, retry_backoff_max=60, retry_jitter=True)
-def handle_transcripts(self, transcription_id: str, video_path: str):
+def handle_transcripts(self, transcription_id: str, video_name: str):
     """
-    Runs ALL transcription providers concurrently and stores their results
-    under TranscriptionData.
+    Prepare a job and replace this task with the pipeline of its remaining stages:
+    every chunk is transcribed in parallel by all providers at once, then the council selects
+    the best transcript, which is persisted and stitched into the video.
+
+    Each stage is a task of its own, so it is scheduled, retried and scaled on its
+    own. This stage decodes the audio the later stages share, cuts every chunk of it
+    and stops recordings that were already transcribed before any provider is called.
+    The stages on the io queue only read the stored audio, FFmpeg never runs there.
     """
     logger.info(f"Handling transcripts for {transcription_id}")
 
@@ -38,94 +156,263 @@ def handle_transcripts(self, transcription_id: str, video_path: str):
     transcription.save(update_fields=["status"])
 
     try:
-        transcribers = get_available_transcribers(video_path)
-        if not transcribers:
-            logger.warning("No transcription providers available")
-            transcription.status = TranscriptionStatus.FAILED
-            transcription.save(update_fields=["status"])
-            return
+        # FFmpeg reads a local copy of the video, wherever it is stored
+        with local_copy(video_name) as video_path:
+            # Long audio is split at silences, every provider transcribes each chunk
+            chunks = plan_chunks(video_path)
+
+            transcribers = get_available_transcribers(video_path, chunks)
+            if not transcribers:
+                logger.warning("No transcription providers available")
+                finish_transcription(transcription, TranscriptionStatus.FAILED)
+                return
+
+            # Decode the whole audio once up front, into every profile the council and unchunked,
+            # non-streaming providers need
+            profiles = {t.AUDIO_PROFILE for t in transcribers if not (t.streams_audio or t.clip)}
+            profiles.add(TranscriptionCouncilConfig.AUDIO_PROFILE)
+            if settings.FINGERPRINT_ENABLED:
+                profiles.add(FINGERPRINT_PROFILE)
+            audio_paths = extract_audio_profiles(video_path, profiles)
+
+            if settings.FINGERPRINT_ENABLED:
+                fingerprint = compute_fingerprint(audio_paths[FINGERPRINT_PROFILE])
+
+                match = find_matching_transcription(fingerprint)
+                if match:
+                    # Same recording in another encoding: reuse its transcript instead of calling the providers
+                    transcription.duplicate_of = match
+                    transcription.save(update_fields=["duplicate_of"])
+                    copy_result(match, transcription)
+                    resolve_duplicates(transcription)
+                    dispatch_transcriptions.delay()
+                    return
+
+                store_fingerprint(transcription, fingerprint)
+
+            # Cut every chunk in the profiles of the providers transcribing it and store the clips, for the
+            # chunk tasks to read by name. Streaming providers decode the video while they upload it.
+            chunk_audio = []
+            for chunk in chunks:
+                cut = [t for t in transcribers if t.chunk == chunk and not t.streams_audio]
+                paths = extract_audio_profiles(video_path, {t.AUDIO_PROFILE for t in cut}, chunk.clip) if cut else {}
+                chunk_audio.append({provider_key(type(t)): share_artifact(paths[t.AUDIO_PROFILE]) for t in cut})
+            council_audio = share_artifact(audio_paths[TranscriptionCouncilConfig.AUDIO_PROFILE])
 
-        results = {}
-        audio_file_path = None
-        provider_errors = []
-
-        with ThreadPoolExecutor(max_workers=len(transcribers)) as executor:
-            future_map = {executor.submit(t.transcribe): t for t in transcribers}
-
-            for future in as_completed(future_map):
-                provider = future_map[future]
-                provider_name = provider.__class__.__name__.replace("TranscriberLLM", "").lower()
-
-                try:
-                    raw_result = future.result()
-
-                    text = provider.extract_text(raw_result)
-                    segments = provider.extract_segments(raw_result)
-
-                    results[provider_name] = {
-                        "used_model": provider_name,
-                        "generated_text": text,
-                        "segments": segments,
-                        "output_language": "en",
-                    }
-                    audio_file_path = provider.audio_path
-
-                except TRANSIENT_EXCEPTIONS as exc:
-                    logger.warning(
-                        "Transient provider failure",
-                        provider=provider_name,
-                        error=str(exc),
-                    )
-                    provider_errors.append(exc)
-
-                except Exception as exc:
-                    # Permanent provider failure – do not retry
-                    logger.error(
-                        "Permanent provider failure",
-                        provider=provider_name,
-                        error=str(exc),
-                    )
-
-        # If nothing succeeded AND we saw transient failures → retry
-        if not results and provider_errors:
-            raise provider_errors[0]
-
-        if not results:
-            transcription.status = TranscriptionStatus.FAILED
-            transcription.save(update_fields=["status"])
-            return
+    except TRANSIENT_EXCEPTIONS as exc:
+        logger.warning(
+            "Retrying handle_transcripts",
+            transcription_id=transcription_id,
+            retries=self.request.retries,
+            error=str(exc),
+        )
+        raise self.retry(exc=exc)
 
-        # ---- Gemini Council (external dependency) ----
-        try:
-            result = process_audio_with_gemini_council(
-                audio_file_path,
-                results,
-            )
-        except TRANSIENT_EXCEPTIONS as exc:
-            logger.warning(
-                "Gemini council temporarily unavailable",
-                error=str(exc),
-            )
-            raise
+    except Exception:
+        logger.exception("Permanent failure in handle_transcripts")
+        finish_transcription(transcription, TranscriptionStatus.FAILED)
+        raise
 
-        transcription_data, _ = TranscriptionData.objects.get_or_create(
-            transcription_id=transcription_id,
-            defaults={
-                "generated_text": result["generated_text"],
-                "segments": result.get("segments", []),
-                "used_model": result["evaluation"]["selected_provider"],
-                "output_language": "en",
-            },
+    # One task per chunk, its providers called concurrently from the worker's event loop
+    transcribe = group(
+        transcribe_chunk.s(
+            transcription_id,
+            video_name,
+            asdict(chunk),
+            [provider_key(type(t)) for t in transcribers if t.chunk == chunk],
+            audio,
         )
+        for chunk, audio in zip(chunks, chunk_audio)
+    )
+    prepare = prepare_council.s(transcription_id, council_audio, len(chunks))
+    stitch = stitch_subtitle_and_video.s(video_name)
+    if queue := lane_queue(transcription.lane):
+        # FFmpeg work of the job stays on the workers reserved for its lane
+        prepare = prepare.set(queue=queue)
+        stitch = stitch.set(queue=queue)
+
+    # Linked to every stage, the chunk tasks of the chord included (CELERY_TASK_ALLOW_ERROR_CB_ON_CHORD_HEADER)
+    failed = fail_transcription.si(transcription_id, transcription.dispatch_count)
+    pipeline = (
+        chord(transcribe, prepare).on_error(failed)
+        | select_transcript.s(transcription_id).on_error(failed)
+        | persist_transcript.s(transcription_id).on_error(failed)
+        | stitch.on_error(failed)
+    )
+    # With CELERY_TASK_ALWAYS_EAGER the pipeline runs in-line and joins the chord header here
+    with allow_join_result():
+        return self.replace(pipeline)
 
-        transcription.status = TranscriptionStatus.SUCCESS
-        transcription.save(update_fields=["status"])
 
-        stitch_subtitle_and_video.apply_async(args=[transcription_data.id, video_path])
+@shared_task(bind=True, max_retries=3, retry_backoff=True, retry_backoff_max=60, retry_jitter=True)
+def transcribe_chunk(
+    self,
+    transcription_id: str,
+    video_name: str,
+    chunk: dict,
+    providers: list[str],
+    audio: dict[str, str],
+    completed: list[dict] | None = None,
+) -> list[dict]:
+    """
+    Transcribe one chunk of a job's audio with every provider at once, each under its own timeout.
+    `audio` names the stored clip of the chunk each provider reads, as cut by handle_transcripts;
+    providers missing from it stream their audio from the video.
+
+    Only the providers that failed transiently are retried; results already in hand are carried
+    over to the retry. Once retries are exhausted, failures are returned instead of raised, so a
+    single provider cannot fail the chord the other chunks are part of.
+
+    Every result is checkpointed, so a job that is run again does not pay for the chunk twice.
+    """
+    log = logger.bind(transcription_id=transcription_id, chunk=chunk["index"])
+    completed = list(completed or [])
+
+    digest = inputs_digest(video_name, chunk)
+    checkpointed = {
+        provider: load_checkpoint(transcription_id, CheckpointStage.PROVIDER, digest, key=f"{provider}:{chunk['index']}")
+        for provider in providers
+    }
+    completed.extend(result for result in checkpointed.values() if result)
+    providers = [provider for provider in providers if not checkpointed[provider]]
+
+    health = {provider: ProviderHealth(provider) for provider in providers}
+    allowed = {provider: health[provider].allow() for provider in providers}
+    for provider in providers:
+        if not allowed[provider]:
+            # Opened since the job started, calling it would only add to its load, or half-open with its
+            # single probe taken by another call
+            log.warning("Skipping provider with open circuit", provider=provider, state=health[provider].state)
+            completed.append({"provider": provider, "chunk": chunk, "error": "Circuit open"})
+    providers = [provider for provider in providers if allowed[provider]]
+
+    transcribers, outcomes = [], []
+    if providers:
+        streaming = any(provider not in audio for provider in providers)
+        with local_copy(video_name) if streaming else nullcontext() as video_path:
+            transcribers = [
+                get_provider(provider)(
+                    video_path, AudioChunk(**chunk), fetch_artifact(audio[provider]) if provider in audio else None
+                )
+                for provider in providers
+            ]
+            outcomes = run(gather_transcripts(transcribers, settings.PROVIDER_TIMEOUTS, arrival_grace()))
+
+    retry = []
+    for provider, transcriber, outcome in zip(providers, transcribers, outcomes):
+        if isinstance(outcome, TRANSIENT_EXCEPTIONS + (TimeoutError,)):
+            health[provider].record_failure()
+        elif not isinstance(outcome, BaseException):
+            health[provider].record_success()
+
+        # Only providers whose circuit is still closed are retried, retries are extra load on a struggling one
+        if (
+            isinstance(outcome, TRANSIENT_EXCEPTIONS)
+            and self.request.retries < self.max_retries
+            and health[provider].state == CLOSED
+        ):
+            log.warning("Transient provider failure", provider=provider, retries=self.request.retries, error=repr(outcome))
+            retry.append(provider)
+
+        elif isinstance(outcome, ProviderLate):
+            # Kept apart from failures: the provider works, the job just did not wait for it
+            log.warning("Provider missed the latency budget", provider=provider)
+            completed.append({"provider": provider, "chunk": chunk, "error": str(outcome), "late": True})
+
+        elif isinstance(outcome, BaseException):
+            # Permanent failure, a transient one that outlasted the retries or opened the circuit, or a
+            # provider that used up its PROVIDER_TIMEOUTS entry, which a retry would only spend again
+            log.error("Provider failed", provider=provider, error=repr(outcome))
+            completed.append({"provider": provider, "chunk": chunk, "error": repr(outcome)})
+
+        else:
+            result = {
+                "provider": provider,
+                "chunk": chunk,
+                "text": transcriber.extract_text(outcome),
+                "segments": transcriber.extract_segments(outcome),
+            }
+            save_checkpoint(transcription_id, CheckpointStage.PROVIDER, digest, result, key=f"{provider}:{chunk['index']}")
+            completed.append(result)
+
+    log.info("Chunk transcribed", providers=providers, retrying=retry, **connection_stats())
+
+    if retry:
+        raise self.retry(args=(transcription_id, video_name, chunk, retry, audio, completed))
+
+    return completed
+
+
+@shared_task
+def prepare_council(
+    chunk_results: list[list[dict]], transcription_id: str, audio_name: str, chunk_count: int
+) -> dict | None:
+    """
+    Merge each provider's chunks and prepare the audio the Gemini council hears, cut down to where
+    the transcripts disagree (see prepare_council_audio). Runs on the cpu queue, for FFmpeg.
+    Returns None, and fails the job, when no provider transcribed every chunk.
+    """
+
+    parts = defaultdict(list)
+    late = set()
+    for result in chain.from_iterable(chunk_results):
+        if result.get("late"):
+            late.add(result["provider"])
+        elif "error" not in result:
+            parts[result["provider"]].append(result)
+
+    if late:
+        logger.info("Selecting without late providers", transcription_id=transcription_id, late=sorted(late))
+
+    results = {}
+    for provider_name, provider_parts in parts.items():
+        if len(provider_parts) < chunk_count:
+            # A missing chunk would leave a hole in the timeline
+            logger.error(
+                "Incomplete provider transcript",
+                provider=provider_name,
+                chunks=len(provider_parts),
+                expected=chunk_count,
+            )
+            continue
+
+        results[provider_name] = merge_chunk_results(provider_name, provider_parts)
+
+    if not results:
+        finish_transcription(Transcription.objects.get(id=transcription_id), TranscriptionStatus.FAILED)
+        return None
+
+    audio_path, excerpt = prepare_council_audio(fetch_artifact(audio_name), results)
+    return {"results": results, "audio": share_artifact(audio_path), "excerpt": excerpt}
+
+
+@shared_task(bind=True, max_retries=3, retry_backoff=True, retry_backoff_max=60, retry_jitter=True)
+def select_transcript(self, council: dict | None, transcription_id: str) -> dict | None:
+    """
+    Let the Gemini council select the best transcript, from the audio prepare_council stored.
+
+    The verdict is checkpointed, a job run again over the same transcripts does not ask the council twice.
+    A council failing for good fails the task, and the job is run again (see fail_transcription).
+    """
+    if council is None:
+        # The job failed before the council
+        return None
+
+    results = council["results"]
+
+    digest = inputs_digest(results)
+    verdict = load_checkpoint(transcription_id, CheckpointStage.VERDICT, digest)
+    if verdict:
+        return verdict
+
+    # ---- Gemini Council (external dependency) ----
+    try:
+        audio_file_path = fetch_artifact(council["audio"])
+        verdict = process_audio_with_gemini_council(audio_file_path, results, excerpt=council["excerpt"])
 
     except TRANSIENT_EXCEPTIONS as exc:
         logger.warning(
-            "Retrying handle_transcripts",
+            "Gemini council temporarily unavailable",
             transcription_id=transcription_id,
             retries=self.request.retries,
             error=str(exc),
@@ -133,38 +420,84 @@ def handle_transcripts(self, transcription_id: str, video_path: str):
         raise self.retry(exc=exc)
 
     except Exception:
-        logger.exception("Permanent failure in handle_transcripts")
-        transcription.status = TranscriptionStatus.FAILED
-        transcription.save(update_fields=["status"])
+        logger.exception("Permanent failure in select_transcript")
         raise
 
+    save_checkpoint(transcription_id, CheckpointStage.VERDICT, digest, verdict)
+    return verdict
+
+
+@shared_task
+def persist_transcript(result: dict | None, transcription_id: str) -> str | None:
+    """Store the selected transcript and complete the job; returns the id of the stored data."""
+    if result is None:
+        return None
+
+    transcription_data, _ = TranscriptionData.objects.get_or_create(
+        transcription_id=transcription_id,
+        defaults={
+            "generated_text": result["generated_text"],
+            "segments": result.get("segments", []),
+            "used_model": result["evaluation"]["selected_provider"],
+            "evaluation": result["evaluation"],
+            "output_language": "en",
+        },
+    )
+
+    # The transcript is stored for good, the outputs it was selected from are no longer needed
+    clear_checkpoints(transcription_id, CheckpointStage.PROVIDER, CheckpointStage.VERDICT)
+    finish_transcription(Transcription.objects.get(id=transcription_id), TranscriptionStatus.SUCCESS)
+
+    return str(transcription_data.id)
+
 
 @shared_task(bind=True, max_retries=3, retry_backoff=True, retry_backoff_max=30, retry_jitter=True)
-def stitch_subtitle_and_video(self, transcription_data_id: str, tmp_video_path: str) -> None:
+def stitch_subtitle_and_video(self, transcription_data_id: str | None, video_name: str) -> None:
     """
     Add sub-title to the video.
+    The subtitles and the stitched video are stored in blob storage next to the upload, and
+    checkpointed, so a retry neither stores the subtitles nor encodes the video again.
     """
+    if transcription_data_id is None:
+        # The job failed before a transcript was stored
+        return
+
     try:
         transcription_data = TranscriptionData.objects.get(id=transcription_data_id)
+        transcription_id = transcription_data.transcription_id
         segments = transcription_data.segments
 
+        digest = inputs_digest(video_name, transcription_data_id)
+        if load_checkpoint(transcription_id, CheckpointStage.STITCHED, digest):
+            return
+
+        if not load_checkpoint(transcription_id, CheckpointStage.SUBTITLE, digest):
+            subtitles = save_replacing(
+                f"subtitles/transcription_{transcription_data_id}.srt",
+                ContentFile(srt_content(segments).encode("utf-8")),
+            )
+            save_checkpoint(transcription_id, CheckpointStage.SUBTITLE, digest, {"blob": subtitles})
+
         subtitle_file_path = temp_srt_file_path(segments)
 
-        # FIXME: Upload video to S3
-        output_filename = f"transcription_{transcription_data_id}_with_subtitles.mp4"
-        output_video_path = str(STITCHED_VIDEOS_DIR / output_filename)
-
-        (
-            ffmpeg.input(tmp_video_path)
-            .output(
-                output_video_path,
-                vf=f"subtitles={subtitle_file_path}",
-                vcodec="libx264",
-                acodec="aac",
-                movflags="+faststart",
+        output_video = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4", prefix="stitched_")
+        output_video.close()
+
+        with local_copy(video_name) as video_path:
+            (
+                ffmpeg.input(video_path)
+                .output(
+                    output_video.name,
+                    vf=f"subtitles={subtitle_file_path}",
+                    vcodec="libx264",
+                    acodec="aac",
+                    movflags="+faststart",
+                )
+                .run(overwrite_output=True)
             )
-            .run(overwrite_output=True)
-        )
+
+        stitched = store_file(f"stitched/transcription_{transcription_data_id}_with_subtitles.mp4", output_video.name)
+        save_checkpoint(transcription_id, CheckpointStage.STITCHED, digest, {"blob": stitched})
 
     except Exception as exc:
         logger.warning(
@@ -177,3 +510,5 @@ def stitch_subtitle_and_video(self, transcription_data_id: str, tmp_video_path:
     finally:
         if "subtitle_file_path" in locals() and os.path.exists(subtitle_file_path):
             os.unlink(subtitle_file_path)
+        if "output_video" in locals() and os.path.exists(output_video.name):
+            os.unlink(output_video.name)
@@ -0,0 +1,175 @@
+import os
+import tempfile
+from pathlib import Path
+
+import magic
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+from .audio import AudioIngest, AudioProfile
+from .fingerprint import FINGERPRINT_PROFILE
+from .llms.chairman import TranscriptionCouncilConfig
+from .llms.providers import ALL_PROVIDERS
+from .scheduling import probe_media_duration
+from .storage import blob_storage, store_file, upload_name
+from .util import ContentHasher, temp_path_of_uploaded_video
+
+# Bytes given to libmagic to recognise the container
+SNIFF_SIZE = 2048
+
+
+def demuxable_from_pipe(mime: str, head: bytes) -> bool:
+    """
+    Whether FFmpeg can read the audio of a container front to back, without seeking.
+    Matroska and WebM always can; MP4 only when fragmented, i.e. its movie box announces fragments.
+    """
+    if mime in ("video/x-matroska", "video/webm"):
+        return True
+    return head[4:8] == b"ftyp" and b"mvex" in head
+
+
+def ingest_audio_profiles() -> set[AudioProfile]:
+    """Profiles of the whole audio that a job decodes up front."""
+    profiles = {
+        provider_cls.AUDIO_PROFILE
+        for provider_cls in ALL_PROVIDERS
+        if provider_cls.is_configured() and not (settings.AUDIO_STREAMING and provider_cls.SUPPORTS_STREAMING)
+    }
+    profiles.add(TranscriptionCouncilConfig.AUDIO_PROFILE)
+    if settings.FINGERPRINT_ENABLED:
+        profiles.add(FINGERPRINT_PROFILE)
+    return profiles
+
+
+class IngestedVideoFile(UploadedFile):
+    """An uploaded video already sniffed, hashed and written to disk."""
+
+    def __init__(
+        self, file, path, name, content_type, size, charset, content_type_extra, sniffed_type, content_hash, ingest=None
+    ):
+        super().__init__(file, name, content_type, size, charset, content_type_extra)
+        self.path = path
+        self.sniffed_type = sniffed_type
+        self.content_hash = content_hash
+        self.ingest = ingest
+        self.duration = None
+
+    def temporary_file_path(self):
+        return self.path
+
+    def persist(self) -> str:
+        """Move the upload into blob storage and return its stored name."""
+        if not self.sniffed_type.startswith("video/"):
+            raise ValueError(f"Unsupported file type: {self.sniffed_type}")
+
+        # Probed while the file is still local, the scheduler needs it at submission
+        self.duration = probe_media_duration(self.path)
+
+        # Filesystem storages rename the file through temporary_file_path()
+        name = blob_storage().save(upload_name(self.name), self)
+        self.file.close()
+
+        if self.ingest:
+            # Audio extracted during the upload is already in the cache when the job starts
+            self.ingest.finish()
+            self.ingest = None
+
+        return name
+
+    def close(self):
+        # Uploads that were not persisted are dropped at the end of the request
+        if self.ingest:
+            self.ingest.abandon("Upload was not accepted")
+        super().close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class VideoUploadHandler(FileUploadHandler):
+    """
+    Streams an uploaded video into UPLOAD_DIR, sniffing its type and hashing it on the way,
+    so it is written to disk once and moved into blob storage without another copy.
+
+    Bytes past max_size are counted but not stored, leaving the size error to the serializer.
+    """
+
+    def __init__(self, request=None, max_size: int | None = None):
+        super().__init__(request)
+        self.max_size = max_size
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+
+        upload_dir = Path(settings.UPLOAD_DIR)
+        upload_dir.mkdir(parents=True, exist_ok=True)
+
+        suffix = os.path.splitext(self.file_name)[1] or ".mp4"
+        fd, self.path = tempfile.mkstemp(suffix=suffix, prefix=".partial_", dir=upload_dir)
+        self.file = os.fdopen(fd, "w+b")
+
+        self.hasher = ContentHasher()
+        self.head = b""
+        self.received = 0
+        self.ingest = None
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+
+        if len(self.head) < SNIFF_SIZE:
+            self.head += raw_data[: SNIFF_SIZE - len(self.head)]
+
+        if start == 0 and settings.UPLOAD_AUDIO_INGEST:
+            # The first chunk is large enough to find the MP4 movie box
+            if demuxable_from_pipe(magic.from_buffer(self.head, mime=True), raw_data):
+                self.ingest = AudioIngest(ingest_audio_profiles())
+
+        if self.max_size is None or self.received <= self.max_size:
+            self.file.write(raw_data)
+            self.hasher.update(raw_data)
+            if self.ingest:
+                self.ingest.write(raw_data)
+        elif self.ingest:
+            self.ingest.abandon("Upload is too large")
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+
+        return IngestedVideoFile(
+            self.file,
+            self.path,
+            self.file_name,
+            self.content_type,
+            file_size,
+            self.charset,
+            self.content_type_extra,
+            sniffed_type=magic.from_buffer(self.head, mime=True),
+            content_hash=self.hasher.hexdigest(),
+            ingest=self.ingest,
+        )
+
+    def upload_interrupted(self):
+        if getattr(self, "ingest", None):
+            self.ingest.abandon("Upload was interrupted")
+        if hasattr(self, "file"):
+            self.file.close()
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+def persist_uploaded_video(video_file: UploadedFile) -> tuple[str, str, float | None]:
+    """
+    Return the stored name, content hash and duration of an uploaded video, moved to where the job reads it.
+    """
+    if isinstance(video_file, IngestedVideoFile):
+        name = video_file.persist()
+        return name, video_file.content_hash, video_file.duration
+
+    # Parsed by another handler, e.g. kept in memory
+    path, content_hash = temp_path_of_uploaded_video(video_file)
+    duration = probe_media_duration(path)
+    return store_file(upload_name(video_file.name), path), content_hash, duration
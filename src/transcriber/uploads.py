@@ -0,0 +1,109 @@
+import os
+from pathlib import Path
+
+import magic
+import structlog
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models.upload_session import UploadSession
+from .scheduling import probe_media_duration
+from .storage import store_file, upload_name
+from .util import ContentHasher
+
+logger = structlog.get_logger(__name__)
+
+
+UPLOAD_READ_SIZE = 1024 * 1024
+
+FINALIZE_CACHE_KEY = "upload-finalize:{upload_id}"
+
+
+def upload_path(session: UploadSession) -> Path:
+    suffix = os.path.splitext(session.filename)[1] or ".mp4"
+    return Path(settings.UPLOAD_DIR) / f"{session.id}{suffix}"
+
+
+def _resume_hasher(session: UploadSession, f) -> ContentHasher:
+    """Hasher positioned at the session offset: completed blocks from the session, the partial block from disk."""
+    hasher = ContentHasher(bytes(session.block_digests))
+
+    start = ContentHasher.resume_offset(bytes(session.block_digests))
+    f.seek(start)
+    hasher.update(f.read(session.offset - start))
+
+    return hasher
+
+
+def append_chunk(session: UploadSession, stream, length: int) -> int:
+    """
+    Append up to `length` bytes read from `stream` at the session offset and return how many were written.
+
+    The caller must hold a lock on the session row. Bytes beyond the offset left by an
+    interrupted request are overwritten, so a retried chunk never duplicates data.
+    """
+    path = upload_path(session)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch(exist_ok=True)
+
+    written = 0
+    with open(path, "r+b") as f:
+        hasher = _resume_hasher(session, f)
+        f.seek(session.offset)
+
+        while written < length:
+            data = stream.read(min(UPLOAD_READ_SIZE, length - written))
+            if not data:
+                break
+
+            f.write(data)
+            hasher.update(data)
+            written += len(data)
+
+        f.truncate()
+
+    session.offset += written
+    session.block_digests = bytes(hasher.block_digests)
+    session.save(update_fields=["offset", "block_digests", "updated_at"])
+
+    return written
+
+
+def claim_finalize(session: UploadSession) -> bool:
+    """Claim the finalization of an upload; False while another request is finalizing it."""
+    # cache.add is atomic, so only one of several concurrent finalize requests goes ahead
+    return cache.add(FINALIZE_CACHE_KEY.format(upload_id=session.id), True, timeout=settings.UPLOAD_FINALIZE_TIMEOUT)
+
+
+def release_finalize(session: UploadSession) -> None:
+    cache.delete(FINALIZE_CACHE_KEY.format(upload_id=session.id))
+
+
+def complete_upload(session: UploadSession) -> None:
+    """
+    Move a fully received upload into blob storage and mark the session completed with its stored name, content
+    hash and duration. Only the last partial hash block is read back, whatever the size of the video.
+
+    Probing and storing run before the session row is locked, a multi-GB copy must not hold the lock that chunk
+    uploads wait on. Callers serialise finalizes with claim_finalize, the received file is gone afterwards.
+    """
+    path = upload_path(session)
+
+    with open(path, "rb") as f:
+        mime = magic.from_buffer(f.read(2048), mime=True)
+        if not mime.startswith("video/"):
+            raise ValueError(f"Unsupported file type: {mime}")
+
+        content_hash = _resume_hasher(session, f).hexdigest()
+
+    duration = probe_media_duration(str(path))
+    name = store_file(upload_name(session.filename), str(path))
+
+    with transaction.atomic():
+        locked = UploadSession.objects.select_for_update().get(pk=session.pk)
+        for obj in (locked, session):
+            obj.video_name, obj.content_hash, obj.duration, obj.completed = name, content_hash, duration, True
+        locked.save(update_fields=["completed", "video_name", "content_hash", "duration", "updated_at"])
+
+    logger.info("Upload completed", upload_id=str(session.id), size=session.size, name=name)
@@ -1,13 +1,51 @@
+import hashlib
 import os
 import tempfile
 
 import magic
 from django.core.files.uploadedfile import TemporaryUploadedFile
 
+# Content hashes are SHA-256 over the SHA-256 digests of fixed-size blocks, so a resumable
+# upload can keep the digests of the blocks received so far and carry on in a later request
+CONTENT_HASH_BLOCK_SIZE = 4 * 1024 * 1024
 
-def temp_path_of_uploaded_video(video_file: TemporaryUploadedFile) -> str:
+
+class ContentHasher:
+    """Block-wise SHA-256 of uploaded content, resumable from the digests of completed blocks."""
+
+    def __init__(self, block_digests: bytes = b""):
+        self.block_digests = bytearray(block_digests)
+        self._block = hashlib.sha256()
+        self._block_size = 0
+
+    @staticmethod
+    def resume_offset(block_digests: bytes) -> int:
+        """Offset of the first byte not covered by the completed blocks."""
+        return len(block_digests) // hashlib.sha256().digest_size * CONTENT_HASH_BLOCK_SIZE
+
+    def update(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            part = view[: CONTENT_HASH_BLOCK_SIZE - self._block_size]
+            self._block.update(part)
+            self._block_size += len(part)
+            view = view[len(part) :]
+
+            if self._block_size == CONTENT_HASH_BLOCK_SIZE:
+                self.block_digests += self._block.digest()
+                self._block = hashlib.sha256()
+                self._block_size = 0
+
+    def hexdigest(self) -> str:
+        digests = bytes(self.block_digests)
+        if self._block_size:
+            digests += self._block.digest()
+        return hashlib.sha256(digests).hexdigest()
+
+
+def temp_path_of_uploaded_video(video_file: TemporaryUploadedFile) -> tuple[str, str]:
     """
-    Upload video file to temp path and return
+    Upload video file to temp path and return it with the content hash
     Celery do not support receiving the file object itself
     """
     # validate MIME type
@@ -20,12 +58,14 @@ def temp_path_of_uploaded_video(video_file: TemporaryUploadedFile) -> str:
 
     suffix = os.path.splitext(video_file.name)[1] or ".mp4"
     temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix, prefix="upload_")
+    content_hash = ContentHasher()
 
     for chunk in video_file.chunks():
         temp_file.write(chunk)
+        content_hash.update(chunk)
 
     temp_file.close()
-    return temp_file.name
+    return temp_file.name, content_hash.hexdigest()
 
 
 def format_time(seconds: float) -> str:
@@ -43,6 +83,17 @@ def format_time(seconds: float) -> str:
     return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
 
 
+def srt_content(segments: list[dict]) -> str:
+    """
+    Render segments as SRT subtitles.
+    Each segment should be a dict with 'start', 'end', and 'text' keys.
+    """
+    return "".join(
+        f"{idx}\n{format_time(segment['start'])} --> {format_time(segment['end'])}\n{segment['text']}\n\n"
+        for idx, segment in enumerate(segments, start=1)
+    )
+
+
 def temp_srt_file_path(segments: list[dict]) -> str:
     """
     Create a temporary SRT file from segments and return its path.
@@ -50,10 +101,7 @@ def temp_srt_file_path(segments: list[dict]) -> str:
     """
     temp_srt = tempfile.NamedTemporaryFile(delete=False, suffix=".srt", prefix="subs_")
     with open(temp_srt.name, "w", encoding="utf-8") as f:
-        for idx, segment in enumerate(segments, start=1):
-            f.write(f"{idx}\n")
-            f.write(f"{format_time(segment['start'])} --> {format_time(segment['end'])}\n")
-            f.write(f"{segment['text']}\n\n")
+        f.write(srt_content(segments))
 
     return escape_subtitle_path_for_ffmpeg(temp_srt.name)
 
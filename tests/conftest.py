@@ -1,9 +1,11 @@
 import json
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 
 import pytest
 from django.conf import settings as django_settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.base import ContentFile
 from django.utils.timezone import now
 from rest_framework.test import APIClient
@@ -49,6 +51,23 @@ def load_video_file():
 def celery_eager(settings):
     settings.CELERY_TASK_ALWAYS_EAGER = True
     settings.CELERY_TASK_EAGER_PROPAGATES = True
+    # Chords keep their results in the result backend, even when run eagerly
+    settings.CELERY_RESULT_BACKEND = "cache+memory://"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Throttle history and in-flight jobs live in the cache
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def blob_storage_dir(settings, tmp_path):
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "blobs": {"BACKEND": "django.core.files.storage.FileSystemStorage", "OPTIONS": {"location": tmp_path / "blobs"}},
+    }
+    return tmp_path / "blobs"
 
 
 @pytest.fixture
@@ -67,6 +86,10 @@ def mock_assemblyai_transcribe(mocker):
     mock_transcript.error = None
 
     mocker.patch("assemblyai.Transcriber.transcribe", return_value=mock_transcript)
+    # Async path of the adapter awaits the SDK's future
+    future = Future()
+    future.set_result(mock_transcript)
+    mocker.patch("assemblyai.Transcriber.transcribe_async", return_value=future)
 
     return mock_transcript
 
@@ -85,6 +108,11 @@ def mock_open_ai_transcription_create(mocker):
     ]
 
     mocker.patch("openai.resources.audio.transcriptions.Transcriptions.create", return_value=mock_resp)
+    mocker.patch(
+        "openai.resources.audio.transcriptions.AsyncTranscriptions.create",
+        new_callable=mocker.AsyncMock,
+        return_value=mock_resp,
+    )
 
     return mock_resp
 
@@ -212,7 +240,8 @@ def mock_gemini_chairman(mocker):
 
     # Patch the exact SDK call used in your code
     mocker.patch(
-        "google.genai.models.Models.generate_content",
+        "google.genai.models.AsyncModels.generate_content",
+        new_callable=mocker.AsyncMock,
         return_value=mock_response,
     )
 
@@ -0,0 +1,191 @@
+from types import SimpleNamespace
+
+import pytest
+from django.urls import reverse
+from google.genai.models import AsyncModels
+
+from transcriber.audio import OPUS_16K_MONO, extract_audio
+from transcriber.llms.agreement import (
+    agreement_evaluation,
+    disagreement_excerpt,
+    transcript_agreement,
+    word_edit_distance,
+)
+from transcriber.llms.chairman import TranscriptionCouncil, prepare_council_audio
+from transcriber.llms.open_ai import OpenAITranscriberLLM
+from transcriber.models import Transcription, TranscriptionData
+
+
+@pytest.mark.parametrize(
+    "a, b, distance",
+    [
+        ("", "", 0),
+        ("", "one two", 2),
+        ("the cat sat", "the cat sat", 0),
+        ("the cat sat", "the bat sat", 1),
+        ("the cat sat on the mat", "the cat on the mat", 1),
+        ("kitten sitting", "sitting kitten", 2),
+    ],
+)
+def test_word_edit_distance(a, b, distance):
+    assert word_edit_distance(a.split(), b.split()) == distance
+    assert word_edit_distance(b.split(), a.split()) == distance
+
+
+def test_agreement_ignores_case_and_punctuation():
+    agreement, distance, words = transcript_agreement("Well, I don't know.", "well i don't know")
+
+    assert (agreement, distance, words) == (1.0, 0, 4)
+
+
+def test_chairman_is_asked_below_the_threshold(settings):
+    settings.COUNCIL_AGREEMENT_THRESHOLD = 0.9
+    openai = {"generated_text": " ".join(["word"] * 19 + ["here"])}
+
+    agreed = agreement_evaluation(openai, {"generated_text": " ".join(["word"] * 19 + ["there"])})
+    assert agreed["comparison"]["winner"] == "A"
+    assert agreed["agreement"] == 0.95
+    assert "1 word edits over 20 words" in agreed["final_reasoning"]
+
+    assert agreement_evaluation(openai, {"generated_text": " ".join(["word"] * 17 + ["a", "b", "c"])}) is None
+    # A single transcript leaves nothing to agree on
+    assert agreement_evaluation(openai, None) is None
+
+
+def spoken(words, seconds_per_word=1.0):
+    """A result with one segment per word."""
+    segments = [
+        {"start": i * seconds_per_word, "end": (i + 1) * seconds_per_word, "text": word} for i, word in enumerate(words)
+    ]
+    return {"generated_text": " ".join(words), "segments": segments}
+
+
+@pytest.fixture
+def excerpt_settings(settings):
+    settings.COUNCIL_AGREEMENT_THRESHOLD = None
+    settings.COUNCIL_EXCERPT_MIN_SECONDS = 60
+    settings.COUNCIL_EXCERPT_PADDING = 2.0
+    settings.COUNCIL_EXCERPT_MAX_SHARE = 0.5
+
+
+def test_excerpt_covers_the_disagreements_only(excerpt_settings):
+    words = [f"w{i}" for i in range(300)]
+    other = list(words)
+    other[100] = "wrong"
+    other[103] = "also"
+    del other[250]
+
+    regions = disagreement_excerpt(spoken(words), spoken(other))
+
+    # Neighbouring differences share a region, a dropped word is placed where the other transcript has it
+    assert [(region["start"], region["end"]) for region in regions] == [(98.0, 106.0), (248.0, 253.0)]
+    assert [region["offset"] for region in regions] == [0.0, 8.0]
+    assert regions[0]["a"].split()[2] == "w100"
+    assert regions[0]["b"].split()[2] == "wrong"
+
+
+def test_short_or_thoroughly_different_recordings_are_heard_whole(excerpt_settings):
+    words = [f"w{i}" for i in range(300)]
+
+    assert disagreement_excerpt(spoken(words[:50]), spoken(words[:49] + ["wrong"])) is None
+    assert disagreement_excerpt(spoken(words), spoken([f"x{i}" for i in range(300)])) is None
+
+
+def test_excerpt_follows_word_times(excerpt_settings):
+    words = [f"w{i}" for i in range(100)]
+    other = list(words)
+    other[50] = "wrong"
+    # A single long segment, as Whisper returns them, with the times of its words
+    segment = {"start": 0.0, "end": 100.0, "text": " ".join(words)}
+    timed_words = [{"start": float(i), "end": i + 1.0, "text": word} for i, word in enumerate(words)]
+
+    regions = disagreement_excerpt({**spoken(words), "segments": [{**segment, "words": timed_words}]}, spoken(other))
+    assert [(region["start"], region["end"]) for region in regions] == [(48.0, 53.0)]
+
+    # Without word times the word could be anywhere in the segment, all of which is too much for an excerpt
+    assert disagreement_excerpt({**spoken(words), "segments": [segment]}, spoken(other)) is None
+
+
+def test_openai_words_are_kept_with_their_segments():
+    def timed(**kwargs):
+        return SimpleNamespace(**kwargs)
+
+    result = {
+        "segments": [timed(start=0.0, end=1.0, text=" Hello there."), timed(start=1.0, end=2.0, text=" Bye.")],
+        "words": [
+            timed(start=0.1, end=0.4, word="Hello"),
+            timed(start=0.5, end=0.9, word="there"),
+            timed(start=1.2, end=1.6, word="Bye"),
+        ],
+    }
+
+    segments = OpenAITranscriberLLM(None).extract_segments(result)
+
+    assert [segment["text"] for segment in segments] == ["Hello there.", "Bye."]
+    assert [[word["text"] for word in segment["words"]] for segment in segments] == [["Hello", "there"], ["Bye"]]
+
+
+@pytest.mark.django_db
+def test_chairman_hears_the_excerpt(excerpt_settings, settings, mock_gemini_chairman, set_dummy_api_key, tmp_path):
+    settings.AUDIO_CACHE_DIR = tmp_path / "audio"
+    settings.COUNCIL_EXCERPT_MIN_SECONDS = 0
+    settings.COUNCIL_EXCERPT_PADDING = 0.25
+    audio = extract_audio("tests/data/video.mp4", OPUS_16K_MONO)
+    words = ["one", "two", "three", "four", "five", "six", "seven", "eight"]
+
+    results = {"openai": spoken(words, 0.5), "assembly": spoken(words[:5] + ["sax"] + words[6:], 0.5)}
+
+    excerpt_path, excerpt = prepare_council_audio(audio, results)
+    TranscriptionCouncil("key").select_best_transcription(
+        excerpt_path, results["openai"], results["assembly"], excerpt=excerpt
+    )
+
+    (audio_part, prompt_part) = AsyncModels.generate_content.call_args.kwargs["contents"][0].parts
+    assert len(audio_part.inline_data.data) < len(open(audio, "rb").read())
+    assert 'A: "five six seven"' in prompt_part.text
+    assert 'B: "five sax seven"' in prompt_part.text
+
+
+@pytest.mark.django_db
+def test_agreeing_providers_skip_the_chairman(
+    api_client,
+    load_video_file,
+    mock_assemblyai_transcribe,
+    mock_open_ai_transcription_create,
+    mock_gemini_chairman,
+    user,
+    set_dummy_api_key,
+    settings,
+):
+    settings.COUNCIL_AGREEMENT_PROVIDER = "assembly"
+    mock_assemblyai_transcribe.text = "this is a mocked transcript from openai"
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    assert AsyncModels.generate_content.call_count == 0
+    data = TranscriptionData.objects.get(transcription_id=response.data["id"])
+    assert data.used_model == "AssemblyAI"
+    assert data.evaluation["method"] == "local-agreement"
+    assert data.evaluation["agreement"] > 0.9
+
+
+@pytest.mark.django_db
+def test_agreeing_providers_need_no_chairman_key(
+    api_client,
+    load_video_file,
+    mock_assemblyai_transcribe,
+    mock_open_ai_transcription_create,
+    mock_gemini_chairman,
+    user,
+    set_dummy_api_key,
+    settings,
+):
+    settings.GEMINI_API_KEY = None
+    mock_assemblyai_transcribe.text = "this is a mocked transcript from openai"
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    assert Transcription.objects.get(id=response.data["id"]).status == "Success"
+    assert TranscriptionData.objects.get(transcription_id=response.data["id"]).evaluation["method"] == "local-agreement"
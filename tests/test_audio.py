@@ -0,0 +1,81 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import ffmpeg
+import pytest
+
+from transcriber import audio
+from transcriber.audio import FLAC_16K_MONO, OPUS_16K_MONO, extract_audio, extract_audio_profiles, extract_excerpt
+from transcriber.chunking import probe_duration
+from transcriber.llms.open_ai import OpenAITranscriberLLM
+
+
+@pytest.fixture
+def audio_cache_dir(settings, tmp_path):
+    settings.AUDIO_CACHE_DIR = tmp_path / "audio"
+    return settings.AUDIO_CACHE_DIR
+
+
+def test_extract_audio_is_content_addressed(audio_cache_dir, tmp_path):
+    copy_path = tmp_path / "copy.mp4"
+    copy_path.write_bytes(Path("tests/data/video.mp4").read_bytes())
+
+    first = extract_audio("tests/data/video.mp4")
+    second = extract_audio(str(copy_path))
+
+    assert first == second
+    assert Path(first).parent == audio_cache_dir
+    assert list(audio_cache_dir.iterdir()) == [Path(first)]
+
+
+def test_concurrent_extractions_share_one_decode(audio_cache_dir, mocker):
+    spy = mocker.spy(ffmpeg, "input")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        paths = list(executor.map(lambda _: extract_audio("tests/data/video.mp4"), range(4)))
+
+    assert len(set(paths)) == 1
+    assert spy.call_count == 1
+
+
+def test_extraction_locks_do_not_grow_per_video():
+    digests = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(1000)]
+
+    locks = {id(audio._extraction_lock(digest)) for digest in digests}
+
+    assert audio._extraction_lock(digests[0]) is audio._extraction_lock(digests[0])
+    assert len(locks) == len(audio._extraction_locks) == audio.EXTRACTION_LOCK_STRIPES
+
+
+def test_profiles_are_encoded_from_one_decode_and_cached(audio_cache_dir, mocker):
+    spy = mocker.spy(ffmpeg, "input")
+
+    paths = extract_audio_profiles("tests/data/video.mp4", {FLAC_16K_MONO, OPUS_16K_MONO})
+    assert paths[FLAC_16K_MONO].endswith(".flac")
+    assert paths[OPUS_16K_MONO].endswith(".ogg")
+    assert spy.call_count == 1
+
+    assert extract_audio("tests/data/video.mp4", OPUS_16K_MONO) == paths[OPUS_16K_MONO]
+    assert spy.call_count == 1
+
+
+def test_streaming_mode_reads_audio_from_ffmpeg_pipe(audio_cache_dir, settings):
+    settings.AUDIO_STREAMING = True
+    provider = OpenAITranscriberLLM("tests/data/video.mp4")
+
+    with provider.open_audio() as stream:
+        assert stream.name == "audio.ogg"
+        data = b"".join(stream)
+
+    assert data.startswith(b"OggS")
+    assert not audio_cache_dir.exists()
+
+
+def test_excerpt_joins_the_clips(audio_cache_dir):
+    audio = extract_audio("tests/data/video.mp4", OPUS_16K_MONO)
+
+    excerpt = extract_excerpt(audio, [(0.5, 1.5), (3.0, 4.0)], OPUS_16K_MONO)
+
+    assert probe_duration(excerpt) == pytest.approx(2.0, abs=0.1)
+    assert extract_excerpt(audio, [(0.5, 1.5), (3.0, 4.0)], OPUS_16K_MONO) == excerpt
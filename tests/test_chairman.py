@@ -0,0 +1,253 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from google.genai import _api_client, errors
+from google.genai.models import AsyncModels
+
+from transcriber.llms.chairman import GeminiChairmanEvaluator, TranscriptionCouncil, TranscriptionCouncilConfig
+from transcriber.models import ChairmanVerdict
+
+
+class FakeFilesAPI(BaseHTTPRequestHandler):
+    """The resumable upload protocol of the Gemini Files API, keeping what it receives."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+
+        if self.path.startswith("/upload/"):
+            # Start of an upload: announce where the bytes go
+            server.uploads += 1
+            server.received[server.uploads] = b""
+            self.reply({}, {"X-Goog-Upload-URL": f"http://{self.headers['Host']}/session/{server.uploads}"})
+            return
+
+        upload = int(self.path.rsplit("/", 1)[1])
+        server.received[upload] += body
+        server.chunks += 1
+        if "finalize" not in self.headers["X-Goog-Upload-Command"]:
+            self.reply({}, {"X-Goog-Upload-Status": "active"})
+            return
+
+        name = f"files/audio-{upload}"
+        file = {"name": name, "uri": f"http://{self.headers['Host']}/v1beta/{name}", "mimeType": "audio/ogg"}
+        self.reply(
+            {"file": {**file, "state": "ACTIVE", "sizeBytes": str(len(server.received[upload]))}},
+            {"X-Goog-Upload-Status": "final"},
+        )
+
+    def reply(self, payload, headers):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        for name, value in {**headers, "Content-Type": "application/json", "Content-Length": str(len(body))}.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def files_api(settings, mocker):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeFilesAPI)
+    server.uploads, server.chunks, server.received = 0, 0, {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    settings.GEMINI_BASE_URL = f"http://127.0.0.1:{server.server_port}/"
+    settings.CHAIRMAN_INLINE_AUDIO_MAX_BYTES = 0
+    # Small chunks, to see the audio is streamed rather than sent in one piece
+    mocker.patch.object(_api_client, "CHUNK_SIZE", 64 * 1024)
+
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def long_audio(tmp_path):
+    path = tmp_path / "council.ogg"
+    path.write_bytes(os.urandom(300 * 1024))
+    return str(path)
+
+
+def evaluate(audio):
+    return GeminiChairmanEvaluator("key").evaluate_transcriptions(audio, "File: council.ogg", {"text": "Hello"})
+
+
+def test_audio_is_streamed_to_the_files_api_once(files_api, long_audio, mock_gemini_chairman):
+    evaluate(long_audio)
+    evaluate(long_audio)
+
+    assert files_api.uploads == 1
+    assert files_api.chunks == 5
+    assert files_api.received[1] == open(long_audio, "rb").read()
+    (audio_part, _) = AsyncModels.generate_content.call_args.kwargs["contents"][0].parts
+    assert audio_part.inline_data is None
+    assert audio_part.file_data.file_uri.endswith("/v1beta/files/audio-1")
+
+
+def test_expired_upload_is_uploaded_again(files_api, long_audio, mock_gemini_chairman, mocker):
+    evaluate(long_audio)
+    generate = AsyncModels.generate_content
+    mocker.patch.object(
+        AsyncModels,
+        "generate_content",
+        new_callable=mocker.AsyncMock,
+        side_effect=[errors.ClientError(403, {"error": {"message": "File has expired"}}), generate.return_value],
+    )
+
+    evaluate(long_audio)
+
+    assert files_api.uploads == 2
+    (audio_part, _) = AsyncModels.generate_content.call_args.kwargs["contents"][0].parts
+    assert audio_part.file_data.file_uri.endswith("/v1beta/files/audio-2")
+
+
+@pytest.fixture
+def council_audio(tmp_path):
+    path = tmp_path / "council.ogg"
+    path.write_bytes(os.urandom(1024))
+    return str(path)
+
+
+def select(audio, openai_text="Hello there", assembly_text="Hello, there!"):
+    return TranscriptionCouncil("key").select_best_transcription(
+        audio, {"generated_text": openai_text, "segments": []}, {"generated_text": assembly_text, "segments": []}
+    )
+
+
+@pytest.mark.django_db
+def test_verdicts_are_reused_for_the_same_inputs(council_audio, mock_gemini_chairman, settings, monkeypatch):
+    settings.COUNCIL_AGREEMENT_THRESHOLD = None
+
+    first, _ = select(council_audio)
+    again, _ = select(council_audio)
+    assert AsyncModels.generate_content.call_count == 1
+    assert again["evaluation"] == first["evaluation"]
+
+    # Another candidate transcript or prompt version is another question
+    select(council_audio, assembly_text="Hello, where?")
+    version = TranscriptionCouncilConfig.PROMPT_VERSION
+    monkeypatch.setattr(TranscriptionCouncilConfig, "PROMPT_VERSION", version + 1)
+    select(council_audio)
+    assert AsyncModels.generate_content.call_count == 3
+    assert sorted(ChairmanVerdict.objects.values_list("prompt_version", flat=True)) == [version, version, version + 1]
+
+
+@pytest.mark.django_db
+def test_verdicts_expire_and_the_least_recently_used_are_evicted(council_audio, mock_gemini_chairman, settings, freezer):
+    settings.COUNCIL_AGREEMENT_THRESHOLD = None
+    settings.CHAIRMAN_VERDICT_CACHE_MAX_ENTRIES = 2
+    settings.CHAIRMAN_VERDICT_CACHE_TTL = 3600
+
+    select(council_audio, assembly_text="one")
+    freezer.tick(60)
+    select(council_audio, assembly_text="two")
+    freezer.tick(60)
+    select(council_audio, assembly_text="one")
+    freezer.tick(60)
+    select(council_audio, assembly_text="three")
+
+    # "two" was used least recently
+    assert AsyncModels.generate_content.call_count == 3
+    assert ChairmanVerdict.objects.count() == 2
+    select(council_audio, assembly_text="one")
+    assert AsyncModels.generate_content.call_count == 3
+
+    freezer.tick(3600)
+    select(council_audio, assembly_text="one")
+    assert AsyncModels.generate_content.call_count == 4
+
+
+def compact_answer(confidence):
+    scores = {"accuracy": 9, "punctuation": 8, "formatting": 8, "completeness": 9, "timestamps": 7}
+    return json.dumps({"A": scores, "B": {**scores, "accuracy": 6}, "comparison": {"winner": "A", "confidence": confidence}})
+
+
+@pytest.mark.django_db
+def test_chairman_answers_with_scores_only(council_audio, mock_gemini_chairman, settings):
+    settings.COUNCIL_AGREEMENT_THRESHOLD = None
+    AsyncModels.generate_content.return_value.text = compact_answer("high")
+
+    best, evaluation = select(council_audio)
+
+    assert AsyncModels.generate_content.call_count == 1
+    config = AsyncModels.generate_content.call_args.kwargs["config"]
+    assert config.response_mime_type == "application/json"
+    assert config.response_schema.properties["comparison"].properties["winner"].enum == ["A", "B"]
+    (_, prompt) = AsyncModels.generate_content.call_args.kwargs["contents"][0].parts
+    assert "without any reasoning" in prompt.text
+    assert "final_reasoning" not in prompt.text
+
+    assert best["generated_text"] == "Hello there"
+    assert evaluation["A"]["total_score"] > evaluation["B"]["total_score"]
+    assert evaluation["comparison"]["score_difference"] > 0
+    assert ChairmanVerdict.objects.get().verbose is False
+
+
+@pytest.mark.django_db
+def test_low_confidence_verdict_is_explained(council_audio, mock_gemini_chairman, settings, mocker):
+    settings.COUNCIL_AGREEMENT_THRESHOLD = None
+    AsyncModels.generate_content.side_effect = [
+        mocker.MagicMock(text=compact_answer("low")),
+        mocker.MagicMock(text=json.dumps(mock_gemini_chairman)),
+    ]
+
+    best, evaluation = select(council_audio)
+
+    assert AsyncModels.generate_content.call_count == 2
+    assert AsyncModels.generate_content.call_args.kwargs["config"].response_schema is None
+    assert "final_reasoning" in evaluation
+    assert best["generated_text"] == "Hello, there!"
+    assert sorted(ChairmanVerdict.objects.values_list("verbose", flat=True)) == [False, True]
+
+    # Both answers are reused
+    select(council_audio)
+    assert AsyncModels.generate_content.call_count == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("verbose", [False, True])
+@pytest.mark.parametrize("provider", ["openai", "assembly"])
+def test_single_candidate_is_selected(council_audio, mock_gemini_chairman, settings, provider, verbose):
+    settings.COUNCIL_AGREEMENT_THRESHOLD = None
+    label, other = ("A", "B") if provider == "openai" else ("B", "A")
+    if verbose:
+        answer = {key: value for key, value in mock_gemini_chairman.items() if key != other}
+        answer["comparison"] = {**answer["comparison"], "winner": label}
+    else:
+        scores = {"accuracy": 9, "punctuation": 8, "formatting": 8, "completeness": 9, "timestamps": 7}
+        answer = {label: scores, "comparison": {"winner": label, "confidence": "low"}}
+    AsyncModels.generate_content.return_value.text = json.dumps(answer)
+    result = {"generated_text": "Hello there", "segments": []}
+    results = {"openai": result, "assembly": None} if provider == "openai" else {"openai": None, "assembly": result}
+
+    best, evaluation = TranscriptionCouncil("key").select_best_transcription(
+        council_audio, results["openai"], results["assembly"], verbose=verbose
+    )
+
+    assert "error" not in evaluation
+    assert evaluation["comparison"]["score_difference"] == 0
+    assert best is result
+    assert best["evaluation"]["selected_provider"] == ("OpenAI" if provider == "openai" else "AssemblyAI")
+    # A low confidence in the only candidate is explained once, on the verbose path
+    assert AsyncModels.generate_content.call_count == (1 if verbose else 2)
+
+
+@pytest.mark.django_db
+def test_unparsable_answer_falls_back_to_a_present_candidate(council_audio, mock_gemini_chairman, settings):
+    settings.COUNCIL_AGREEMENT_THRESHOLD = None
+    AsyncModels.generate_content.return_value.text = "not json"
+    result = {"generated_text": "Hello there", "segments": []}
+
+    best, evaluation = TranscriptionCouncil("key").select_best_transcription(council_audio, None, result)
+
+    assert "error" in evaluation
+    assert best is result
+    # Nothing to explain, the chairman is not asked again
+    assert AsyncModels.generate_content.call_count == 1
@@ -0,0 +1,96 @@
+import pytest
+from assemblyai import Transcriber
+from django.core.files.base import ContentFile
+from django.urls import reverse
+from google.genai.models import AsyncModels
+from openai.resources.audio.transcriptions import AsyncTranscriptions
+
+from transcriber.checkpoints import inputs_digest, load_checkpoint, save_checkpoint
+from transcriber.models import JobCheckpoint, Transcription, TranscriptionData
+from transcriber.models.job_checkpoint import CheckpointStage
+from transcriber.storage import blob_storage
+
+
+@pytest.fixture
+def errbacks(settings):
+    # Errbacks are called by a worker handling the failure, which eager tasks skip when they propagate it
+    settings.CELERY_TASK_EAGER_PROPAGATES = False
+
+
+@pytest.mark.django_db
+def test_failed_job_is_run_again_from_its_provider_checkpoints(
+    api_client,
+    load_video_file,
+    mock_assemblyai_transcribe,
+    mock_open_ai_transcription_create,
+    mock_gemini_chairman,
+    user,
+    set_dummy_api_key,
+    errbacks,
+    mocker,
+):
+    generate = AsyncModels.generate_content
+    mocker.patch.object(
+        AsyncModels, "generate_content", side_effect=[ValueError("Council unavailable"), generate.return_value]
+    )
+    api_client.force_authenticate(user=user)
+
+    api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    transcription = Transcription.objects.get()
+    assert transcription.status == "Success"
+    assert transcription.dispatch_count == 2
+    # The providers were not paid for again
+    assert (AsyncTranscriptions.create.call_count, Transcriber.transcribe_async.call_count) == (1, 1)
+    assert TranscriptionData.objects.filter(transcription=transcription).exists()
+    # Only the checkpoints of the files remain once the transcript is stored
+    assert set(transcription.checkpoints.values_list("stage", flat=True)) == {
+        CheckpointStage.SUBTITLE,
+        CheckpointStage.STITCHED,
+    }
+
+
+@pytest.mark.django_db
+def test_checkpoints_of_a_job_failed_for_good_are_cleared(
+    api_client,
+    load_video_file,
+    mock_assemblyai_transcribe,
+    mock_open_ai_transcription_create,
+    mock_gemini_chairman,
+    user,
+    set_dummy_api_key,
+    errbacks,
+    settings,
+    mocker,
+):
+    settings.SCHEDULER_MAX_DISPATCHES = 2
+    mocker.patch.object(AsyncModels, "generate_content", side_effect=ValueError("Council unavailable"))
+    api_client.force_authenticate(user=user)
+
+    api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    transcription = Transcription.objects.get()
+    assert transcription.status == "Failed"
+    assert AsyncModels.generate_content.call_count == 2
+    assert AsyncTranscriptions.create.call_count == 1
+    assert not transcription.checkpoints.exists()
+
+
+@pytest.mark.django_db
+def test_checkpoint_of_other_inputs_or_a_lost_blob_is_stale(transcription_pending_status):
+    transcription_id = transcription_pending_status.id
+    digest = inputs_digest("uploads/video.mp4", {"index": 0, "start": 0.0, "end": 30.0})
+    save_checkpoint(transcription_id, CheckpointStage.PROVIDER, digest, {"text": "Hello"}, key="openai:0")
+
+    assert load_checkpoint(transcription_id, CheckpointStage.PROVIDER, digest, key="openai:0") == {"text": "Hello"}
+    assert load_checkpoint(transcription_id, CheckpointStage.PROVIDER, digest, key="assembly:0") is None
+    other = inputs_digest("uploads/video.mp4", {"index": 0, "start": 0.0, "end": 25.0})
+    assert load_checkpoint(transcription_id, CheckpointStage.PROVIDER, other, key="openai:0") is None
+
+    name = blob_storage().save("subtitles/checkpoint-test.srt", ContentFile(b"1"))
+    save_checkpoint(transcription_id, CheckpointStage.SUBTITLE, digest, {"blob": name})
+    assert load_checkpoint(transcription_id, CheckpointStage.SUBTITLE, digest) == {"blob": name}
+
+    blob_storage().delete(name)
+    assert load_checkpoint(transcription_id, CheckpointStage.SUBTITLE, digest) is None
+    assert JobCheckpoint.objects.count() == 2
@@ -0,0 +1,83 @@
+import pytest
+from django.urls import reverse
+
+from transcriber.chunking import AudioChunk, plan_chunks, split_at_silences, stitch_segments
+from transcriber.models import TranscriptionData
+
+
+def test_split_cuts_in_latest_silence_before_limit():
+    chunks = split_at_silences(
+        duration=25.0,
+        silences=[(3.0, 4.0), (7.5, 8.5), (16.0, 17.0)],
+        max_seconds=10.0,
+        min_seconds=2.0,
+        overlap=0.5,
+    )
+
+    assert [(chunk.start, chunk.end) for chunk in chunks] == [(0.0, 8.0), (8.0, 16.5), (16.5, 25.0)]
+    assert chunks[1].clip == (7.5, 17.0)
+    assert [chunk.last for chunk in chunks] == [False, False, True]
+
+
+def test_split_falls_back_to_hard_cut_without_silence():
+    chunks = split_at_silences(duration=25.0, silences=[], max_seconds=10.0, min_seconds=2.0, overlap=0.0)
+
+    assert [(chunk.start, chunk.end) for chunk in chunks] == [(0.0, 10.0), (10.0, 20.0), (20.0, 25.0)]
+
+
+def test_stitch_shifts_segments_and_drops_overlap_duplicates():
+    first = AudioChunk(index=0, start=0.0, end=10.0, overlap=1.0, last=False)
+    second = AudioChunk(index=1, start=10.0, end=20.0, overlap=1.0, last=True)
+
+    stitched = stitch_segments(
+        [
+            (
+                second,
+                [
+                    {"start": 0.2, "end": 0.8, "text": "boundary"},
+                    {"start": 1.5, "end": 3.0, "text": "after", "words": [{"start": 1.5, "end": 2.0, "text": "after"}]},
+                ],
+            ),
+            (first, [{"start": 8.0, "end": 9.0, "text": "before"}, {"start": 9.2, "end": 9.8, "text": "boundary"}]),
+        ]
+    )
+
+    assert [(segment["start"], segment["end"], segment["text"]) for segment in stitched] == [
+        (8.0, 9.0, "before"),
+        (9.2, 9.8, "boundary"),
+        (10.5, 12.0, "after"),
+    ]
+    assert stitched[-1]["words"] == [{"start": 10.5, "end": 11.0, "text": "after"}]
+
+
+def test_short_audio_is_a_single_unclipped_chunk():
+    chunks = plan_chunks("tests/data/video.mp4")
+
+    assert len(chunks) == 1
+    assert chunks[0].clip is None
+
+
+@pytest.mark.django_db
+def test_long_audio_is_transcribed_in_chunks(
+    api_client,
+    load_video_file,
+    mock_assemblyai_transcribe,
+    mock_open_ai_transcription_create,
+    mock_gemini_chairman,
+    user,
+    set_dummy_api_key,
+    settings,
+    tmp_path,
+):
+    settings.AUDIO_CACHE_DIR = tmp_path / "audio"
+    settings.CHUNK_MAX_SECONDS = 3
+    settings.CHUNK_MIN_SECONDS = 1
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    assert response.status_code == 202
+    data = TranscriptionData.objects.get(transcription_id=response.data["id"])
+    # AssemblyAI wins the mocked council; its words repeat in every chunk, shifted onto the global timeline
+    assert mock_assemblyai_transcribe.words[-1].text == data.segments[-1]["text"]
+    assert data.segments[-1]["start"] > settings.CHUNK_MAX_SECONDS
@@ -0,0 +1,109 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from openai.resources.audio.transcriptions import AsyncTranscriptions
+
+from transcriber.dedup import INFLIGHT_CACHE_KEY, resolve_duplicates
+from transcriber.models import Transcription, TranscriptionData
+from transcriber.models.transcription import TranscriptionStatus
+from transcriber.storage import blob_storage
+from transcriber.tasks import dispatch_transcriptions
+from transcriber.util import temp_path_of_uploaded_video
+
+
+def post_video(api_client, video_file):
+    video_file.seek(0)
+    return api_client.post(reverse("v1:transcripts-generate"), {"video_file": video_file}, format="multipart")
+
+
+@pytest.mark.django_db
+def test_reupload_reuses_finished_transcript(
+    api_client,
+    load_video_file,
+    mock_assemblyai_transcribe,
+    mock_open_ai_transcription_create,
+    mock_gemini_chairman,
+    user,
+    set_dummy_api_key,
+):
+    api_client.force_authenticate(user=user)
+
+    first = post_video(api_client, load_video_file)
+    assert AsyncTranscriptions.create.call_count == 1
+
+    second = post_video(api_client, load_video_file)
+
+    assert second.status_code == 202
+    assert second.data["status"] == TranscriptionStatus.SUCCESS
+    assert AsyncTranscriptions.create.call_count == 1
+
+    duplicate = Transcription.objects.get(id=second.data["id"])
+    assert str(duplicate.duplicate_of_id) == first.data["id"]
+    assert duplicate.content_hash == Transcription.objects.get(id=first.data["id"]).content_hash
+    copied = TranscriptionData.objects.get(transcription=duplicate)
+    assert copied.generated_text
+    assert copied.evaluation == TranscriptionData.objects.get(transcription_id=first.data["id"]).evaluation
+    assert copied.evaluation["selected_provider"]
+
+
+@pytest.mark.django_db
+def test_concurrent_upload_attaches_to_inflight_job(api_client, load_video_file, user):
+    api_client.force_authenticate(user=user)
+
+    _, content_hash = temp_path_of_uploaded_video(load_video_file)
+    leader = Transcription.objects.create(user=user, status=TranscriptionStatus.PROCESSING, content_hash=content_hash)
+    cache.set(INFLIGHT_CACHE_KEY.format(content_hash=content_hash), str(leader.id))
+
+    response = post_video(api_client, load_video_file)
+
+    assert response.status_code == 202
+    follower = Transcription.objects.get(id=response.data["id"])
+    assert follower.duplicate_of == leader
+    assert follower.status == TranscriptionStatus.PENDING
+
+    # Leader finishes with the transcript of another job
+    TranscriptionData.objects.create(
+        transcription=leader,
+        used_model="OpenAI",
+        generated_text="Leader transcript",
+        segments=[],
+        evaluation={"selected_provider": "OpenAI", "method": "local-agreement"},
+    )
+    leader.status = TranscriptionStatus.SUCCESS
+    leader.save()
+    resolve_duplicates(leader)
+
+    follower.refresh_from_db()
+    assert follower.status == TranscriptionStatus.SUCCESS
+    copied = TranscriptionData.objects.get(transcription=follower)
+    assert copied.generated_text == "Leader transcript"
+    assert copied.evaluation == {"selected_provider": "OpenAI", "method": "local-agreement"}
+    assert cache.get(INFLIGHT_CACHE_KEY.format(content_hash=content_hash)) is None
+    assert not blob_storage().exists(follower.video_name)
+
+
+@pytest.mark.django_db
+def test_failed_leader_hands_duplicates_back_to_the_scheduler(api_client, load_video_file, user, mocker):
+    api_client.force_authenticate(user=user)
+    start = mocker.patch("transcriber.tasks.handle_transcripts.apply_async")
+
+    _, content_hash = temp_path_of_uploaded_video(load_video_file)
+    leader = Transcription.objects.create(user=user, status=TranscriptionStatus.PROCESSING, content_hash=content_hash)
+    cache.set(INFLIGHT_CACHE_KEY.format(content_hash=content_hash), str(leader.id))
+
+    follower = Transcription.objects.get(id=post_video(api_client, load_video_file).data["id"])
+    assert follower.duplicate_of == leader
+    assert blob_storage().exists(follower.video_name)
+
+    leader.status = TranscriptionStatus.FAILED
+    leader.save()
+    resolve_duplicates(leader)
+
+    follower.refresh_from_db()
+    assert follower.duplicate_of is None
+    assert follower.status == TranscriptionStatus.PENDING
+
+    dispatch_transcriptions()
+    follower.refresh_from_db()
+    assert follower.dispatched_at is not None
+    assert start.call_args.kwargs["args"] == [follower.id, follower.video_name]
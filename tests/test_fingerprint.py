@@ -0,0 +1,95 @@
+import ffmpeg
+import pytest
+from django.core.files.base import ContentFile
+from django.urls import reverse
+from openai.resources.audio.transcriptions import AsyncTranscriptions
+
+from transcriber.audio import extract_audio
+from transcriber.fingerprint import (
+    FINGERPRINT_PROFILE,
+    Fingerprint,
+    compute_fingerprint,
+    find_matching_transcription,
+    similarity,
+    store_fingerprint,
+)
+from transcriber.models import Transcription
+from transcriber.models.transcription import TranscriptionStatus
+
+
+@pytest.fixture
+def reencoded_video(tmp_path):
+    # Same recording, different container and audio bitrate
+    path = tmp_path / "reencoded.mkv"
+    ffmpeg.input("tests/data/video.mp4").output(str(path), vcodec="copy", acodec="libopus", audio_bitrate="32k").run(
+        quiet=True
+    )
+    return path
+
+
+@pytest.fixture
+def trimmed_video(tmp_path):
+    # Starts mid-frame, a little into the recording, and in a lossy codec
+    path = tmp_path / "trimmed.mkv"
+    ffmpeg.input("tests/data/video.mp4", ss=0.6).output(str(path), vcodec="copy", acodec="libopus", audio_bitrate="32k").run(
+        quiet=True
+    )
+    return path
+
+
+def test_fingerprint_survives_reencoding(settings, tmp_path, reencoded_video):
+    settings.AUDIO_CACHE_DIR = tmp_path / "audio"
+
+    original = compute_fingerprint(extract_audio("tests/data/video.mp4", FINGERPRINT_PROFILE))
+    reencoded = compute_fingerprint(extract_audio(str(reencoded_video), FINGERPRINT_PROFILE))
+
+    assert abs(original.duration - reencoded.duration) <= settings.FINGERPRINT_DURATION_TOLERANCE
+    assert similarity(original.envelope, reencoded.envelope) >= settings.FINGERPRINT_MATCH_THRESHOLD
+
+
+def test_flat_audio_has_no_index_keys():
+    assert Fingerprint(envelope=bytes([40] * 200)).index_keys() == []
+
+
+@pytest.mark.django_db
+def test_trimmed_reencode_is_found_in_the_index(settings, tmp_path, trimmed_video, user):
+    settings.AUDIO_CACHE_DIR = tmp_path / "audio"
+    original = compute_fingerprint(extract_audio("tests/data/video.mp4", FINGERPRINT_PROFILE))
+    trimmed = compute_fingerprint(extract_audio(str(trimmed_video), FINGERPRINT_PROFILE))
+
+    source = Transcription.objects.create(user=user, status=TranscriptionStatus.SUCCESS)
+    store_fingerprint(source, original)
+
+    assert set(trimmed.lookup_keys()) & set(original.index_keys())
+    assert find_matching_transcription(trimmed) == source
+
+
+@pytest.mark.django_db
+def test_reencoded_upload_reuses_transcript(
+    api_client,
+    load_video_file,
+    reencoded_video,
+    mock_assemblyai_transcribe,
+    mock_open_ai_transcription_create,
+    mock_gemini_chairman,
+    user,
+    set_dummy_api_key,
+    settings,
+    tmp_path,
+):
+    settings.AUDIO_CACHE_DIR = tmp_path / "audio"
+    api_client.force_authenticate(user=user)
+
+    first = api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+    assert AsyncTranscriptions.create.call_count == 1
+
+    second = api_client.post(
+        reverse("v1:transcripts-generate"),
+        {"video_file": ContentFile(reencoded_video.read_bytes(), name="reencoded.mkv")},
+        format="multipart",
+    )
+
+    assert AsyncTranscriptions.create.call_count == 1
+    duplicate = Transcription.objects.get(id=second.data["id"])
+    assert str(duplicate.duplicate_of_id) == first.data["id"]
+    assert duplicate.status == "Success"
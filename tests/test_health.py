@@ -0,0 +1,139 @@
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.urls import reverse
+from openai.resources.audio.transcriptions import AsyncTranscriptions
+
+from transcriber.llms.health import CLOSED, HALF_OPEN, OPEN, ProviderHealth
+from transcriber.llms.providers import get_available_transcribers, provider_key
+from transcriber.models import Transcription, TranscriptionData
+
+
+@pytest.fixture
+def store():
+    # Stands in for the cache the workers share
+    store = LocMemCache("provider-health-tests", {})
+    yield store
+    store.clear()
+
+
+@pytest.fixture
+def breaker_settings(settings):
+    settings.PROVIDER_BREAKER_FAILURES = 3
+    settings.PROVIDER_BREAKER_WINDOW = 60
+    settings.PROVIDER_BREAKER_COOLDOWN = 120
+    settings.PROVIDER_CONCURRENCY_MAX = 8
+
+
+def test_circuit_opens_after_failures_and_lets_one_probe_through(store, breaker_settings, freezer):
+    health = ProviderHealth("openai", store)
+
+    for _ in range(3):
+        assert health.allow()
+        health.record_failure()
+
+    assert health.state == OPEN
+    assert not health.allow()
+    # Another worker sees the same breaker
+    assert ProviderHealth("openai", store).state == OPEN
+
+    freezer.tick(121)
+    assert health.state == HALF_OPEN
+    assert health.allow()
+    assert not ProviderHealth("openai", store).allow()
+
+    health.record_success()
+    assert health.state == CLOSED
+    assert health.allow()
+
+
+def test_failed_probe_opens_the_circuit_again(store, breaker_settings, freezer):
+    health = ProviderHealth("assembly", store)
+    for _ in range(3):
+        health.record_failure()
+    freezer.tick(121)
+    assert health.allow()
+
+    health.record_failure()
+
+    assert health.state == OPEN
+
+
+def test_concurrency_limit_is_aimd(store, breaker_settings):
+    health = ProviderHealth("openai", store)
+    assert health.limit == 8
+
+    health.record_failure()
+    health.record_failure()
+    assert health.limit == 2
+
+    first = health.try_acquire()
+    assert first
+    assert health.try_acquire()
+    assert ProviderHealth("openai", store).try_acquire() is None
+
+    health.release(first)
+    health.record_success()
+    assert health.limit == 3
+    assert health.try_acquire()
+    assert health.try_acquire()
+    assert health.try_acquire() is None
+
+
+def test_slots_of_a_killed_worker_expire_on_their_own(store, breaker_settings, settings, freezer):
+    settings.PROVIDER_IN_FLIGHT_TTL = 60
+    health = ProviderHealth("openai", store)
+    health.record_failure()
+    health.record_failure()
+    health.record_failure()
+    assert health.limit == 1
+
+    lost = health.try_acquire()
+    freezer.tick(30)
+    assert health.try_acquire() is None
+
+    freezer.tick(31)
+    taken = health.try_acquire()
+    assert taken
+    # Releasing the expired lease leaves the slot to the call holding it now
+    health.release(lost)
+    assert health.try_acquire() is None
+    health.release(taken)
+    assert health.try_acquire()
+
+
+@pytest.mark.django_db
+def test_half_open_circuit_lets_a_single_call_probe(breaker_settings, set_dummy_api_key, freezer):
+    health = ProviderHealth("openai")
+    for _ in range(3):
+        health.record_failure()
+    freezer.tick(121)
+
+    # Jobs keep the provider, the probe is left to the first call
+    providers = [provider_key(type(t)) for t in get_available_transcribers("video.mp4")]
+    assert "openai" in providers
+    assert health.allow()
+    assert not ProviderHealth("openai").allow()
+
+
+@pytest.mark.django_db
+def test_job_skips_provider_with_open_circuit(
+    api_client,
+    load_video_file,
+    mock_assemblyai_transcribe,
+    mock_open_ai_transcription_create,
+    mock_gemini_chairman,
+    user,
+    set_dummy_api_key,
+    breaker_settings,
+):
+    health = ProviderHealth("openai")
+    for _ in range(3):
+        health.record_failure()
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    assert Transcription.objects.get(id=response.data["id"]).status == "Success"
+    assert AsyncTranscriptions.create.call_count == 0
+    data = TranscriptionData.objects.get(transcription_id=response.data["id"])
+    assert data.generated_text == mock_assemblyai_transcribe.text
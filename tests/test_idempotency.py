@@ -0,0 +1,68 @@
+import pytest
+from django.urls import reverse
+from openai.resources.audio.transcriptions import AsyncTranscriptions
+
+from transcriber.idempotency import claim_request, request_fingerprint
+from transcriber.models import Transcription
+from transcriber.upload_handlers import VideoUploadHandler
+
+
+@pytest.fixture
+def generate(api_client, load_video_file, user):
+    api_client.force_authenticate(user=user)
+
+    def post(key, video_file=load_video_file):
+        video_file.seek(0)
+        return api_client.post(
+            reverse("v1:transcripts-generate"), {"video_file": video_file}, format="multipart", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    return post
+
+
+@pytest.mark.django_db
+def test_retry_returns_the_original_response_without_reading_the_upload(
+    generate,
+    mock_assemblyai_transcribe,
+    mock_open_ai_transcription_create,
+    mock_gemini_chairman,
+    set_dummy_api_key,
+    mocker,
+):
+    first = generate("upload-1")
+    calls = AsyncTranscriptions.create.call_count
+    new_file = mocker.spy(VideoUploadHandler, "new_file")
+
+    retry = generate("upload-1")
+
+    assert first.status_code == retry.status_code == 202
+    assert retry.data == first.data
+    assert retry["Idempotent-Replayed"] == "true"
+    assert Transcription.objects.count() == 1
+    assert AsyncTranscriptions.create.call_count == calls
+    new_file.assert_not_called()
+
+    # Another key is another upload
+    assert generate("upload-2").data["id"] != first.data["id"]
+
+
+@pytest.mark.django_db
+def test_retry_while_the_first_request_runs_is_refused(generate, user):
+    claim_request(request_fingerprint(user.pk, "generate", "upload-1"))
+
+    response = generate("upload-1")
+
+    assert response.status_code == 409
+    assert Transcription.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_failed_request_can_be_retried_with_the_same_key(generate, user, mocker):
+    mocker.patch("api.v1.transcript.submit_transcription", side_effect=RuntimeError("broker down"))
+    with pytest.raises(RuntimeError):
+        generate("upload-1")
+
+    mocker.stopall()
+    mocker.patch("api.v1.transcript.submit_transcription", return_value=Transcription.objects.create(user=user))
+
+    assert generate("upload-1").status_code == 202
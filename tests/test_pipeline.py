@@ -0,0 +1,147 @@
+import asyncio
+import time
+from concurrent.futures import Future
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from transcriber import tasks
+from transcriber.llms.latency import ARRIVAL_GAPS_CACHE_KEY, arrival_grace, record_arrival_gap
+from transcriber.models import Transcription, TranscriptionData
+
+
+@pytest.mark.django_db
+def test_failing_provider_does_not_fail_the_job(
+    api_client, load_video_file, mock_assemblyai_transcribe, mock_gemini_chairman, user, set_dummy_api_key, mocker
+):
+    mocker.patch(
+        "openai.resources.audio.transcriptions.AsyncTranscriptions.create",
+        new_callable=mocker.AsyncMock,
+        side_effect=ValueError("Bad request"),
+    )
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    assert response.status_code == 202
+    assert Transcription.objects.get(id=response.data["id"]).status == "Success"
+    # The transcript of the provider that succeeded is kept
+    data = TranscriptionData.objects.get(transcription_id=response.data["id"])
+    assert data.generated_text == mock_assemblyai_transcribe.text
+
+
+@pytest.mark.django_db
+def test_job_fails_when_every_provider_fails(api_client, load_video_file, user, set_dummy_api_key, mocker):
+    mocker.patch(
+        "openai.resources.audio.transcriptions.AsyncTranscriptions.create",
+        new_callable=mocker.AsyncMock,
+        side_effect=ValueError("Bad request"),
+    )
+    failed = Future()
+    failed.set_exception(ValueError("Bad request"))
+    mocker.patch("assemblyai.Transcriber.transcribe_async", return_value=failed)
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    assert response.status_code == 202
+    assert Transcription.objects.get(id=response.data["id"]).status == "Failed"
+    assert not TranscriptionData.objects.filter(transcription_id=response.data["id"]).exists()
+
+
+@pytest.mark.django_db
+def test_job_fails_when_a_stage_raises(api_client, load_video_file, user, set_dummy_api_key, settings, mocker):
+    # Errbacks are called by a worker handling the failure, which eager tasks skip when they propagate it
+    settings.CELERY_TASK_EAGER_PROPAGATES = False
+    mocker.patch("transcriber.tasks.get_provider", side_effect=KeyError("openai"))
+    api_client.force_authenticate(user=user)
+
+    api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    transcription = Transcription.objects.get()
+    assert transcription.status == "Failed"
+    assert not TranscriptionData.objects.filter(transcription=transcription).exists()
+
+
+@pytest.mark.django_db
+def test_io_stages_read_the_audio_cut_for_them(
+    api_client, load_video_file, mock_assemblyai_transcribe, mock_gemini_chairman, user, set_dummy_api_key, mocker
+):
+    local_copy = mocker.spy(tasks, "local_copy")
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    assert Transcription.objects.get(id=response.data["id"]).status == "Success"
+    # The video is only copied by the cpu stages: handle_transcripts, which cuts the audio, and the stitching
+    video_name = Transcription.objects.get(id=response.data["id"]).video_name
+    assert [call.args for call in local_copy.call_args_list] == [(video_name,), (video_name,)]
+
+
+@pytest.mark.django_db
+def test_slow_provider_times_out_without_holding_up_the_others(
+    api_client, load_video_file, mock_assemblyai_transcribe, mock_gemini_chairman, user, set_dummy_api_key, settings, mocker
+):
+    async def never_answers(*args, **kwargs):
+        await asyncio.sleep(60)
+
+    create = mocker.patch(
+        "openai.resources.audio.transcriptions.AsyncTranscriptions.create",
+        new_callable=mocker.AsyncMock,
+        side_effect=never_answers,
+    )
+    settings.PROVIDER_TIMEOUTS = {"openai": 0.1}
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    assert Transcription.objects.get(id=response.data["id"]).status == "Success"
+    # A provider out of time is left out, not retried
+    assert create.call_count == 1
+    data = TranscriptionData.objects.get(transcription_id=response.data["id"])
+    assert data.generated_text == mock_assemblyai_transcribe.text
+
+
+@pytest.mark.django_db
+def test_job_goes_on_without_providers_past_the_latency_budget(
+    api_client, load_video_file, mock_assemblyai_transcribe, mock_gemini_chairman, user, set_dummy_api_key, settings, mocker
+):
+    async def answers_late(*args, **kwargs):
+        await asyncio.sleep(0.5)
+        return mocker.MagicMock(text="Late transcript", segments=[])
+
+    mocker.patch(
+        "openai.resources.audio.transcriptions.AsyncTranscriptions.create",
+        new_callable=mocker.AsyncMock,
+        side_effect=answers_late,
+    )
+    settings.PROVIDER_LATENCY_BUDGET = 0.05
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    assert Transcription.objects.get(id=response.data["id"]).status == "Success"
+    data = TranscriptionData.objects.get(transcription_id=response.data["id"])
+    assert data.generated_text == mock_assemblyai_transcribe.text
+
+    # The late answer still arrives, and counts towards the percentile-based budget
+    time.sleep(1)
+    assert len(cache.get(ARRIVAL_GAPS_CACHE_KEY)) == 1
+
+
+def test_percentile_budget_needs_enough_samples(settings):
+    settings.PROVIDER_LATENCY_BUDGET = 30.0
+    settings.PROVIDER_LATENCY_PERCENTILE = 90
+    settings.PROVIDER_LATENCY_MIN_SAMPLES = 10
+
+    for gap in range(1, 10):
+        record_arrival_gap(float(gap))
+    assert arrival_grace() == 30.0
+
+    record_arrival_gap(10.0)
+    assert arrival_grace() == pytest.approx(9.1)
+
+    # The budget caps the percentile
+    settings.PROVIDER_LATENCY_BUDGET = 5.0
+    assert arrival_grace() == 5.0
@@ -0,0 +1,62 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from transcriber.llms import runtime
+from transcriber.llms.assembly_ai import AssemblyTranscriberLLM
+from transcriber.llms.open_ai import OpenAITranscriberLLM
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+
+
+def test_shared_pool_reuses_connections(http_server):
+    before = runtime.connection_stats()
+
+    async def get_twice():
+        for _ in range(2):
+            (await runtime.http_client().get(http_server)).raise_for_status()
+
+    runtime.run(get_twice())
+
+    after = runtime.connection_stats()
+    assert after["requests"] - before["requests"] == 2
+    assert after["connections"] - before["connections"] == 1
+    assert after["reused"] - before["reused"] == 1
+
+
+def test_provider_clients_are_created_once_per_process(set_dummy_api_key):
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = list(executor.map(lambda _: OpenAITranscriberLLM.async_client(), range(16)))
+
+    assert all(client is clients[0] for client in clients)
+    assert AssemblyTranscriberLLM.transcriber() is AssemblyTranscriberLLM.transcriber()
+
+
+def test_rotated_api_key_gets_a_new_client(set_dummy_api_key, monkeypatch):
+    client = OpenAITranscriberLLM.client()
+
+    monkeypatch.setattr(OpenAITranscriberLLM, "API_KEY", "rotated-key")
+
+    assert OpenAITranscriberLLM.client() is not client
+    assert OpenAITranscriberLLM.client().api_key == "rotated-key"
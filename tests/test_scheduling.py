@@ -0,0 +1,216 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from transcriber.models import Transcription
+from transcriber.models.transcription import TranscriptionStatus
+from transcriber.scheduling import expected_completion, lane_of, release_jobs, requeue_stale_jobs
+
+User = get_user_model()
+
+
+@pytest.fixture
+def scheduler_settings(settings):
+    settings.SCHEDULER_MAX_IN_FLIGHT = 6
+    settings.SCHEDULER_USER_MAX_IN_FLIGHT = 2
+    settings.SCHEDULER_PLAN_WEIGHTS = {"business": 2}
+
+
+@pytest.fixture
+def lane_settings(settings):
+    settings.SCHEDULER_LANES = {
+        "short": {"max_duration": 60, "capacity": 1},
+        "long": {"max_duration": None, "capacity": 1},
+    }
+    settings.SCHEDULER_AGING_RATE = 1.0
+
+
+def queue_jobs(user, count, duration=None):
+    return [
+        Transcription.objects.create(
+            user=user, video_name=f"uploads/{user.username}-{i}.mp4", duration=duration, lane=lane_of(duration)
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_user_takes_turns_with_others(scheduler_settings):
+    bulk = User.objects.create_user(username="bulk")
+    small = User.objects.create_user(username="small")
+    queue_jobs(bulk, 50)
+    small_jobs = queue_jobs(small, 2)
+
+    started = []
+    assert release_jobs(started.append) == 4
+
+    # Both small jobs started although the bulk user queued first, and each user is capped
+    assert [job.user for job in started].count(bulk) == 2
+    assert {job.id for job in started if job.user == small} == {job.id for job in small_jobs}
+
+    # Nothing more until a job of the bulk user finishes
+    assert release_jobs(started.append) == 0
+    started[0].status = TranscriptionStatus.SUCCESS
+    started[0].save()
+    assert release_jobs(started.append) == 1
+    assert started[-1].user == bulk
+
+
+@pytest.mark.django_db
+def test_plan_weight_raises_the_share(scheduler_settings):
+    regular = User.objects.create_user(username="regular")
+    business = User.objects.create_user(username="business")
+    business.groups.add(Group.objects.create(name="business"))
+    queue_jobs(regular, 10)
+    queue_jobs(business, 10)
+
+    started = []
+    release_jobs(started.append)
+
+    assert [job.user for job in started].count(business) == 4
+    assert [job.user for job in started].count(regular) == 2
+
+
+@pytest.mark.django_db
+def test_global_cap_bounds_worker_queue(scheduler_settings, settings):
+    settings.SCHEDULER_MAX_IN_FLIGHT = 3
+    for i in range(5):
+        queue_jobs(User.objects.create_user(username=f"user{i}"), 1)
+
+    started = []
+    assert release_jobs(started.append) == 3
+    # Oldest waiting first between equals
+    assert [job.user.username for job in started] == ["user0", "user1", "user2"]
+
+
+@pytest.mark.django_db
+def test_short_clips_do_not_wait_for_long_videos(scheduler_settings, lane_settings, user):
+    queue_jobs(user, 3, duration=7200)
+    (clip,) = queue_jobs(user, 1, duration=20)
+
+    started = []
+    release_jobs(started.append)
+
+    # The long lane is full after one video, the clip has capacity of its own
+    assert [job.duration for job in started] == [20, 7200]
+    assert started[0].id == clip.id
+
+
+@pytest.mark.django_db
+def test_shortest_job_first_with_aging(scheduler_settings, lane_settings, user, freezer):
+    (waiting_long,) = queue_jobs(user, 1, duration=600)
+    freezer.tick(100)
+    (shorter,) = queue_jobs(user, 1, duration=300)
+
+    started = []
+    release_jobs(started.append)
+    assert started[0].id == shorter.id
+
+    Transcription.objects.filter(id=shorter.id).update(status=TranscriptionStatus.SUCCESS)
+    queue_jobs(user, 1, duration=300)
+
+    # 600 s of media, waited 100 s longer than a fresh 300 s job: still last
+    started = []
+    release_jobs(started.append)
+    assert started[0].duration == 300
+
+    Transcription.objects.filter(id=started[0].id).update(status=TranscriptionStatus.SUCCESS)
+    freezer.tick(400)
+    queue_jobs(user, 1, duration=300)
+
+    # Aged past a fresh 300 s job
+    started = []
+    release_jobs(started.append)
+    assert started[0].id == waiting_long.id
+
+
+@pytest.mark.django_db
+def test_expected_completion_counts_the_jobs_ahead(scheduler_settings, lane_settings, settings, user):
+    settings.SCHEDULER_PROCESSING_RATIO = 1.0
+    settings.SCHEDULER_PROCESSING_OVERHEAD = 0.0
+    first, second = queue_jobs(user, 2, duration=600)
+    release_jobs(lambda job: None)
+    first.refresh_from_db()
+
+    assert (expected_completion(first) - first.dispatched_at).total_seconds() == pytest.approx(600)
+    # Waits for the first in the one slot of the lane, then takes its own time
+    assert (expected_completion(second) - first.dispatched_at).total_seconds() == pytest.approx(1200, abs=5)
+
+    first.status = TranscriptionStatus.SUCCESS
+    first.save()
+    assert expected_completion(first) is None
+
+
+@pytest.mark.django_db
+def test_listing_queries_each_lane_once(api_client, scheduler_settings, lane_settings, user):
+    api_client.force_authenticate(user=user)
+
+    def list_queries():
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse("v1:transcripts-list"))
+        assert all(job["expected_completion"] for job in response.data["results"])
+        return len(queries)
+
+    queue_jobs(user, 2, duration=30)
+    queue_jobs(user, 1, duration=600)
+    few = list_queries()
+
+    queue_jobs(user, 6, duration=30)
+    queue_jobs(user, 3, duration=600)
+    assert list_queries() == few
+
+
+@pytest.mark.django_db
+def test_jobs_of_lost_workers_are_requeued_once_their_lease_runs_out(
+    scheduler_settings, lane_settings, settings, user, freezer
+):
+    settings.SCHEDULER_PROCESSING_RATIO = 1.0
+    settings.SCHEDULER_PROCESSING_OVERHEAD = 0.0
+    settings.SCHEDULER_LEASE_FACTOR = 2.0
+    settings.SCHEDULER_LEASE_GRACE = 60
+    settings.SCHEDULER_MAX_DISPATCHES = 2
+    (job,) = queue_jobs(user, 1, duration=30)
+    started, failed = [], []
+    release_jobs(started.append)
+    Transcription.objects.filter(id=job.id).update(status=TranscriptionStatus.PROCESSING)
+
+    # Leased for 2 x 30 s + 60 s
+    freezer.tick(100)
+    assert requeue_stale_jobs(failed.append) == 0
+    freezer.tick(21)
+    assert requeue_stale_jobs(failed.append) == 1
+
+    job.refresh_from_db()
+    assert (job.status, job.dispatched_at) == (TranscriptionStatus.PENDING, None)
+    assert release_jobs(started.append) == 1
+
+    # Lost a second time, it is failed rather than passed to yet another worker
+    freezer.tick(121)
+    assert requeue_stale_jobs(failed.append) == 0
+    assert [transcription.id for transcription in failed] == [job.id]
+
+
+@pytest.mark.django_db
+def test_submitted_job_is_dispatched(
+    api_client,
+    load_video_file,
+    mock_assemblyai_transcribe,
+    mock_open_ai_transcription_create,
+    mock_gemini_chairman,
+    user,
+    set_dummy_api_key,
+):
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    transcription = Transcription.objects.get(id=response.data["id"])
+    assert transcription.dispatched_at is not None
+    assert transcription.lane == "short"
+    assert transcription.duration > 0
+    assert transcription.status == TranscriptionStatus.SUCCESS
+    # Finished by the time the eager job returns
+    assert response.data["expected_completion"] is None
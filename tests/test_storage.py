@@ -0,0 +1,128 @@
+import io
+
+import pytest
+from django.core.files.base import ContentFile
+from django.urls import reverse
+
+from transcriber.models import Transcription
+from transcriber.storage import S3Storage
+
+
+class FakeClientError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3Client:
+    """In-memory stand-in for the subset of the boto3 S3 client used by S3Storage."""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.calls = []
+
+    def put_object(self, Bucket, Key, Body):
+        self.calls.append("put_object")
+        self.objects[(Bucket, Key)] = bytes(Body)
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.calls.append("upload_part")
+        self.uploads[UploadId][PartNumber] = bytes(Body)
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        self.objects[(Bucket, Key)] = b"".join(parts[part["PartNumber"]] for part in MultipartUpload["Parts"])
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise FakeClientError("404")
+        return {"ContentLength": len(self.objects[(Bucket, Key)])}
+
+    def get_object(self, Bucket, Key, Range):
+        self.calls.append("get_object")
+        start, end = map(int, Range.removeprefix("bytes=").split("-"))
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)][start : end + 1])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+@pytest.fixture
+def s3_client(settings):
+    client = FakeS3Client()
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "blobs": {"BACKEND": "transcriber.storage.S3Storage", "OPTIONS": {"bucket_name": "videos", "client": client}},
+    }
+    return client
+
+
+def test_s3_storage_streams_multipart_and_ranged_reads():
+    client = FakeS3Client()
+    storage = S3Storage(bucket_name="videos", prefix="jobs/", part_size=10, client=client)
+    content = bytes(range(256)) * 2
+
+    assert storage.save("uploads/video.mp4", ContentFile(content)) == "uploads/video.mp4"
+
+    assert client.objects[("videos", "jobs/uploads/video.mp4")] == content
+    assert client.calls.count("upload_part") == 52
+    assert storage.exists("uploads/video.mp4")
+    assert storage.size("uploads/video.mp4") == len(content)
+
+    with storage.open("uploads/video.mp4") as f:
+        f.seek(500)
+        assert f.read() == content[500:]
+        f.seek(0)
+        assert f.read() == content
+
+    storage.delete("uploads/video.mp4")
+    assert not storage.exists("uploads/video.mp4")
+
+
+def test_s3_storage_puts_small_files_in_one_request():
+    client = FakeS3Client()
+    storage = S3Storage(bucket_name="videos", client=client)
+
+    storage.save("subtitles/video.srt", ContentFile(b"1\n00:00:00,000 --> 00:00:01,000\nHello\n\n"))
+
+    assert client.calls == ["put_object"]
+
+
+@pytest.mark.django_db
+def test_pipeline_runs_on_s3_storage(
+    api_client,
+    load_video_file,
+    mock_assemblyai_transcribe,
+    mock_open_ai_transcription_create,
+    mock_gemini_chairman,
+    user,
+    set_dummy_api_key,
+    s3_client,
+    settings,
+    tmp_path,
+):
+    settings.AUDIO_CACHE_DIR = tmp_path / "audio"
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    assert response.status_code == 202
+    transcription = Transcription.objects.get(id=response.data["id"])
+    assert transcription.status == "Success"
+
+    keys = {key for _, key in s3_client.objects}
+    assert any(key.startswith("uploads/") for key in keys)
+    assert any(key.startswith("audio/") for key in keys)
+    data_id = transcription.results.get().id
+    assert f"subtitles/transcription_{data_id}.srt" in keys
+    assert f"stitched/transcription_{data_id}_with_subtitles.mp4" in keys
@@ -0,0 +1,266 @@
+import ffmpeg
+import pytest
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.urls import reverse
+
+from api.v1.serializers import VideoSerializer
+from transcriber import audio, uploads, util
+from transcriber.jobs import submit_transcription
+from transcriber.models import Transcription, UploadSession
+from transcriber.storage import blob_storage
+from transcriber.uploads import claim_finalize, complete_upload
+from transcriber.util import temp_path_of_uploaded_video
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(settings, tmp_path):
+    settings.UPLOAD_DIR = tmp_path / "uploads"
+    settings.AUDIO_CACHE_DIR = tmp_path / "audio"
+
+
+@pytest.fixture
+def small_hash_blocks(monkeypatch):
+    # Make chunks straddle several hash blocks
+    monkeypatch.setattr(util, "CONTENT_HASH_BLOCK_SIZE", 10_000)
+
+
+def put_chunk(api_client, upload_id, data, start, size):
+    return api_client.put(
+        reverse("v1:uploads-detail", args=[upload_id]),
+        data,
+        content_type="application/octet-stream",
+        HTTP_CONTENT_RANGE=f"bytes {start}-{start + len(data) - 1}/{size}",
+    )
+
+
+@pytest.mark.django_db
+def test_resumable_upload(
+    api_client,
+    load_video_file,
+    mock_assemblyai_transcribe,
+    mock_open_ai_transcription_create,
+    mock_gemini_chairman,
+    user,
+    set_dummy_api_key,
+    small_hash_blocks,
+):
+    api_client.force_authenticate(user=user)
+    content = load_video_file.read()
+    size = len(content)
+
+    response = api_client.post(reverse("v1:uploads-list"), {"filename": "video.mp4", "size": size})
+    assert response.status_code == 201
+    upload_id = response.data["id"]
+
+    chunk_size = size // 3 + 1
+    for start in range(0, size, chunk_size):
+        response = put_chunk(api_client, upload_id, content[start : start + chunk_size], start, size)
+        assert response.status_code == 200
+        assert response.data["offset"] == min(start + chunk_size, size)
+
+    response = api_client.post(reverse("v1:uploads-finalize", args=[upload_id]))
+
+    assert response.status_code == 202
+    transcription = Transcription.objects.get(id=response.data["id"])
+    assert transcription.status == "Success"
+
+    # Same content hash as a multipart upload of the same file
+    load_video_file.seek(0)
+    _, content_hash = temp_path_of_uploaded_video(load_video_file)
+    assert transcription.content_hash == content_hash
+
+
+@pytest.mark.django_db
+def test_finalize_resumes_after_failed_submission(
+    api_client,
+    load_video_file,
+    mock_assemblyai_transcribe,
+    mock_open_ai_transcription_create,
+    mock_gemini_chairman,
+    user,
+    set_dummy_api_key,
+    mocker,
+):
+    api_client.force_authenticate(user=user)
+    content = load_video_file.read()
+    upload_id = api_client.post(reverse("v1:uploads-list"), {"filename": "video.mp4", "size": len(content)}).data["id"]
+    put_chunk(api_client, upload_id, content, 0, len(content))
+    finalize = reverse("v1:uploads-finalize", args=[upload_id])
+
+    submit = mocker.patch(
+        "api.v1.upload.submit_transcription",
+        wraps=submit_transcription,
+        side_effect=[RuntimeError("broker down"), mocker.DEFAULT],
+    )
+    with pytest.raises(RuntimeError):
+        api_client.post(finalize)
+
+    session = UploadSession.objects.get(id=upload_id)
+    assert session.completed
+    assert session.transcription is None
+    assert blob_storage().exists(session.video_name)
+    # The received file is in blob storage now, no more chunks
+    assert put_chunk(api_client, upload_id, content[:10], 0, len(content)).status_code == 409
+
+    # Another finalize at the same time is turned away
+    assert claim_finalize(session)
+    assert api_client.post(finalize).status_code == 409
+    cache.clear()
+
+    response = api_client.post(finalize)
+    assert response.status_code == 202
+    assert submit.call_args.args[1:] == (session.video_name, session.content_hash, session.duration)
+
+    again = api_client.post(finalize)
+    assert again.status_code == 202
+    assert again.data["id"] == response.data["id"]
+    assert Transcription.objects.count() == 1
+    assert Transcription.objects.get().status == "Success"
+
+
+@pytest.mark.django_db
+def test_upload_resumes_after_interrupted_chunk(api_client, load_video_file, user, small_hash_blocks):
+    api_client.force_authenticate(user=user)
+    content = load_video_file.read()
+    size = len(content)
+    upload_id = api_client.post(reverse("v1:uploads-list"), {"filename": "video.mp4", "size": size}).data["id"]
+
+    # Client announced the whole file but the connection dropped part way
+    response = api_client.put(
+        reverse("v1:uploads-detail", args=[upload_id]),
+        content[:25_000],
+        content_type="application/octet-stream",
+        HTTP_CONTENT_RANGE=f"bytes 0-{size - 1}/{size}",
+    )
+    assert response.data["offset"] == 25_000
+
+    response = put_chunk(api_client, upload_id, content[:1000], 0, size)
+    assert response.status_code == 409
+    assert response.data["offset"] == 25_000
+
+    response = api_client.post(reverse("v1:uploads-finalize", args=[upload_id]))
+    assert response.status_code == 409
+
+    put_chunk(api_client, upload_id, content[25_000:], 25_000, size)
+
+    session = UploadSession.objects.get(id=upload_id)
+    complete_upload(session)
+    session.refresh_from_db()
+    assert session.completed
+    assert session.duration > 0
+    with blob_storage().open(session.video_name) as f:
+        assert f.read() == content
+
+    load_video_file.seek(0)
+    assert session.content_hash == temp_path_of_uploaded_video(load_video_file)[1]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_upload_stored_without_holding_the_session_lock(api_client, load_video_file, user, mocker):
+    api_client.force_authenticate(user=user)
+    content = load_video_file.read()
+    upload_id = api_client.post(reverse("v1:uploads-list"), {"filename": "video.mp4", "size": len(content)}).data["id"]
+    put_chunk(api_client, upload_id, content, 0, len(content))
+
+    in_transaction = []
+    store = mocker.patch.object(
+        uploads, "store_file", side_effect=lambda *args: in_transaction.append(connection.in_atomic_block) or args[0]
+    )
+
+    complete_upload(UploadSession.objects.get(id=upload_id))
+
+    assert in_transaction == [False]
+    session = UploadSession.objects.get(id=upload_id)
+    assert session.completed
+    assert session.video_name == store.call_args.args[0]
+
+
+@pytest.mark.django_db
+def test_generate_writes_upload_once(
+    api_client,
+    blob_storage_dir,
+    load_video_file,
+    mock_assemblyai_transcribe,
+    mock_open_ai_transcription_create,
+    mock_gemini_chairman,
+    user,
+    set_dummy_api_key,
+    settings,
+):
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    assert response.status_code == 202
+    # Streamed into the upload directory and moved into storage, no partial file or second copy left behind
+    assert list(settings.UPLOAD_DIR.iterdir()) == []
+    assert len(list((blob_storage_dir / "uploads").iterdir())) == 1
+
+    load_video_file.seek(0)
+    _, content_hash = temp_path_of_uploaded_video(load_video_file)
+    assert Transcription.objects.get(id=response.data["id"]).content_hash == content_hash
+
+
+@pytest.mark.django_db
+def test_generate_rejects_oversized_upload_without_storing_it(api_client, load_video_file, user, settings, monkeypatch):
+    api_client.force_authenticate(user=user)
+    monkeypatch.setattr(VideoSerializer, "MAX_UPLOAD_SIZE", 10_000)
+
+    response = api_client.post(reverse("v1:transcripts-generate"), {"video_file": load_video_file}, format="multipart")
+
+    assert response.status_code == 400
+    assert "File too large" in str(response.data["video_file"])
+    assert list(settings.UPLOAD_DIR.iterdir()) == []
+
+
+@pytest.mark.django_db
+def test_generate_rejects_non_video_content(api_client, user, settings):
+    api_client.force_authenticate(user=user)
+
+    response = api_client.post(
+        reverse("v1:transcripts-generate"),
+        {"video_file": ContentFile(b"not a video" * 100, name="video.mp4")},
+        format="multipart",
+    )
+
+    assert response.status_code == 400
+    assert list(settings.UPLOAD_DIR.iterdir()) == []
+
+
+@pytest.fixture
+def matroska_video(tmp_path):
+    path = tmp_path / "video.mkv"
+    ffmpeg.input("tests/data/video.mp4").output(str(path), codec="copy").run(quiet=True)
+    return ContentFile(path.read_bytes(), name="video.mkv")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("video_fixture, decodes", [("matroska_video", 0), ("load_video_file", 1)])
+def test_audio_ingested_during_upload(
+    request,
+    api_client,
+    video_fixture,
+    decodes,
+    mock_assemblyai_transcribe,
+    mock_open_ai_transcription_create,
+    mock_gemini_chairman,
+    user,
+    set_dummy_api_key,
+    settings,
+    mocker,
+):
+    settings.UPLOAD_AUDIO_INGEST = True
+    api_client.force_authenticate(user=user)
+    encode = mocker.spy(audio, "_encode")
+
+    response = api_client.post(
+        reverse("v1:transcripts-generate"), {"video_file": request.getfixturevalue(video_fixture)}, format="multipart"
+    )
+
+    assert response.status_code == 202
+    assert Transcription.objects.get(id=response.data["id"]).status == "Success"
+    # Matroska is demuxed while uploading, a regular MP4 is left to the job
+    assert encode.call_count == decodes
+    assert not list(settings.AUDIO_CACHE_DIR.glob("*.partial.*"))
@@ -0,0 +1,45 @@
+from backend.celery import app
+from transcriber import tasks
+from transcriber.management.commands.runworker import worker_argv
+
+
+def test_ffmpeg_tasks_are_routed_to_the_cpu_queue():
+    def queue_of(task_name):
+        return app.amqp.router.route({}, task_name)["queue"].name
+
+    assert queue_of("transcriber.tasks.handle_transcripts") == "cpu"
+    assert queue_of("transcriber.tasks.prepare_council") == "cpu"
+    assert queue_of("transcriber.tasks.stitch_subtitle_and_video") == "cpu"
+    assert queue_of("transcriber.tasks.transcribe_chunk") == "io"
+    assert queue_of("transcriber.tasks.select_transcript") == "io"
+
+
+def test_worker_presets(settings):
+    settings.WORKER_PRESETS = {"cpu": {"queues": "cpu", "pool": "prefork", "concurrency": 8}}
+
+    assert worker_argv("cpu") == [
+        "worker",
+        "--loglevel=info",
+        "--hostname=cpu@%h",
+        "--queues=cpu",
+        "--pool=prefork",
+        "--concurrency=8",
+    ]
+
+
+def test_only_io_workers_warm_up_provider_clients(settings, monkeypatch, mocker):
+    settings.PROVIDER_WARM_UP = True
+    monkeypatch.setattr(tasks, "_consumes_io_queue", False)
+    start = mocker.patch("transcriber.tasks.start")
+    worker = mocker.Mock()
+
+    worker.app.amqp.queues.consume_from = {"cpu": mocker.Mock()}
+    tasks.detect_io_worker(sender=worker)
+    tasks.warm_up_provider_clients()
+    assert not start.called
+
+    worker.app.amqp.queues.consume_from = {"io": mocker.Mock(), "cpu": mocker.Mock()}
+    tasks.detect_io_worker(sender=worker)
+    tasks.warm_up_provider_clients()
+    assert start.call_count == 1
+    start.call_args.args[0].close()